@@ -0,0 +1,59 @@
+"""
+Benchmark of radial profiles and cakes: remap to the polar image followed by nanmean
+vs a single sparse matrix product of AzimuthalIntegrator.
+
+Run from the repository root: python -m benchmarks.azimuthal_integration [num_frames]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.integration import AzimuthalIntegrator
+from mlgidGUI.app.polar_image import PolarImage
+
+SHAPE = (1043, 981)
+
+
+def main(num: int = 20):
+    rng = np.random.default_rng(0)
+    geometry = Geometry(shape=SHAPE, beam_center=(SHAPE[0], SHAPE[1] / 2))
+    images = [rng.poisson(4, SHAPE).astype(np.float32) for _ in range(num)]
+    geometry.remap_maps
+
+    print(f'{num} frames {SHAPE}, polar shape {geometry.polar_shape}')
+    profile_time = _median_time(lambda image: np.nanmean(PolarImage.remap(image, geometry), axis=0), images)
+
+    _report('radial profile', geometry, False, images, profile_time)
+
+    for polar_shape in (geometry.polar_shape, (180, 512)):
+        cake_geometry = geometry.copy()
+        cake_geometry.set_polar_shape(polar_shape)
+        cake_geometry.remap_maps
+        reference_time = _median_time(lambda image: PolarImage.remap(image, cake_geometry), images)
+        _report(f'cake {polar_shape}', cake_geometry, True, images, reference_time)
+
+
+def _report(name: str, geometry: Geometry, angular: bool, images, reference_time: float):
+    start = perf_counter()
+    integrator = AzimuthalIntegrator(geometry, angular=angular)
+    build_time = perf_counter() - start
+    integrate_time = _median_time(integrator.integrate, images)
+    print(f'{name:>22}: {integrate_time * 1e3:6.1f} ms vs {reference_time * 1e3:6.1f} ms with remap '
+          f'(speedup {reference_time / integrate_time:.1f}), matrix of {integrator.matrix.nnz} entries '
+          f'built in {build_time * 1e3:.0f} ms')
+
+
+def _median_time(func, images) -> float:
+    times = []
+    for image in images:
+        start = perf_counter()
+        func(image)
+        times.append(perf_counter() - start)
+    return float(np.median(times))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,58 @@
+"""
+Benchmark of the compressed in-memory frame cache: compression ratio and
+compression/decompression time of synthetic low-count detector frames and polar images.
+
+Run from the repository root: python -m benchmarks.compressed_cache [num_frames]
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import cv2
+import numpy as np
+
+from mlgidGUI.app.cache import available_codecs, compress_array, decompress_array
+from mlgidGUI.app.geometry import Geometry
+
+SHAPE = (2167, 2070)
+
+
+def make_frames(num: int):
+    rng = np.random.default_rng(0)
+    geometry = Geometry(shape=SHAPE, beam_center=(SHAPE[0], SHAPE[1] / 2))
+    yy, zz = geometry.polar_grids
+    yy, zz = yy.astype(np.float32), zz.astype(np.float32)
+    for _ in range(num):
+        image = rng.poisson(3, SHAPE).astype(np.int32)
+        polar_image = cv2.remap(image.astype(np.float32), yy, zz, interpolation=cv2.INTER_LINEAR,
+                                borderValue=np.nan)
+        yield 'raw', image
+        yield 'polar', polar_image
+
+
+def main(num: int = 5):
+    frames = list(make_frames(num))
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    for codec in available_codecs():
+        for kind in ('raw', 'polar'):
+            arrays = [array for k, array in frames if k == kind]
+            nbytes = sum(array.nbytes for array in arrays)
+
+            start = perf_counter()
+            compressed = [compress_array(array, codec) for array in arrays]
+            compress_time = (perf_counter() - start) / len(arrays)
+
+            start = perf_counter()
+            for c in compressed:
+                decompress_array(c, executor)
+            decompress_time = (perf_counter() - start) / len(arrays)
+
+            ratio = nbytes / sum(c.nbytes for c in compressed)
+            print(f'{codec:>6} {kind:>6}: ratio {ratio:5.1f}, '
+                  f'compress {compress_time * 1000:7.1f} ms, decompress {decompress_time * 1000:7.1f} ms per frame')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
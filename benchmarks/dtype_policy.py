@@ -0,0 +1,69 @@
+"""
+Benchmark of the float type policy: memory and time of the image pipeline (polar grids,
+polar images, radial profiles and contrast correction of integer detector frames)
+calculated in float32 and float64.
+
+Run from the repository root: python -m benchmarks.dtype_policy [num_frames]
+"""
+
+import sys
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+from mlgidGUI.app.dtype_policy import FLOAT_DTYPES, DEFAULT_FLOAT_DTYPE, set_float_dtype
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.image_processing import standard_contrast_correction
+from mlgidGUI.app.polar_image import PolarImage
+
+SHAPE = (1043, 981)
+
+
+def main(num: int = 10):
+    rng = np.random.default_rng(0)
+    images = [rng.poisson(4, SHAPE).astype(np.int32) for _ in range(num)]
+    print(f'{num} frames {SHAPE}')
+    print(f'{"float type":>10} {"grids, MB":>10} {"grids, ms":>10} {"peak, MB":>9} '
+          f'{"polar, ms":>10} {"profile, ms":>12} {"contrast, ms":>13}')
+
+    try:
+        for i, dtype in enumerate(FLOAT_DTYPES):
+            set_float_dtype(dtype)
+            # geometries differ, so that the grids are not taken from the shared memo
+            geometry = Geometry(shape=SHAPE, beam_center=(SHAPE[0], SHAPE[1] / 2 + i))
+            start = perf_counter()
+            yy, zz = geometry.polar_grids
+            grids_time = perf_counter() - start
+            geometry.remap_maps
+
+            tracemalloc.start()
+            polar_image = PolarImage.remap(images[0], geometry)
+            np.nanmean(polar_image, axis=0, dtype=dtype)
+            standard_contrast_correction(images[0])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            polar_time = _median_time(lambda image: PolarImage.remap(image, geometry), images)
+            polar_images = [PolarImage.remap(image, geometry) for image in images]
+            profile_time = _median_time(lambda image: np.nanmean(image, axis=0, dtype=dtype), polar_images)
+            contrast_time = _median_time(standard_contrast_correction, images)
+
+            print(f'{dtype:>10} {(yy.nbytes + zz.nbytes) / 2 ** 20:10.1f} {grids_time * 1e3:10.1f} '
+                  f'{peak / 2 ** 20:9.1f} {polar_time * 1e3:10.1f} {profile_time * 1e3:12.2f} '
+                  f'{contrast_time * 1e3:13.1f}')
+    finally:
+        set_float_dtype(DEFAULT_FLOAT_DTYPE)
+
+
+def _median_time(func, images) -> float:
+    times = []
+    for image in images:
+        start = perf_counter()
+        func(image)
+        times.append(perf_counter() - start)
+    return float(np.median(times))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
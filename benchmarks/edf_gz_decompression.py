@@ -0,0 +1,54 @@
+"""
+Benchmark of .edf.gz frame reading: gzip.open().read() followed by parsing
+(the previous path) against streaming decompression into a preallocated buffer,
+sequentially and in a thread pool.
+
+Run from the repository root: python -m benchmarks.edf_gz_decompression [num_frames]
+"""
+
+import sys
+import gzip
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from mlgidGUI.app.edf_reader import read_edf, read_edf_series, _get_data_from_filepath, _read_edf_from_data
+
+SHAPE = (1679, 1475)  # Pilatus 2M
+
+
+def write_series(folder: Path, num: int):
+    rng = np.random.default_rng(0)
+    header = (f'{{\nDataType = SignedInteger ;\nDim_1 = {SHAPE[1]} ;\nDim_2 = {SHAPE[0]} ;\n'
+              f'Size = {SHAPE[0] * SHAPE[1] * 4} ;\n').ljust(510) + '}\n'
+    paths = []
+    for i in range(num):
+        image = rng.poisson(3, SHAPE).astype('<i4')
+        path = folder / f'{i:05}.edf.gz'
+        path.write_bytes(gzip.compress(header.encode() + image.tobytes(), compresslevel=6))
+        paths.append(path)
+    return paths
+
+
+def timeit(name: str, func, num: int):
+    start = perf_counter()
+    func()
+    elapsed = perf_counter() - start
+    print(f'{name:<32} {elapsed / num * 1000:8.1f} ms/frame')
+
+
+def main(num: int = 16):
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_series(Path(folder), num)
+        _, header_dict = read_edf(paths[0], return_dict=True)
+
+        timeit('gzip.open().read() + parse', lambda: [
+            _read_edf_from_data(_get_data_from_filepath(p), header_dict) for p in paths], num)
+        timeit('streaming, single thread', lambda: [read_edf(p, header_dict) for p in paths], num)
+        timeit('streaming, thread pool', lambda: read_edf_series(paths, header_dict), num)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
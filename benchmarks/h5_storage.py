@@ -0,0 +1,81 @@
+"""
+Benchmark of h5 export storage policies: file size, write and read time
+of a synthetic series of raw detector frames and polar images.
+
+Run from the repository root: python -m benchmarks.h5_storage [num_frames]
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import cv2
+import numpy as np
+from h5py import File
+
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.file_manager import H5StoragePolicy, PolarImageDtype, available_compressions
+from mlgidGUI.app.file_manager.read_images import _ReadImage
+from mlgidGUI.app.file_manager.read_polar_images import _ReadPolarImage
+
+SHAPE = (1043, 981)
+
+
+def make_series(num: int):
+    rng = np.random.default_rng(0)
+    geometry = Geometry(shape=SHAPE, beam_center=(SHAPE[0], SHAPE[1] / 2))
+    yy, zz = geometry.polar_grids
+    for _ in range(num):
+        image = rng.poisson(4, SHAPE).astype(np.int32)
+        polar_image = cv2.remap(image.astype(np.float32), yy.astype(np.float32), zz.astype(np.float32),
+                                interpolation=cv2.INTER_LINEAR)
+        yield image, polar_image
+
+
+def policies():
+    yield 'default', H5StoragePolicy()
+    for compression in available_compressions():
+        if compression == 'szip':
+            continue
+        yield compression, H5StoragePolicy(compression=compression)
+        yield f'{compression} + shuffle', H5StoragePolicy(compression=compression, shuffle=True)
+        yield f'{compression} + shuffle, polar float16', H5StoragePolicy(
+            compression=compression, shuffle=True, polar_dtype=PolarImageDtype.float16)
+        yield f'{compression} + shuffle, polar uint16', H5StoragePolicy(
+            compression=compression, shuffle=True, polar_dtype=PolarImageDtype.scaled_uint16)
+
+
+def run(path: Path, series: list, storage: H5StoragePolicy):
+    start = perf_counter()
+    with File(str(path), 'w') as f:
+        for i, (image, polar_image) in enumerate(series):
+            group = f.create_group(str(i))
+            _ReadImage.set_h5(group, None, image, storage)
+            _ReadPolarImage.set_h5(group, None, polar_image, storage)
+    write_time = perf_counter() - start
+
+    start = perf_counter()
+    with File(str(path), 'r') as f:
+        for group in f.values():
+            group['image'][()]
+            _ReadPolarImage.get_h5(group, None)
+    read_time = perf_counter() - start
+    return path.stat().st_size, write_time, read_time
+
+
+def main(num: int = 10):
+    series = list(make_series(num))
+    raw_size = sum(image.nbytes + polar_image.nbytes for image, polar_image in series)
+    print(f'{num} frames, {raw_size / 2 ** 20:.1f} MB uncompressed')
+    print(f'{"policy":<36} {"size, MB":>9} {"ratio":>6} {"write, ms":>10} {"read, ms":>9}')
+
+    with tempfile.TemporaryDirectory() as folder:
+        for name, storage in policies():
+            size, write_time, read_time = run(Path(folder) / 'data.h5', series, storage)
+            print(f'{name:<36} {size / 2 ** 20:9.1f} {raw_size / size:6.2f} '
+                  f'{write_time / num * 1000:10.1f} {read_time / num * 1000:9.1f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,105 @@
+"""
+Benchmark of polar image calculation for a series of frames sharing a geometry:
+float64 coordinate grids converted on every call vs remap maps cached by the geometry,
+layouts of the cached maps (separate float maps, interleaved CV_32FC2 and fixed-point CV_16SC2),
+transformed (flipped or rotated) views vs raw frames remapped with the transformations
+composed into the maps, and the fixed 1024x1024 polar shape vs the automatic one.
+
+Run from the repository root: python -m benchmarks.polar_remap [num_frames]
+"""
+
+import sys
+from time import perf_counter
+
+import cv2
+import numpy as np
+
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.polar_image import PolarImage, INTERPOLATION_ALGORITHMS
+
+SHAPE = (1043, 981)
+LARGE_SHAPE = (2048, 2048)
+
+
+def main(num: int = 20):
+    rng = np.random.default_rng(0)
+    geometry = Geometry(shape=SHAPE, beam_center=(SHAPE[0], SHAPE[1] / 2))
+    images = [rng.poisson(4, SHAPE).astype(np.float32) for _ in range(num)]
+    yy, zz = geometry.polar_grids
+
+    start = perf_counter()
+    maps = geometry.remap_maps
+    print(f'{num} frames {SHAPE}, polar shape {geometry.polar_shape}, '
+          f'maps built once in {(perf_counter() - start) * 1e3:.1f} ms')
+    print(f'{"interpolation":>14} {"grids, ms":>10} {"maps, ms":>10} {"speedup":>8} {"max diff":>9}')
+
+    for name, algorithm in INTERPOLATION_ALGORITHMS.items():
+        grids_time = _median_time(lambda image: PolarImage.calc_polar_image(image, yy, zz, algorithm), images)
+        maps_time = _median_time(lambda image: PolarImage.remap(image, geometry, algorithm), images)
+        max_diff = max(np.abs(PolarImage.remap(image, geometry, algorithm) -
+                              PolarImage.calc_polar_image(image, yy, zz, algorithm)).max() for image in images[:2])
+        print(f'{name:>14} {grids_time * 1e3:10.1f} {maps_time * 1e3:10.1f} '
+              f'{grids_time / maps_time:8.1f} {max_diff:9.3f}')
+    assert geometry.remap_maps is maps
+
+    _compare_map_formats(images, yy, zz)
+
+    for shape in (SHAPE, LARGE_SHAPE):
+        _compare_transformations([rng.poisson(4, shape).astype(np.float32) for _ in range(num)])
+
+    _compare_polar_shapes(rng, num)
+
+
+def _compare_map_formats(images, yy, zz):
+    print(f'OpenCV {cv2.__version__}, remap time (ms) and max difference from the float maps')
+    float_maps = np.asarray(yy, dtype=np.float32), np.asarray(zz, dtype=np.float32)
+    formats = {'CV_32FC1 x2': float_maps,
+               'CV_32FC2': cv2.convertMaps(*float_maps, cv2.CV_32FC2),
+               'CV_16SC2': cv2.convertMaps(*float_maps, cv2.CV_16SC2)}
+    print(f'{"interpolation":>14}' + ''.join(f'{name:>13} {"diff":>6}' for name in formats))
+    for name, algorithm in INTERPOLATION_ALGORITHMS.items():
+        expected = cv2.remap(images[0], *float_maps, interpolation=algorithm)
+        row = f'{name:>14}'
+        for maps in formats.values():
+            remap_time = _median_time(lambda image: cv2.remap(image, *maps, interpolation=algorithm), images)
+            diff = np.nanmax(np.abs(cv2.remap(images[0], *maps, interpolation=algorithm) - expected))
+            row += f'{remap_time * 1e3:13.1f} {diff:6.3f}'
+        print(row)
+
+
+def _compare_polar_shapes(rng, num: int):
+    print(f'{"detector":>12} {"beam center":>12} {"polar shape":>13} {"MB":>6} {"ms":>6}')
+    for shape in ((256, 256), SHAPE, LARGE_SHAPE):
+        images = [rng.poisson(4, shape).astype(np.float32) for _ in range(num)]
+        for name, beam_center in (('edge', (shape[0], shape[1] / 2)), ('center', (shape[0] / 2, shape[1] / 2))):
+            for polar_shape in ((1024, 1024), 'auto'):
+                geometry = Geometry(shape=shape, beam_center=beam_center, polar_shape=polar_shape)
+                geometry.remap_maps
+                remap_time = _median_time(lambda image: PolarImage.remap(image, geometry), images)
+                size = np.prod(geometry.polar_shape) * 4 / 2 ** 20
+                print(f'{str(shape):>12} {name:>12} {str(geometry.polar_shape):>13} {size:6.1f} {remap_time * 1e3:6.1f}')
+
+
+def _compare_transformations(images):
+    shape = images[0].shape
+    print(f'{len(images)} frames {shape}')
+    print(f'{"transformation":>14} {"view, ms":>10} {"raw, ms":>10} {"speedup":>8}')
+    for t_key in ('2143', '3412', '2413', '4231'):
+        geometry = Geometry(beam_center=(shape[0], shape[1] / 2), t_key=t_key)
+        geometry.set_shape(geometry.t(images[0]).shape)
+        geometry.raw_remap_maps
+        view_time = _median_time(lambda image: PolarImage.remap(geometry.t(image), geometry), images)
+        raw_time = _median_time(lambda image: PolarImage.remap(image, geometry, raw=True), images)
+        print(f'{t_key:>14} {view_time * 1e3:10.1f} {raw_time * 1e3:10.1f} {view_time / raw_time:8.1f}')
+
+
+def _median_time(func, images) -> float:
+    times = []
+    for image in images:
+        start = perf_counter()
+        func(image)
+        times.append(perf_counter() - start)
+    return float(np.median(times))
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,55 @@
+"""
+Benchmark of polar image parts: full polar images sliced to a radial band or a ring
+vs only the parts calculated with the window remap maps, for a series of frames.
+
+Run from the repository root: python -m benchmarks.polar_window [num_frames]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.polar_image import PolarImage
+
+SHAPE = (1043, 981)
+
+
+def main(num: int = 20):
+    rng = np.random.default_rng(0)
+    images = [rng.poisson(4, SHAPE).astype(np.float32) for _ in range(num)]
+    print(f'{num} frames {SHAPE}')
+    print(f'{"window":>12} {"part":>7} {"maps, ms":>9} {"full, ms":>9} {"window maps, ms":>16} '
+          f'{"window, ms":>11} {"speedup":>8}')
+
+    for i, (name, r_range) in enumerate((('fit band', (300, 360)), ('ring', (500, 510)), ('half', (0, 600)))):
+        # geometries differ, so that the maps are not taken from the shared caches
+        geometry = Geometry(shape=SHAPE, beam_center=(SHAPE[0], SHAPE[1] / 2 + i))
+        window = geometry.polar_window(r_range)
+
+        start = perf_counter()
+        geometry.remap_maps
+        maps_time = perf_counter() - start
+        start = perf_counter()
+        geometry.window_remap_maps(window)
+        window_maps_time = perf_counter() - start
+
+        full_time = _median_time(lambda image: PolarImage.remap(image, geometry)[window], images)
+        window_time = _median_time(lambda image: PolarImage.remap_window(image, geometry, window), images)
+        part = (window[1].stop - window[1].start) / geometry.polar_shape[1]
+        print(f'{name:>12} {part:7.1%} {maps_time * 1e3:9.1f} {full_time * 1e3:9.2f} {window_maps_time * 1e3:16.1f} '
+              f'{window_time * 1e3:11.2f} {full_time / window_time:8.1f}')
+
+
+def _median_time(func, images) -> float:
+    times = []
+    for image in images:
+        start = perf_counter()
+        func(image)
+        times.append(perf_counter() - start)
+    return float(np.median(times))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
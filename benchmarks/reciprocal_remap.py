@@ -0,0 +1,52 @@
+"""
+Benchmark of browsing a series in reciprocal space: one-off q lookup table and remap maps
+per geometry vs per-frame resampling to a regular q_xy - q_z grid, compared to the polar remap.
+
+Run from the repository root: python -m benchmarks.reciprocal_remap [num_frames]
+"""
+
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.polar_image import PolarImage
+from mlgidGUI.app.reciprocal_space import q_lut, default_q_grid, q_remap_maps, remap_to_q
+
+SHAPE = (1043, 981)
+GI = (0.6888, 300, 0.172, 0.3)
+
+
+def main(num: int = 20):
+    rng = np.random.default_rng(0)
+    geometry = Geometry(shape=SHAPE, beam_center=(100, SHAPE[1] / 2), gi=GI)
+    images = [rng.poisson(4, SHAPE).astype(np.float32) for _ in range(num)]
+
+    start = perf_counter()
+    q_lut(geometry)
+    lut_time = perf_counter() - start
+    q_grid = default_q_grid(geometry)
+    start = perf_counter()
+    q_remap_maps(geometry, q_grid)
+    maps_time = perf_counter() - start
+    geometry.remap_maps
+
+    print(f'{num} frames {SHAPE}, q grid {q_grid.shape}: lookup table built in {lut_time * 1e3:.1f} ms, '
+          f'remap maps in {maps_time * 1e3:.1f} ms')
+    q_time = _median_time(lambda image: remap_to_q(image, geometry, q_grid), images)
+    polar_time = _median_time(lambda image: PolarImage.remap(image, geometry), images)
+    print(f'per frame: q_xy - q_z {q_time * 1e3:.1f} ms, polar {polar_time * 1e3:.1f} ms')
+
+
+def _median_time(func, images) -> float:
+    times = []
+    for image in images:
+        start = perf_counter()
+        func(image)
+        times.append(perf_counter() - start)
+    return float(np.median(times))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
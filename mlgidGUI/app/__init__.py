@@ -1,5 +1,6 @@
 from .app import App
-from .geometry import Geometry
+from .geometry import Geometry, GIParameters
+from .acquisition_profile import AcquisitionProfile
 from .rois.roi_data import RoiData
 from .rois.roi import Roi, RoiTypes
 from .fitting import FitObject
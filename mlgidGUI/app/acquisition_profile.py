@@ -0,0 +1,91 @@
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+from .geometry import Geometry
+from .dtype_policy import float_dtype
+from .transformations import transform_window
+
+__all__ = ['AcquisitionProfile']
+
+
+class AcquisitionProfile(NamedTuple):
+    """
+    Detector readout applied to the raw images of a folder at load time: images are cropped
+    to the (z_min, z_max, y_min, y_max) window of detector pixels (the full detector if crop is None)
+    and averaged over binning x binning pixels. The window is trimmed to whole bins.
+
+    Geometries of the binned images have the beam center in binned pixels and the scale multiplied
+    by the binning, so radii in scaled units (and, therefore, roi coordinates) are kept.
+    """
+    binning: int = 1
+    crop: Tuple[int, int, int, int] or None = None
+
+    @property
+    def is_identity(self) -> bool:
+        return self.binning == 1 and self.crop is None
+
+    def window(self, detector_shape: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        height, width = detector_shape[:2]
+        z_min, z_max, y_min, y_max = self.crop or (0, height, 0, width)
+        z_min, z_max = max(0, z_min), min(height, z_max)
+        y_min, y_max = max(0, y_min), min(width, y_max)
+        z_max -= (z_max - z_min) % self.binning
+        y_max -= (y_max - y_min) % self.binning
+        if z_max <= z_min or y_max <= y_min:
+            raise ValueError(f'Crop {self.crop} with binning {self.binning} '
+                             f'is outside of the detector of shape {tuple(detector_shape)}.')
+        return z_min, z_max, y_min, y_max
+
+    def shape(self, detector_shape: Tuple[int, int]) -> Tuple[int, int]:
+        z_min, z_max, y_min, y_max = self.window(detector_shape)
+        return (z_max - z_min) // self.binning, (y_max - y_min) // self.binning
+
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        if self.is_identity:
+            return image
+        z_min, z_max, y_min, y_max = self.window(image.shape)
+        # slicing keeps memory-mapped images mapped, so only the window is read
+        image = image[z_min:z_max, y_min:y_max]
+        if self.binning == 1:
+            return image
+        b = self.binning
+        dtype = float_dtype()
+        image = image.reshape(image.shape[0] // b, b, image.shape[1] // b, b)
+        return np.asarray(image.mean(axis=(1, 3), dtype=dtype), dtype=dtype)
+
+    def geometry_from_detector(self, geometry: Geometry, detector_shape: Tuple[int, int]) -> Geometry:
+        """
+        Converts the geometry of full detector images to the geometry of the images of the profile.
+        """
+        return self._convert_geometry(geometry, detector_shape, False)
+
+    def geometry_to_detector(self, geometry: Geometry, detector_shape: Tuple[int, int]) -> Geometry:
+        """
+        Converts the geometry of the images of the profile to the geometry of full detector images.
+        """
+        return self._convert_geometry(geometry, detector_shape, True)
+
+    def _convert_geometry(self, geometry: Geometry, detector_shape: Tuple[int, int], to_detector: bool) -> Geometry:
+        if self.is_identity:
+            return geometry.copy()
+
+        # beam center is defined in the coordinates of the transformed image
+        window, shape = transform_window(geometry.t.key, self.window(detector_shape), detector_shape)
+        z_min, z_max, y_min, y_max = window
+        b, offset = self.binning, (self.binning - 1) / 2
+        z, y = geometry.beam_center
+
+        params = geometry.to_dict()
+        pixel_factor = 1 / b if to_detector else b
+        if to_detector:
+            params.update(beam_center=(z * b + z_min + offset, y * b + y_min + offset),
+                          scale=geometry.scale / b,
+                          shape=shape)
+        else:
+            params.update(beam_center=((z - z_min - offset) / b, (y - y_min - offset) / b),
+                          scale=geometry.scale * b,
+                          shape=((z_max - z_min) // b, (y_max - y_min) // b))
+        if geometry.gi is not None:
+            params.update(gi=geometry.gi._replace(pixel_size=geometry.gi.pixel_size * pixel_factor))
+        return Geometry.fromdict(params)
@@ -57,6 +57,7 @@ class App(metaclass=SingletonMeta):
 
     def _connect_app(self):
         self.image_holder.sigPolarImageChanged.connect(self.radial_profile.update)
+        self.image_holder.sigRadialProfileChanged.connect(self.radial_profile.update)
         self.image_holder.sigPolarImageChanged.connect(self.angular_profile.update)
 
         self.geometry_holder.sigScaleChanged.connect(self.roi_dict.on_scale_changed)
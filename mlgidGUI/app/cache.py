@@ -0,0 +1,368 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock
+from typing import Any, Callable, Hashable, Iterator, List, NamedTuple, Tuple
+import mmap
+import sys
+import zlib
+
+import numpy as np
+
+try:
+    import blosc
+except ImportError:
+    blosc = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+__all__ = ['ByteLRUCache', 'CompressedLRUCache', 'CompressedArray', 'get_nbytes',
+           'available_codecs', 'compress_array', 'decompress_array']
+
+_CHUNK_SIZE = 2 ** 20
+
+
+def get_nbytes(value) -> int:
+    """
+    Estimates memory occupied by a cached value. Arrays are counted by their data size,
+    tuples and lists by the sum of their items. Arrays sharing memory with a previous item
+    (for instance, transformed views of a raw image) are counted once.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        nbytes = 0
+        arrays = []
+        for item in value:
+            if isinstance(item, np.ndarray):
+                if any(np.may_share_memory(item, arr) for arr in arrays):
+                    continue
+                arrays.append(item)
+            nbytes += get_nbytes(item)
+        return nbytes
+    return sys.getsizeof(value)
+
+
+class ByteLRUCache(object):
+    """
+    Thread-safe least recently used cache bounded by the total size of stored values
+    in bytes rather than by the number of entries.
+    """
+
+    def __init__(self, max_bytes: int, get_size: Callable[[Any], int] = get_nbytes):
+        self._max_bytes = max_bytes
+        self._get_size = get_size
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._nbytes = 0
+        self._lock = RLock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int):
+        with self._lock:
+            self._max_bytes = value
+            self._shrink()
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value) -> bool:
+        """
+        Stores the value and evicts the least recently used entries if needed.
+        Returns False if the value alone exceeds the cache size and was not stored.
+        """
+        size = self._get_size(value)
+        with self._lock:
+            self._remove(key)
+            if size > self._max_bytes:
+                return False
+            self._data[key] = value
+            self._sizes[key] = size
+            self._nbytes += size
+            self._shrink()
+            return True
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            value = self._data[key]
+            self._remove(key)
+            return value
+
+    def remove_if(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._data.keys() if predicate(k)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._nbytes = 0
+
+    def reset_stats(self):
+        self.hits = self.misses = 0
+
+    def keys(self) -> Iterator[Hashable]:
+        with self._lock:
+            return iter(list(self._data.keys()))
+
+    def _replace(self, key: Hashable, value) -> None:
+        # replaces the value keeping its position in the LRU order
+        size = self._get_size(value)
+        self._nbytes += size - self._sizes[key]
+        self._sizes[key] = size
+        self._data[key] = value
+        self._shrink()
+
+    def _remove(self, key: Hashable):
+        if key in self._data:
+            del self._data[key]
+            self._nbytes -= self._sizes.pop(key)
+
+    def _shrink(self):
+        while self._nbytes > self._max_bytes and self._data:
+            key, _ = self._data.popitem(last=False)
+            self._nbytes -= self._sizes.pop(key)
+
+    def __contains__(self, key: Hashable):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, key: Hashable):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value):
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def __repr__(self):
+        return f'<ByteLRUCache({len(self)} items, {self._nbytes}/{self._max_bytes} bytes, ' \
+               f'hits={self.hits}, misses={self.misses})>'
+
+
+_MISSING = object()
+
+
+class CompressedArray(NamedTuple):
+    chunks: Tuple[bytes, ...]
+    shape: Tuple[int, ...]
+    dtype: str
+    codec: str
+    chunk_size: int  # bytes of uncompressed data per chunk
+
+    @property
+    def nbytes(self) -> int:
+        return sum(map(len, self.chunks))
+
+
+def available_codecs() -> List[str]:
+    """
+    Returns the codecs available for in-memory compression, the fastest first.
+    blosc and lz4 are optional, zlib is always available.
+    """
+    codecs = []
+    if blosc is not None:
+        codecs.append('blosc')
+    if lz4_frame is not None:
+        codecs.append('lz4')
+    codecs.append('zlib')
+    return codecs
+
+
+def compress_array(array: np.ndarray, codec: str = None, chunk_size: int = _CHUNK_SIZE) -> CompressedArray:
+    """
+    Compresses an array by chunks of about chunk_size bytes. Bytes of the items are shuffled
+    before compression (low-count detector frames then compress several times better),
+    blosc does it internally, for lz4 and zlib it is done in NumPy.
+    """
+    codec = codec or available_codecs()[0]
+    array = np.ascontiguousarray(array)
+    itemsize = array.dtype.itemsize
+    data = array.reshape(-1).view(np.uint8)
+    step = max(chunk_size // itemsize, 1) * itemsize
+    chunks = tuple(_compress_chunk(data[i:i + step], itemsize, codec) for i in range(0, data.size, step))
+    return CompressedArray(chunks, array.shape, array.dtype.str, codec, step)
+
+
+def decompress_array(compressed: CompressedArray, executor: ThreadPoolExecutor = None) -> np.ndarray:
+    """
+    Decompresses an array into a new read-only array. If executor is provided,
+    chunks are decompressed by its worker threads in parallel (codecs release the GIL).
+    """
+    dtype = np.dtype(compressed.dtype)
+    buffer = np.empty(int(np.prod(compressed.shape)) * dtype.itemsize, dtype=np.uint8)
+    step = compressed.chunk_size
+
+    def decompress(i: int):
+        buffer[i * step:(i + 1) * step] = _decompress_chunk(compressed.chunks[i], dtype.itemsize, compressed.codec)
+
+    indices = range(len(compressed.chunks))
+    if executor is not None and len(compressed.chunks) > 1:
+        list(executor.map(decompress, indices))
+    else:
+        for i in indices:
+            decompress(i)
+
+    array = buffer.view(dtype).reshape(compressed.shape)
+    array.flags.writeable = False
+    return array
+
+
+class CompressedLRUCache(ByteLRUCache):
+    """
+    ByteLRUCache of arrays that keeps them compressed, so that several times more frames fit
+    into the same memory budget. Arrays are compressed by a worker thread after they are stored
+    (until then they are returned as they are), and decompressed on access by worker threads.
+    Memory-mapped arrays are stored as they are, since rereading them is cheaper than decompression.
+    Each of them keeps a file descriptor open, so their number is limited by max_mapped
+    (the least recently used ones are evicted first). Returned arrays are read-only.
+    """
+    MAX_MAPPED: int = 256
+
+    def __init__(self, max_bytes: int, codec: str = None, max_workers: int = 2, max_mapped: int = MAX_MAPPED):
+        super().__init__(max_bytes, get_size=_stored_nbytes)
+        self.codec: str = codec or available_codecs()[0]
+        self.max_mapped: int = max_mapped
+        self._mapped = set()
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='CompressedLRUCache')
+        self._decompressor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='CompressedLRUCache')
+
+    def get(self, key: Hashable, default=None):
+        value = super().get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        if isinstance(value, CompressedArray):
+            return decompress_array(value, self._decompressor)
+        return value
+
+    def pop(self, key: Hashable, default=None):
+        value = super().pop(key, _MISSING)
+        if value is _MISSING:
+            return default
+        if isinstance(value, CompressedArray):
+            return decompress_array(value, self._decompressor)
+        return value
+
+    def set(self, key: Hashable, value) -> bool:
+        is_mapped = isinstance(value, np.ndarray) and _is_memory_mapped(value)
+        with self._lock:
+            is_stored = super().set(key, value)
+            if is_stored and is_mapped:
+                self._add_mapped(key)
+        if is_stored and isinstance(value, np.ndarray) and value.size and not is_mapped:
+            self._compressor.submit(self._compress, key, value)
+        return is_stored
+
+    @property
+    def mapped_num(self) -> int:
+        with self._lock:
+            self._mapped.intersection_update(self._data.keys())
+            return len(self._mapped)
+
+    def _add_mapped(self, key: Hashable):
+        self._mapped.add(key)
+        # evicted entries are removed from the set lazily
+        self._mapped.intersection_update(self._data.keys())
+        if len(self._mapped) <= self.max_mapped:
+            return
+        for mapped_key in [k for k in self._data.keys() if k in self._mapped][:len(self._mapped) - self.max_mapped]:
+            self._remove(mapped_key)
+            self._mapped.discard(mapped_key)
+
+    @property
+    def compressed_nbytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes[key] for key, value in self._data.items() if isinstance(value, CompressedArray))
+
+    def _compress(self, key: Hashable, value: np.ndarray):
+        with self._lock:
+            if self._data.get(key) is not value:
+                return
+        compressed = compress_array(value, self.codec)
+        with self._lock:
+            if self._data.get(key) is value:
+                self._replace(key, compressed)
+
+
+def _compress_chunk(data: np.ndarray, itemsize: int, codec: str) -> bytes:
+    if codec == 'blosc':
+        return blosc.compress(data.tobytes(), typesize=itemsize, clevel=5, shuffle=blosc.SHUFFLE, cname='lz4')
+    data = _shuffle(data, itemsize)
+    if codec == 'lz4':
+        return lz4_frame.compress(data)
+    elif codec == 'zlib':
+        return zlib.compress(data, 1)
+    raise ValueError(f'Unknown codec {codec}.')
+
+
+def _decompress_chunk(chunk: bytes, itemsize: int, codec: str) -> np.ndarray:
+    if codec == 'blosc':
+        return np.frombuffer(blosc.decompress(chunk), dtype=np.uint8)
+    elif codec == 'lz4':
+        data = lz4_frame.decompress(chunk)
+    elif codec == 'zlib':
+        data = zlib.decompress(chunk)
+    else:
+        raise ValueError(f'Unknown codec {codec}.')
+    return _unshuffle(np.frombuffer(data, dtype=np.uint8), itemsize)
+
+
+def _shuffle(data: np.ndarray, itemsize: int) -> bytes:
+    if itemsize == 1:
+        return data.tobytes()
+    return data.reshape(-1, itemsize).T.tobytes()
+
+
+def _unshuffle(data: np.ndarray, itemsize: int) -> np.ndarray:
+    if itemsize == 1:
+        return data
+    return data.reshape(itemsize, -1).T.reshape(-1)
+
+
+def _is_memory_mapped(array: np.ndarray) -> bool:
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return True
+        base = getattr(base, 'base', None)
+    return False
+
+
+def _stored_nbytes(value) -> int:
+    if isinstance(value, CompressedArray):
+        return value.nbytes
+    return get_nbytes(value)
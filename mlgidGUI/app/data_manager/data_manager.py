@@ -80,7 +80,8 @@ class DataManager(object):
         copyfile(source_img_path, dest_img_path)
 
         img_key = self._fm.add_root_path_to_project(dest_img_path)
-        self._fm.change_image(img_key)
+        if isinstance(img_key, ImageKey):
+            self._fm.change_image(img_key)
 
     def import_cif(self, source_cif_path: Path):
         # create source folder if not already created
@@ -129,8 +130,9 @@ class DataManager(object):
 
 
     def load_image_data(self, key: ImageKey,
-                        flags: ImageDataFlags = ImageDataFlags.ALL) -> ImageData:
-        return load_image_data(self._fm, self._image_holder, key, flags)
+                        flags: ImageDataFlags = ImageDataFlags.ALL,
+                        preview_size: int = None) -> ImageData:
+        return load_image_data(self._fm, self._image_holder, key, flags, preview_size)
 
     def load_folder_data(self, key: FolderKey,
                          flags: FolderDataFlags = FolderDataFlags.ALL) -> FolderData:
@@ -1,11 +1,18 @@
 import os
+import logging
+
 from h5py import File, Group
 from PIL import Image
 from pathlib import Path
 
 from ..geometry import Geometry
+from ..polar_image import InterpolationParams
 from ..rois import RoiData
 from ..file_manager import ImagePathKey, FileManager, keys
+from ..file_manager.h5_storage import read_polar_dataset
+
+
+logger = logging.getLogger(__name__)
 
 
 class ImportProjectFromH5(object):
@@ -29,7 +36,8 @@ class ImportProjectFromH5(object):
 
                 folder_key = self.fm.add_root_path_to_project(folder_path)
 
-                self.fm.geometries.default[folder_key] = Geometry.fromdict(dict(group.attrs))
+                default_geometry = Geometry.fromdict(dict(group.attrs))
+                self.fm.geometries.default[folder_key] = default_geometry
 
                 for idx, (img_name, img_data) in enumerate(_parse_imgs_from_h5_group(group)):
                     img = img_data['image']
@@ -38,9 +46,24 @@ class ImportProjectFromH5(object):
                     Image.fromarray(img).save(img_path,'tiff')
                     img_key = ImagePathKey(project_path, folder_key, path=img_path, idx=idx)
                     folder_key._image_children.append(img_key)
-                    self.fm.polar_images[img_key] = img_data.get('polar_image', None)
+                    geometry = img_data.get('geometry', None)
+                    if geometry is not None:
+                        self.fm.geometries[img_key] = geometry
+                    polar_image = img_data.get('polar_image', None)
+                    if polar_image is not None:
+                        self._set_polar_image(img_key, img, polar_image, geometry or default_geometry)
                     self.fm.rois_data[img_key] = img_data.get('roi_data', None)
 
+    def _set_polar_image(self, img_key: ImagePathKey, img, polar_image, geometry: Geometry):
+        # polar images are stored with the geometry they were calculated with, so that they are valid on read.
+        # The interpolation is not exported, polar images are assumed to be calculated with the default one.
+        geometry = geometry.copy()
+        geometry.set_shape(geometry.t(img).shape)
+        if tuple(polar_image.shape) != tuple(geometry.polar_shape):
+            logger.warning(f'Polar image of {img_key} does not match its geometry and is not imported.')
+            return
+        self.fm.polar_images.set(img_key, polar_image, geometry, InterpolationParams().algorithm)
+
 
 def _parse_imgs_from_h5_group(h5group: Group, skip_empty_imgs: bool = False):
     for img_name, img_group in h5group.items():
@@ -59,9 +82,12 @@ def _parse_imgs_from_h5_group(h5group: Group, skip_empty_imgs: bool = False):
             elif skip_empty_imgs:
                 continue
 
-            for key in ('image', 'polar_image'):
-                if key in img_group:
-                    img_data[key] = img_group[key][()]
+            if 'image' in img_group:
+                img_data['image'] = img_group['image'][()]
+            if 'polar_image' in img_group:
+                img_data['polar_image'] = read_polar_dataset(img_group['polar_image'])
+            if 'beam_center' in img_group.attrs:
+                img_data['geometry'] = Geometry.fromdict(dict(img_group.attrs))
 
             yield img_name, img_data
         except:
@@ -13,6 +13,7 @@ class ImageData(NamedTuple):
     geometry: Geometry
     default_geometry: bool
     roi_data: RoiData
+    preview_step: int = 1  # the image is every preview_step-th pixel of the full image
 
 
 class ImageDataFlags(Flag):
@@ -36,12 +37,18 @@ class FolderDataFlags(Flag):
 
 
 def load_image_data(fm: FileManager, image_holder: ImageHolder, image_key: ImageKey,
-                    flags: ImageDataFlags = ImageDataFlags.ALL) -> ImageData:
+                    flags: ImageDataFlags = ImageDataFlags.ALL, preview_size: int = None) -> ImageData:
+    """
+    Loads the requested image data. If preview_size is provided and the polar image is not
+    requested, the image is read with a stride so that its largest side does not exceed
+    preview_size (h5 images are then read only partially).
+    """
     image = None
     polar_image = None
     geometry = None
     default_geometry = True
     roi_data = None
+    preview_step = 1
 
     if ImageDataFlags.GEOMETRY in flags or ImageDataFlags.IMAGE in flags:
         geometry = fm.geometries[image_key]
@@ -54,7 +61,13 @@ def load_image_data(fm: FileManager, image_holder: ImageHolder, image_key: Image
         image, polar_image, _ = image_holder.get_data_by_key(image_key)
     else:
         if ImageDataFlags.IMAGE in flags:
-            image = image_key.get_image()
+            if preview_size:
+                lazy_image = fm.images.get_lazy(image_key)
+                if lazy_image is not None:
+                    preview_step = lazy_image.preview_step(preview_size)
+                    image = lazy_image.preview(preview_size)
+            else:
+                image = fm.images[image_key]
             if image is not None:
                 if geometry:
                     image = geometry.t(image)
@@ -64,7 +77,7 @@ def load_image_data(fm: FileManager, image_holder: ImageHolder, image_key: Image
     return ImageData(image_key=image_key, image=image,
                      polar_image=polar_image, geometry=geometry,
                      default_geometry=default_geometry,
-                     roi_data=roi_data)
+                     roi_data=roi_data, preview_step=preview_step)
 
 def load_folder_data(self, folder_key: FolderKey, flags: FolderDataFlags = None) -> FolderData:
     roi_metadata = None
@@ -1,3 +1,4 @@
+import logging
 from typing import List
 from pathlib import Path
 
@@ -5,12 +6,19 @@ from h5py import File, Group
 import numpy as np
 
 from ..geometry import Geometry
+from ..dtype_policy import float_dtype
+from ..rois import RoiData
 from .saving_parameters import SavingParameters, SaveMode
 from ..file_manager import (FileManager, FolderKey, ImageKey,
-                            IMAGE_PROJECT_KEY, PROJECT_KEY)
+                            IMAGE_PROJECT_KEY, PROJECT_KEY, H5_FILE_POOL)
 from ..image_holder import ImageHolder
 from .load_data import ImageData, ImageDataFlags, load_image_data
 
+logger = logging.getLogger(__name__)
+
+# seconds to wait for background reads (prefetcher, thumbnails) to release a file before writing it
+RELEASE_TIMEOUT: float = 10.
+
 
 class SaveH5(object):
     def __init__(self, fm: FileManager, image_holder: ImageHolder):
@@ -22,10 +30,16 @@ class SaveH5(object):
         filepath = _get_h5_path(params.path)
 
         save_successfull = _init_h5_project_file(filepath, params)
+        if not save_successfull:
+            return False
         path_str: str = str(filepath.resolve())
 
-        for folder_key, image_keys in params.selected_images.items():
-            self._save_folder_as_h5(path_str, folder_key, image_keys, params)
+        try:
+            for folder_key, image_keys in params.selected_images.items():
+                self._save_folder_as_h5(path_str, folder_key, image_keys, params)
+        except IOError as err:
+            logger.error(err)
+            return False
 
         return save_successfull
 
@@ -42,6 +56,7 @@ class SaveH5(object):
             with File(path_str, 'r') as f:
                 count = len(list(f.keys()))
 
+        _release_h5_file(path_str)
         with File(path_str, 'a') as f:
             for _, image_keys in params.selected_images.items():
                 for image_key in image_keys:
@@ -78,6 +93,7 @@ class SaveH5(object):
         if not image_keys:
             return
 
+        _release_h5_file(path)
         with File(path, 'a') as f:
             group = _get_folder_group(f, folder_key.name)
 
@@ -110,18 +126,21 @@ class SaveH5(object):
         img_group = h5group.create_group(image_key.name)
         img_group.attrs[IMAGE_PROJECT_KEY] = True
 
-        polar_image = load_image_data(self._fm, self._image_holder, image_key, ImageDataFlags.POLAR_IMAGE).polar_image
-
         if params.save_image:
-            self._fm.images.set_h5(img_group, image_key, image_key.get_image())
+            self._fm.images.set_h5(img_group, image_key, self._fm.images[image_key], params.storage)
 
-        if params.save_polar_image and polar_image is not None:
-            self._fm.polar_images.set_h5(img_group, image_key, polar_image)
+        if params.save_polar_image:
+            polar_image = load_image_data(self._fm, self._image_holder, image_key,
+                                          ImageDataFlags.POLAR_IMAGE).polar_image
+            if polar_image is not None:
+                self._fm.polar_images.set_h5(img_group, image_key, polar_image, params.storage)
 
         roi_data = self._fm.rois_data[image_key]
 
         if roi_data:
-            self._fm.rois_data.set_h5(img_group, image_key, roi_data)
+            self._fm.rois_data.set_h5(img_group, image_key, roi_data, params.storage)
+            if params.save_angular_profiles:
+                self._save_angular_profiles(img_group, image_key, roi_data)
 
         geometry = self._fm.geometries[image_key]
 
@@ -129,12 +148,29 @@ class SaveH5(object):
             self._fm.geometries.set_h5(img_group, image_key, geometry)
 
 
+    def _save_angular_profiles(self, h5group: Group, image_key: ImageKey, roi_data: RoiData):
+        """
+        Saves the angular profiles of the rois (datasets named by roi keys) with the phi axis.
+        Only the radial bands of the rois are remapped if the polar image is not stored.
+        """
+        group = h5group.create_group('angular_profiles')
+
+        for roi in roi_data.values():
+            polar_part, phi_axis, _ = self._image_holder.get_polar_window_by_key(image_key, roi.r_range)
+            if polar_part is None:
+                continue
+            if 'phi' not in group:
+                group.create_dataset('phi', data=phi_axis)
+            group.create_dataset(str(roi.key), data=np.nanmean(polar_part, axis=1, dtype=float_dtype()))
+
+
 def _init_h5_project_file(filepath: Path, params: SavingParameters) -> bool:
     try:
         if not filepath.parent.exists():
             raise IOError(f'Parent folder {filepath.parent} does not exist.')
 
         path_str: str = str(filepath.resolve())
+        _release_h5_file(path_str)
 
         if filepath.exists() and params.save_mode.value == SaveMode.create.value:
             raise IOError(f'File {path_str} already exists.')
@@ -148,11 +184,18 @@ def _init_h5_project_file(filepath: Path, params: SavingParameters) -> bool:
             with File(path_str, 'w') as f:
                 f.attrs[PROJECT_KEY] = True
         return True
-    except:
+    except Exception as err:
+        logger.error(err)
         return False
 
 
 
+def _release_h5_file(path: str) -> None:
+    # h5 files cannot be opened for writing while they are open for reading
+    if not H5_FILE_POOL.close(path, timeout=RELEASE_TIMEOUT):
+        raise IOError(f'File {path} is in use and cannot be written, try again later.')
+
+
 def _get_h5_path(path: Path) -> Path:
     path = path.resolve()
     if path.suffix != '.h5':
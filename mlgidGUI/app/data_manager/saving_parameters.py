@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Dict, List
 from pathlib import Path
 
-from ..file_manager import FolderKey, ImageKey
+from ..file_manager import FolderKey, ImageKey, H5StoragePolicy
 
 
 class SaveFormats(Enum):
@@ -47,11 +47,13 @@ class SavingParameters:
     save_roi_types: bool = True
     save_roi_keys: bool = True
     save_roi_metadata: bool = True
+    save_angular_profiles: bool = False
 
     format: SaveFormats = SaveFormats.entire_h5
     text_format: TextFormats = TextFormats.csv
     meta_text_format: MetaTextFormats = MetaTextFormats.yaml
     roi_saving_type: RoiSavingType = RoiSavingType.group_by_image
+    storage: H5StoragePolicy = field(default_factory=H5StoragePolicy)
 
     BOOL_FLAGS = {'save_image': 'Save images',
                   'save_polar_image': 'Save polar images',
@@ -61,6 +63,7 @@ class SavingParameters:
                   'save_roi_types': 'Save roi types',
                   'save_roi_keys': 'Save roi keys',
                   'save_roi_metadata': 'Save roi names',
+                  'save_angular_profiles': 'Save angular profiles of rois',
                   }
 
     def set_entire_h5_params(self):
@@ -72,6 +75,7 @@ class SavingParameters:
         self.save_roi_types: bool = True
         self.save_roi_keys: bool = True
         self.save_roi_metadata: bool = True
+        self.save_angular_profiles: bool = False
 
     def set_partial_h5_params(self):
         self.save_image: bool = False
@@ -82,6 +86,7 @@ class SavingParameters:
         self.save_roi_types: bool = True
         self.save_roi_keys: bool = False
         self.save_roi_metadata: bool = False
+        self.save_angular_profiles: bool = True
 
     @property
     def num_images(self) -> int:
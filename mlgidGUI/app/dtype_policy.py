@@ -0,0 +1,35 @@
+import numpy as np
+
+__all__ = ['FLOAT_DTYPES', 'DEFAULT_FLOAT_DTYPE', 'float_dtype', 'set_float_dtype', 'as_float']
+
+FLOAT_DTYPES = ('float32', 'float64')
+DEFAULT_FLOAT_DTYPE = 'float32'
+
+_float_dtype: np.dtype = np.dtype(DEFAULT_FLOAT_DTYPE)
+
+
+def float_dtype() -> np.dtype:
+    """
+    Floating point type of the arrays calculated from images: images converted for calculations,
+    polar grids and images, reciprocal space maps and profiles. Set per project by FileManager.
+    """
+    return _float_dtype
+
+
+def set_float_dtype(dtype) -> None:
+    global _float_dtype
+
+    dtype = np.dtype(dtype)
+    if dtype.name not in FLOAT_DTYPES:
+        raise ValueError(f'Unsupported float type {dtype.name}, expected one of {", ".join(FLOAT_DTYPES)}.')
+    _float_dtype = dtype
+
+
+def as_float(arr, contiguous: bool = False) -> np.ndarray:
+    """
+    Converts the array to the float type. Arrays of this type (and contiguous ones if
+    contiguous is True) are returned as they are, so conversions never copy twice.
+    """
+    if contiguous:
+        return np.ascontiguousarray(arr, dtype=_float_dtype)
+    return np.asarray(arr, dtype=_float_dtype)
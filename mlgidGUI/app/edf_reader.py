@@ -2,14 +2,18 @@
 Interface functions for reading edf files and saving images as edf.
 """
 
-from typing import Union, Tuple, List, Dict
+from typing import Union, Tuple, List, Dict, Sequence
 from pathlib import Path
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 import gzip
+import mmap
+import struct
+import zlib
 
 import numpy as np
 
-__all__ = ['read_edf', 'CorruptedFileError']
+__all__ = ['read_edf', 'read_edf_series', 'read_edf_header', 'CorruptedFileError']
 
 
 class CorruptedFileError(ValueError):
@@ -19,11 +23,17 @@ class CorruptedFileError(ValueError):
 
 
 def read_edf(filepath: Union[Path, str, BytesIO], header_dict: dict = None,
-             return_dict: bool = False) -> Union[np.ndarray, Tuple[np.ndarray, dict]]:
+             return_dict: bool = False, use_mmap: bool = True) -> Union[np.ndarray, Tuple[np.ndarray, dict]]:
     """
     Parses .edf file and returns numpy array if successful. If return_dict is True,
     returns tuple of image and header dict. If header_dict is provided, uses it instead of
-    parsing the file header, it may accelerate reading.
+    parsing the file header, it may accelerate reading. The provided header_dict is only
+    trusted if the file size and the header end position match it, otherwise the header
+    is parsed from the file.
+
+    Uncompressed .edf files are memory-mapped by default, and the returned image is a
+    read-only view of the file payload (no copy is made). Compressed .edf.gz files
+    are inflated chunk by chunk directly into a preallocated image buffer.
 
     Raises CorruptedFileError if any parsing error occurs.
 
@@ -31,16 +41,72 @@ def read_edf(filepath: Union[Path, str, BytesIO], header_dict: dict = None,
     :param header_dict: dict = None. Optional, use to accelerate parsing. Should contain
     the following keys: 'headerSize', 'Size', 'DataType', 'Dim_1', 'Dim_2'.
     :param return_dict: bool = False. If True, returns header_dict along with the image.
+    :param use_mmap: bool = True. If False, uncompressed files are read into memory.
     :return: np.ndarray if not return_dict else Tuple[np.ndarray, dict]]
     """
-    data = _get_data_from_filepath(filepath)  # type: bytes
-    image, header_dict = _read_edf_from_data(data, header_dict)  # type: np.ndarray, dict
+    if isinstance(filepath, str):
+        filepath = Path(filepath)
+
+    if use_mmap and isinstance(filepath, Path) and filepath.suffix == '.edf':
+        image, header_dict = _read_edf_mmap(filepath, header_dict)  # type: np.ndarray, dict
+    elif isinstance(filepath, Path) and filepath.suffix == '.gz':
+        image, header_dict = _read_edf_gz(filepath, header_dict)  # type: np.ndarray, dict
+    else:
+        data = _get_data_from_filepath(filepath)  # type: bytes
+        image, header_dict = _read_edf_from_data(data, header_dict)  # type: np.ndarray, dict
     if return_dict:
         return image, header_dict
     else:
         return image
 
 
+def read_edf_series(filepaths: Sequence[Union[Path, str]], header_dict: dict = None,
+                    max_workers: int = None) -> List[np.ndarray]:
+    """
+    Reads several .edf or .edf.gz frames concurrently in a thread pool and returns
+    the images in the order of filepaths. Decompression and file reading release the GIL,
+    so compressed series are decoded in parallel.
+
+    Raises CorruptedFileError if any of the files cannot be parsed.
+
+    :param filepaths: Sequence[Union[Path, str]]. Frames to read.
+    :param header_dict: dict = None. Optional header template shared by the frames (see read_edf).
+    :param max_workers: int = None. Number of threads, defaults to ThreadPoolExecutor default.
+    :return: List[np.ndarray]
+    """
+    if not filepaths:
+        return []
+    if header_dict is None:
+        _, header_dict = read_edf(filepaths[0], return_dict=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda path: read_edf(path, header_dict=header_dict), filepaths))
+
+
+def read_edf_header(filepath: Union[Path, str]) -> Dict[str, str]:
+    """
+    Reads only the header of an .edf or .edf.gz file (the first few KB, pixel data are not read).
+    Unlike the header dict used for reading images, values keep their inner spaces,
+    so that lists such as motor_mne and motor_pos can be split.
+    """
+    filepath = Path(filepath)
+    open_file = gzip.open if filepath.name.endswith('.gz') else open
+
+    with open_file(str(filepath), 'rb') as f:
+        data = _read_header_bytes(f)
+
+    header_end_index = data.find(b'}\n')
+    if header_end_index == -1:
+        raise CorruptedFileError(f'Could not find edf header.')
+    header = data[1:header_end_index].decode('utf-8', errors='replace')
+
+    header_dict = {}
+    for item in header.split(';'):
+        key, sep, value = item.partition('=')
+        if sep and key.strip():
+            header_dict[key.strip()] = value.strip()
+    return header_dict
+
+
 def _get_data_from_filepath(filepath: Union[Path, str, BytesIO]) -> bytes:
     if isinstance(filepath, str):
         filepath = Path(filepath)
@@ -63,22 +129,166 @@ def _get_data_from_filepath(filepath: Union[Path, str, BytesIO]) -> bytes:
         raise TypeError(f'Unknown filepath type {type(filepath).__name__}')
 
 
+def _read_edf_mmap(filepath: Path, header_dict: dict = None) -> Tuple[np.ndarray, dict]:
+    if not filepath.is_file():
+        raise FileNotFoundError(f'File {filepath} does not exist.')
+
+    with open(str(filepath), 'rb') as f:
+        file_size = f.seek(0, 2)
+        if not _header_matches(header_dict, file_size, lambda end: _read_bytes(f, end - 2, 2)):
+            f.seek(0)
+            header_dict = _read_header_from_file(f)
+        header_end_index, image_size, data_type, image_shape = _get_image_params(header_dict)
+        if header_end_index + image_size > file_size:
+            raise CorruptedFileError(f'Could not read edf file, file {filepath} is truncated.')
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        data = np.frombuffer(buffer, data_type, count=image_size // np.dtype(data_type).itemsize,
+                             offset=header_end_index)  # type: np.ndarray
+        data = np.rot90(np.reshape(data, image_shape))
+    except ValueError as err:
+        raise CorruptedFileError(f'Could not read edf file, header parameters may be wrong: {err}.')
+    return data, header_dict
+
+
+def _read_edf_gz(filepath: Path, header_dict: dict = None) -> Tuple[np.ndarray, dict]:
+    if not filepath.is_file():
+        raise FileNotFoundError(f'File {filepath} does not exist.')
+
+    with open(str(filepath), 'rb') as f:
+        file_size = _gzip_uncompressed_size(f)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        head = b''
+        while head.find(b'}\n') == -1 and len(head) < _MAX_HEADER_SIZE:
+            block = _inflate(f, decompressor, _HEADER_BLOCK_SIZE)
+            if block is None:
+                break
+            head += block
+
+        if not _header_matches(header_dict, file_size, lambda end: head[end - 2:end]):
+            header_dict = _read_header_from_data(head)
+        header_end_index, image_size, data_type, image_shape = _get_image_params(header_dict)
+
+        buffer = np.empty(image_size, dtype=np.uint8)
+        view = memoryview(buffer)
+        pos = min(len(head) - header_end_index, image_size)
+        view[:pos] = head[header_end_index:header_end_index + image_size]
+
+        while pos < image_size:
+            block = _inflate(f, decompressor, image_size - pos)
+            if block is None:
+                raise CorruptedFileError(f'Could not read edf file, file {filepath} is truncated.')
+            view[pos:pos + len(block)] = block
+            pos += len(block)
+
+    try:
+        data = np.rot90(np.reshape(buffer.view(data_type), image_shape))
+    except ValueError as err:
+        raise CorruptedFileError(f'Could not read edf file, header parameters may be wrong: {err}.')
+    return data, header_dict
+
+
+_GZ_CHUNK_SIZE = 2 ** 20
+
+
+def _inflate(f, decompressor, max_length: int) -> bytes or None:
+    """
+    Returns up to max_length decompressed bytes, reading the compressed stream
+    from f when the decompressor has no pending input. Returns None at the end of file.
+    """
+    data = decompressor.unconsumed_tail
+    if not data:
+        data = f.read(_GZ_CHUNK_SIZE)
+        if not data:
+            return
+    try:
+        return decompressor.decompress(data, max_length)
+    except zlib.error as err:
+        raise CorruptedFileError(f'Could not decompress edf file: {err}')
+
+
+def _gzip_uncompressed_size(f) -> int or None:
+    """
+    Reads the uncompressed size (modulo 2 ** 32) from the gzip trailer.
+    """
+    size = None
+    if f.seek(0, 2) >= 4:
+        f.seek(-4, 2)
+        size = struct.unpack('<I', f.read(4))[0]
+    f.seek(0)
+    return size
+
+
 def _read_edf_from_data(data: bytes, header_dict: dict = None):
-    header_dict = header_dict or _read_header_from_data(data)
+    if not _header_matches(header_dict, len(data), lambda end: data[end - 2:end]):
+        header_dict = _read_header_from_data(data)
+    header_end_index, image_size, data_type, image_shape = _get_image_params(header_dict)
+    raw_image_data = data[header_end_index:header_end_index + image_size]  # type: bytes
+
     try:
-        header_end_index = header_dict['headerSize']
+        data = np.frombuffer(raw_image_data, data_type)  # type: np.ndarray
+        data = np.rot90(np.reshape(data, image_shape))
+    except ValueError as err:
+        raise CorruptedFileError(f'Could not read edf file, header parameters may be wrong: {err}.')
+    return data, header_dict
+
+
+def _get_image_params(header_dict: dict) -> Tuple[int, int, type, Tuple[int, int]]:
+    try:
+        header_end_index = int(header_dict['headerSize'])
         image_size = int(header_dict['Size'])
-        raw_image_data = data[header_end_index:header_end_index + image_size]  # type: bytes
         data_type = _get_numpy_type(header_dict['DataType'])
         image_shape = (int(header_dict['Dim_2']), int(header_dict['Dim_1']))
     except KeyError as err:
         raise CorruptedFileError(f'Header dict misses key: {err}')
-    except IndexError as err:
+    except (IndexError, ValueError) as err:
         raise CorruptedFileError(f'Could not read edf file, header parameters may be wrong: {err}.')
+    return header_end_index, image_size, data_type, image_shape
 
-    data = np.frombuffer(raw_image_data, data_type)  # type: np.ndarray
-    data = np.rot90(np.reshape(data, image_shape))
-    return data, header_dict
+
+def _header_matches(header_dict: dict or None, file_size: int, read_header_end) -> bool:
+    """
+    Checks whether a header dict learned from another frame of the same series
+    describes the current file: the file size should be equal to the header size plus
+    the image size, and the header should end right before the image data.
+    """
+    if not header_dict or file_size is None:
+        return False
+    try:
+        header_end_index = int(header_dict['headerSize'])
+        image_size = int(header_dict['Size'])
+    except (KeyError, ValueError):
+        return False
+    if header_end_index < 2 or header_end_index + image_size != file_size:
+        return False
+    return read_header_end(header_end_index) == b'}\n'
+
+
+def _read_bytes(f, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    return f.read(size)
+
+
+_HEADER_BLOCK_SIZE = 512
+_MAX_HEADER_SIZE = 2 ** 20
+
+
+def _read_header_from_file(f) -> dict:
+    return _read_header_from_data(_read_header_bytes(f))
+
+
+def _read_header_bytes(f) -> bytes:
+    data = b''
+    while len(data) < _MAX_HEADER_SIZE:
+        block = f.read(_HEADER_BLOCK_SIZE)
+        if not block:
+            break
+        data += block
+        if data.find(b'}\n', max(len(data) - len(block) - 1, 0)) != -1:
+            break
+    return data
 
 
 def _read_header_from_data(data: bytes) -> dict:
@@ -1,24 +1,37 @@
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Callable
 
 from h5py import Group
 
 from PyQt5.QtCore import pyqtSignal, QObject
 
-from .keys import (FolderKey, FolderH5Key, FolderPathKey, RemoveWeakrefs,
+from .keys import (AbstractKey, FolderKey, FolderH5Key, FolderPathKey, RemoveWeakrefs,
                    ImageKey, ImageH5Key, ImagePathKey, InvalidKey, CIFFileKey,
+                   FrameKey, FolderH5StackKey, ImageH5FrameKey, FolderTiffStackKey, ImageTiffFrameKey,
+                   FolderNexusKey, ImageNexusFrameKey,
                    PROJECT_KEY, IMAGE_PROJECT_KEY, GLOB_IMAGE_FORMATS)
 
 from .project_structure import ProjectStructure, ProjectRootKey
+from .h5_pool import H5FilePool, H5_FILE_POOL
+from .h5_filters import missing_filters
+from .h5_storage import H5StoragePolicy, PolarImageDtype, available_compressions
+from .lazy_image import LazyImage, ArrayImage, LazyH5Image, LazyTiffImage
 from .read_images import _ReadImage, _ReadNpy
 from .read_polar_images import _ReadPolarImage
+from .read_thumbnails import _ReadThumbnails
+from .read_metadata_index import _ReadMetadataIndex
+from .read_acquisition_profiles import _ReadAcquisitionProfiles
 from .read_geometry import _ReadGeometry
 from .read_roi_data import _ReadRoiData
 from .read_meta_roi import _ReadMetaData
 from .read_radial_profile import _ReadRadialProfile
 from .config_manager import _GlobalConfigManager
 from .read_fits import _ReadFits
+from .read_project_settings import _ReadProjectSettings
+from ..acquisition_profile import AcquisitionProfile
+from ..geometry import clear_polar_grids
+from ..dtype_policy import DEFAULT_FLOAT_DTYPE, float_dtype, set_float_dtype
 from appdirs import user_data_dir
 from importlib import metadata
 
@@ -29,6 +42,7 @@ class FileManager(QObject):
     sigProjectClosed = pyqtSignal()
     sigProjectIsClosing = pyqtSignal()
     sigProjectOpened = pyqtSignal()
+    sigFloatDtypeChanged = pyqtSignal()
     sigNewFolder = pyqtSignal(object)
     sigNewFile = pyqtSignal(object)
     sigNewCIFFile = pyqtSignal()
@@ -45,12 +59,29 @@ class FileManager(QObject):
         self._project_structure: ProjectStructure = ProjectStructure()
         self.project_name: str = None
         self._current_key: ImageKey or None = None
+        self._data_changed_callbacks: List[Callable[[AbstractKey], None]] = []
         self.recent_projects = [p for p in self.recent_projects if p.is_dir()]
 
     @property
     def current_key(self) -> ImageKey or None:
         return self._current_key
 
+    def add_data_changed_callback(self, callback: Callable[[AbstractKey], None]) -> None:
+        """
+        Registers a callback called with the key whenever an image, polar image,
+        geometry or roi data is saved or deleted. Default geometries are reported with
+        the folder key. Callbacks may be called from any thread.
+        """
+        self._data_changed_callbacks.append(callback)
+
+    def _on_data_changed(self, key: AbstractKey) -> None:
+        for callback in self._data_changed_callbacks:
+            callback(key)
+
+    def _on_image_changed(self, key: AbstractKey) -> None:
+        del self.thumbnails[key]
+        self._on_data_changed(key)
+
     def open_latest_available_project(self):
         self.close_project()
         while self.recent_projects:
@@ -117,18 +148,96 @@ class FileManager(QObject):
         del self.rois_data[key]
         del self.images[key]
         del self.polar_images[key]
-
+        del self.thumbnails[key]
 
     def _delete_folder(self, key: FolderKey):
         for folder in key.folder_children:
             self._delete_folder(folder)
         for image in key.image_children:
             self._delete_image_data(image)
+        del self.metadata_index[key]
+        del self.acquisition_profiles[key]
+
+    def set_acquisition_profile(self, folder_key: FolderKey, profile: AcquisitionProfile) -> None:
+        """
+        Sets the binning and detector crop applied to the images of the folder (and its subfolders
+        without own profiles) at load time. Stored geometries are converted to the new profile,
+        polar images and thumbnails calculated with the previous profile are deleted.
+        Roi coordinates are kept, since the geometry scale follows the binning.
+        """
+        old_profile = self.acquisition_profiles.get(folder_key)
+        if profile == old_profile:
+            return
+        first_image = next(iter(folder_key.image_children), None)
+        if first_image is not None:
+            # raises ValueError if the crop is outside of the detector
+            profile.window(_detector_shape(first_image))
+
+        current_key = self._current_key
+        if current_key is not None and current_key in folder_key:
+            # geometry and rois of the current image are saved with the previous profile
+            self.change_image(None)
+
+        self._convert_folder_data(folder_key, old_profile, profile)
+        self.acquisition_profiles[folder_key] = profile
+
+        if current_key is not None and self._current_key is None:
+            self.change_image(current_key)
+
+    def _convert_folder_data(self, folder_key: FolderKey, old_profile: AcquisitionProfile,
+                             profile: AcquisitionProfile):
+        def convert(geometry, image_key: ImageKey):
+            shape = _detector_shape(image_key)
+            return profile.geometry_from_detector(old_profile.geometry_to_detector(geometry, shape), shape)
+
+        first_image = next(iter(folder_key.image_children), None)
+        default_geometry = self.geometries.default[folder_key]
+        if default_geometry is not None and first_image is not None:
+            self.geometries.default[folder_key] = convert(default_geometry, first_image)
+
+        for key in folder_key.image_children:
+            geometry = self.geometries[key]
+            if geometry is not None:
+                try:
+                    self.geometries[key] = convert(geometry, key)
+                except (OSError, KeyError, ValueError) as err:
+                    self.log.warning(f'Geometry of {key} cannot be converted to the acquisition profile: {err}')
+                    del self.geometries[key]
+            del self.polar_images[key]
+            del self.thumbnails[key]
+
+        for folder in folder_key.folder_children:
+            if self.acquisition_profiles[folder] is None:
+                self._convert_folder_data(folder, old_profile, profile)
+
+    def set_float_dtype(self, dtype) -> None:
+        """
+        Sets the float type of the arrays calculated from the images of the project
+        (float32 by default, float64 doubles the memory of polar images, grids and profiles).
+        Arrays of the previous type are dropped from the caches and the current image is reopened,
+        so that its polar image is calculated with the new type. Raises ValueError for unsupported types.
+        """
+        previous = float_dtype()
+        set_float_dtype(dtype)
+        if float_dtype() == previous:
+            return
+        if self.project_opened:
+            self.settings['float_dtype'] = float_dtype().name
+
+        self.polar_images.cache.clear()
+        clear_polar_grids()
+        self.sigFloatDtypeChanged.emit()
+
+        current_key = self._current_key
+        if current_key is not None:
+            self.change_image(None)
+            self.change_image(current_key)
 
     def close_project(self):
         if self.project_opened:
             self.sigProjectIsClosing.emit()
             self._project_structure.save_and_close()
+            set_float_dtype(DEFAULT_FLOAT_DTYPE)
             if self._project_folder not in self.recent_projects:
                 self.recent_projects.append(self._project_folder)
             self._project_folder = None
@@ -166,6 +275,12 @@ class FileManager(QObject):
         self._project_folder = path
         self._project_folder.mkdir(parents=False, exist_ok=True)
         self._project_structure.open_project(path)
+        self.settings: _ReadProjectSettings = _ReadProjectSettings(self._project_structure)
+        try:
+            set_float_dtype(self.settings['float_dtype'] or DEFAULT_FLOAT_DTYPE)
+        except (TypeError, ValueError) as err:
+            self.log.warning(f'Float type of the project is not supported, {DEFAULT_FLOAT_DTYPE} is used: {err}')
+            set_float_dtype(DEFAULT_FLOAT_DTYPE)
         self.images: _ReadImage = _ReadImage(self._project_structure)
         self.geometries: _ReadGeometry = _ReadGeometry(self._project_structure)
         self.polar_images: _ReadPolarImage = _ReadPolarImage(self._project_structure)
@@ -175,6 +290,15 @@ class FileManager(QObject):
         #self.fits = None
         #self.profiles = None
         self.profiles: _ReadRadialProfile = _ReadRadialProfile(self._project_structure)
+        self.thumbnails: _ReadThumbnails = _ReadThumbnails(self._project_structure)
+        self.metadata_index: _ReadMetadataIndex = _ReadMetadataIndex(self._project_structure)
+        self.acquisition_profiles: _ReadAcquisitionProfiles = _ReadAcquisitionProfiles(self._project_structure)
+        self.images.profiles = self.acquisition_profiles
+
+        for manager in (self.images, self.geometries, self.geometries.default,
+                        self.polar_images, self.rois_data, self.acquisition_profiles):
+            manager.on_change = self._on_data_changed
+        self.images.on_change = self._on_image_changed
 
         self.project_name = self._project_folder.name
         self.init_file_viewer()
@@ -197,5 +321,12 @@ def _give_h5_name(h5group: Group, name):
         num += 1
 
 
+def _detector_shape(key: ImageKey) -> tuple:
+    lazy_image = key.get_lazy_image()
+    if lazy_image is None:
+        raise ValueError(f'Image {key} is not available.')
+    return lazy_image.shape[:2]
+
+
 def _delete_project(project_path: Path):
     raise NotImplementedError
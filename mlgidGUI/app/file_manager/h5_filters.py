@@ -0,0 +1,35 @@
+import logging
+from typing import List
+
+from h5py import Dataset, h5z
+
+try:
+    # registers bitshuffle, LZ4, blosc and other compression filters with the HDF5 library used by h5py
+    import hdf5plugin
+except ImportError:
+    hdf5plugin = None
+
+__all__ = ['BSHUF_FILTER_ID', 'LZ4_FILTER_ID', 'missing_filters', 'check_filters']
+
+BSHUF_FILTER_ID = 32008
+LZ4_FILTER_ID = 32004
+
+logger = logging.getLogger(__name__)
+
+
+def missing_filters(dset: Dataset) -> List[int]:
+    """
+    Returns ids of the filters of the dataset that cannot be decoded by the local HDF5 installation.
+    Filter plugins are found in HDF5_PLUGIN_PATH or registered by the optional hdf5plugin package.
+    """
+    plist = dset.id.get_create_plist()
+    filter_ids = [plist.get_filter(i)[0] for i in range(plist.get_nfilters())]
+    return [filter_id for filter_id in filter_ids if not h5z.filter_avail(filter_id)]
+
+
+def check_filters(dset: Dataset) -> bool:
+    missing = missing_filters(dset)
+    if missing:
+        logger.warning(f'HDF5 filters {missing} required by {dset.file.filename}:{dset.name} are not available. '
+                       f'Install hdf5plugin or set HDF5_PLUGIN_PATH to read the data.')
+    return not missing
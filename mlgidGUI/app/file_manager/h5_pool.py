@@ -0,0 +1,141 @@
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock, Thread, Event, Condition
+from time import monotonic
+from typing import Dict, Tuple
+
+from h5py import File
+
+__all__ = ['H5FilePool', 'H5_FILE_POOL']
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledFile(object):
+    __slots__ = ('file', 'stamp', 'ref_count', 'last_used')
+
+    def __init__(self, file: File, stamp: Tuple[int, int]):
+        self.file = file
+        self.stamp = stamp
+        self.ref_count: int = 0
+        self.last_used: float = monotonic()
+
+
+class H5FilePool(object):
+    """
+    Keeps read-only h5py.File handles open between accesses, so that browsing
+    an h5 file does not reopen it for every key. Handles are reference counted,
+    closed after idle_timeout seconds without use and reopened if the file
+    has been modified (mtime or size changed) since it was opened.
+
+    Files that are going to be written by this process should be released with close()
+    first, since HDF5 does not allow opening a file for writing while it is open for reading.
+    """
+
+    def __init__(self, idle_timeout: float = 30.):
+        self.idle_timeout = idle_timeout
+        self._files: Dict[str, _PooledFile] = {}
+        self._lock = Lock()
+        self._released = Condition(self._lock)
+        self._stop_sweeping = Event()
+        self._sweeper: Thread or None = None
+
+    @contextmanager
+    def open(self, path: Path or str) -> File:
+        path = str(Path(path).resolve())
+        pooled = self._acquire(path)
+        try:
+            yield pooled.file
+        finally:
+            with self._lock:
+                pooled.ref_count -= 1
+                pooled.last_used = monotonic()
+                if not pooled.ref_count:
+                    self._released.notify_all()
+
+    def close(self, path: Path or str, timeout: float = 0) -> bool:
+        """
+        Closes the pooled handle of the file, waiting up to timeout seconds for it to be released
+        (e.g. by a background read). Returns False if the handle is still in use.
+        """
+        path = str(Path(path).resolve())
+        with self._lock:
+            if not self._released.wait_for(lambda: not self._in_use(path), timeout):
+                logger.warning(f'Could not close {path}: the file is in use.')
+                return False
+            pooled = self._files.pop(path, None)
+        if pooled is not None:
+            _close(pooled)
+        return True
+
+    def close_all(self):
+        with self._lock:
+            unused = [path for path, pooled in self._files.items() if not pooled.ref_count]
+            closed = [self._files.pop(path) for path in unused]
+        for pooled in closed:
+            _close(pooled)
+
+    def __contains__(self, path: Path or str):
+        return str(Path(path).resolve()) in self._files
+
+    def _in_use(self, path: str) -> bool:
+        pooled = self._files.get(path)
+        return pooled is not None and pooled.ref_count > 0
+
+    def _acquire(self, path: str) -> _PooledFile:
+        stamp = _file_stamp(path)
+        outdated = None
+
+        with self._lock:
+            pooled = self._files.get(path)
+            if pooled is not None and pooled.stamp != stamp and not pooled.ref_count:
+                outdated = self._files.pop(path)
+                pooled = None
+            if pooled is None:
+                pooled = _PooledFile(File(path, 'r'), stamp)
+                self._files[path] = pooled
+                self._start_sweeper()
+            pooled.ref_count += 1
+
+        if outdated is not None:
+            _close(outdated)
+        return pooled
+
+    def _start_sweeper(self):
+        if self._sweeper is None or not self._sweeper.is_alive():
+            self._sweeper = Thread(target=self._sweep_loop, name='H5FilePoolSweeper', daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop_sweeping.wait(self.idle_timeout / 2):
+            if not self._sweep():
+                return
+
+    def _sweep(self) -> bool:
+        now = monotonic()
+        with self._lock:
+            idle = [path for path, pooled in self._files.items()
+                    if not pooled.ref_count and now - pooled.last_used > self.idle_timeout]
+            closed = [self._files.pop(path) for path in idle]
+            has_files = bool(self._files)
+            if not has_files:
+                self._sweeper = None
+        for pooled in closed:
+            _close(pooled)
+        return has_files
+
+
+def _file_stamp(path: str) -> Tuple[int, int]:
+    stat = Path(path).stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _close(pooled: _PooledFile):
+    try:
+        pooled.file.close()
+    except Exception as err:
+        logger.exception(err)
+
+
+H5_FILE_POOL = H5FilePool()
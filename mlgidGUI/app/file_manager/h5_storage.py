@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Tuple, Union
+
+import numpy as np
+from h5py import Group, Dataset, h5z
+
+from ..dtype_policy import float_dtype, as_float
+
+__all__ = ['H5StoragePolicy', 'PolarImageDtype', 'available_compressions',
+           'create_dataset', 'create_polar_dataset', 'read_polar_dataset']
+
+_NAMED_FILTERS = {
+    'gzip': h5z.FILTER_DEFLATE,
+    'lzf': h5z.FILTER_LZF,
+    'szip': h5z.FILTER_SZIP,
+}
+
+_UINT16_NAN = np.iinfo(np.uint16).max
+
+
+class PolarImageDtype(Enum):
+    float32 = 'float32'
+    float16 = 'float16'
+    scaled_uint16 = 'scaled uint16'
+
+
+def available_compressions() -> List[str]:
+    """
+    Returns names of compression filters available in the local HDF5 installation.
+    """
+    return [name for name, filter_id in _NAMED_FILTERS.items() if h5z.filter_avail(filter_id)]
+
+
+@dataclass
+class H5StoragePolicy:
+    """
+    Describes how arrays are stored in exported h5 files.
+
+    compression is None, a filter name ('gzip', 'lzf', 'szip') or an id of any HDF5 filter
+    plugin available locally. chunks is None for h5py automatic chunking, or a chunk shape
+    clipped to the dataset shape. Polar images can be down-cast to float16 or to uint16
+    scaled to the image range (NaN values are stored as the maximal uint16 value).
+    """
+    compression: Union[str, int, None] = None
+    compression_opts: Union[int, tuple, None] = None
+    chunks: Tuple[int, ...] or None = None
+    shuffle: bool = False
+    polar_dtype: PolarImageDtype = PolarImageDtype.float32
+
+    def __post_init__(self):
+        if isinstance(self.compression, str) and self.compression not in _NAMED_FILTERS:
+            raise ValueError(f'Unknown compression {self.compression}.')
+        if isinstance(self.compression, int) and not h5z.filter_avail(self.compression):
+            raise ValueError(f'HDF5 filter {self.compression} is not available.')
+
+    @property
+    def is_filtered(self) -> bool:
+        return self.compression is not None or self.shuffle
+
+    def dataset_kwargs(self, shape: Tuple[int, ...]) -> dict:
+        if not self.is_filtered and not self.chunks:
+            return {}
+        if not shape or not all(shape):
+            # scalar and empty datasets cannot be chunked
+            return {}
+
+        kwargs = dict(shuffle=self.shuffle)
+        if self.compression is not None:
+            kwargs.update(compression=self.compression, compression_opts=self.compression_opts)
+        if self.chunks:
+            kwargs['chunks'] = tuple(min(c, s) for c, s in zip(self.chunks, shape))
+        else:
+            kwargs['chunks'] = True
+        return kwargs
+
+
+def create_dataset(h5group: Group, name: str, data, storage: H5StoragePolicy = None) -> Dataset:
+    data = np.asarray(data)
+    kwargs = storage.dataset_kwargs(data.shape) if storage else {}
+    return h5group.create_dataset(name, data=data, **kwargs)
+
+
+def create_polar_dataset(h5group: Group, name: str, image: np.ndarray, storage: H5StoragePolicy = None) -> Dataset:
+    polar_dtype = storage.polar_dtype if storage else PolarImageDtype.float32
+    attrs = {}
+
+    if polar_dtype == PolarImageDtype.float16:
+        image = image.astype(np.float16)
+    elif polar_dtype == PolarImageDtype.scaled_uint16:
+        image, offset, scale = _to_scaled_uint16(image)
+        attrs.update(offset=offset, scale=scale)
+
+    dset = create_dataset(h5group, name, image, storage)
+    dset.attrs.update(attrs)
+    return dset
+
+
+def read_polar_dataset(dset: Dataset) -> np.ndarray:
+    image = dset[()]
+    if image.dtype == np.uint16 and 'scale' in dset.attrs:
+        nan_mask = image == _UINT16_NAN
+        dtype = float_dtype()
+        image = image.astype(dtype) * dtype.type(dset.attrs['scale']) + dtype.type(dset.attrs['offset'])
+        image[nan_mask] = np.nan
+        return image
+    return as_float(image)
+
+
+def _to_scaled_uint16(image: np.ndarray) -> Tuple[np.ndarray, float, float]:
+    finite = np.isfinite(image)
+    if not finite.any():
+        return np.full(image.shape, _UINT16_NAN, dtype=np.uint16), 0., 1.
+    offset = float(np.min(image[finite]))
+    scale = float(np.max(image[finite]) - offset) / (_UINT16_NAN - 1) or 1.
+    scaled = np.full(image.shape, _UINT16_NAN, dtype=np.uint16)
+    scaled[finite] = np.rint((image[finite] - offset) / scale)
+    return scaled, offset, scale
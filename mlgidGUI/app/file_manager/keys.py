@@ -1,20 +1,24 @@
 import logging
 from os.path import splitext
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, List, Tuple, Union
 import re
 import weakref
 from abc import abstractmethod
 from copy import deepcopy
 from pathvalidate import sanitize_filename
 
-from ..read_image import read_image
+from ..read_image import read_image, tiff_stack_info
+from .h5_pool import H5_FILE_POOL
+from .h5_filters import check_filters
+from .lazy_image import LazyImage, ArrayImage, LazyH5Image, LazyTiffImage
 
-from h5py import File, Group, Dataset
+from h5py import Group, Dataset, ExternalLink
 
 AVAILABLE_IMAGE_FORMATS = tuple('.tif .tiff .edf .edf.gz'.split())
 GLOB_IMAGE_FORMATS = 'edf, tiff, h5 files (*.tiff *.edf *.tif *.edf.gz *.h5 *.hdf5)'
 H5_FORMAT = tuple('.h5 .hdf5'.split())
+TIFF_FORMAT = tuple('.tif .tiff'.split())
 CIF_EXTENSIONS = '.cif'
 CIF_FORMAT = 'CIF files (*.cif)'
 
@@ -26,7 +30,7 @@ logger = logging.getLogger(__name__)
 
 def _check_project(h5path: Path) -> bool or None:
     try:
-        with File(str(h5path.resolve()), 'r') as f:
+        with H5_FILE_POOL.open(h5path) as f:
             if PROJECT_KEY in f.attrs.keys():
                 return True
             else:
@@ -36,6 +40,40 @@ def _check_project(h5path: Path) -> bool or None:
         return
 
 
+# results of _is_tiff_stack by path with the (mtime, size) stamp of the file,
+# so that rescanning a folder opens only new or modified tiff files
+_TIFF_STACKS: Dict[str, Tuple[Tuple[int, int], bool]] = {}
+
+
+def _is_tiff_stack(path: Path) -> bool:
+    if path.suffix not in TIFF_FORMAT:
+        return False
+    try:
+        stat = path.stat()
+        stamp = stat.st_mtime_ns, stat.st_size
+        cached = _TIFF_STACKS.get(str(path))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        is_stack = tiff_stack_info(path)[0] > 1
+    except Exception as err:
+        logger.exception(err)
+        return False
+    _TIFF_STACKS[str(path)] = stamp, is_stack
+    return is_stack
+
+
+def _resolve_link(h5path: Path, group_key: str, name: str, link) -> Tuple[Path, str]:
+    # external links are opened through the file pool instead of the HDF5 external file cache,
+    # relative file names are resolved against the directory of the linking file.
+    if isinstance(link, ExternalLink):
+        return h5path.parent / link.filename, link.path
+    return h5path, '/'.join((group_key, name))
+
+
+def _has_external_links(group: Group) -> bool:
+    return any(isinstance(group.get(key, getlink=True), ExternalLink) for key in group.keys())
+
+
 def _file_name(key: str, name: str = ''):
     return f'{key}{"_" if name else ""}{name}.giwaxs'
 
@@ -221,6 +259,15 @@ class ImageKey(AbstractKey):
     def get_image(self):
         pass
 
+    def get_lazy_image(self) -> LazyImage or None:
+        """
+        Returns an image handle that allows reading only a window or a strided preview.
+        By default the image is read entirely.
+        """
+        image = self.get_image()
+        if image is not None:
+            return ArrayImage(image)
+
     def clean_copy(self):
         with RemoveWeakrefs(self, restore=True):
             return deepcopy(self)
@@ -231,6 +278,36 @@ class ImageKey(AbstractKey):
         return False
 
 
+class FrameKey(ImageKey):
+    """
+    Image key of a single frame of a stack stored in one file or dataset.
+    """
+
+    def __init__(self, project_path: Path, parent=None, *, frame: int, idx: int = None, **kwargs):
+        super().__init__(project_path, parent, idx=idx, **kwargs)
+        self._frame: int = frame
+
+    @property
+    def frame(self) -> int:
+        return self._frame
+
+    @property
+    def name(self):
+        return f'{super().name}_{self._frame:05d}'
+
+    def _file_key(self) -> str:
+        return f'{super()._file_key()}-{self._frame}'
+
+    def __eq__(self, other):
+        return super().__eq__(other) and self._frame == other._frame
+
+    def __hash__(self):
+        return hash((super().__hash__(), self._frame))
+
+    def __repr__(self):
+        return self.name
+
+
 class PathKey(AbstractKey):
     def __init__(self, project_path: Path, parent, *, path: Path, **kwargs):
         self._path = path
@@ -240,6 +317,10 @@ class PathKey(AbstractKey):
     def path(self):
         return self._path
 
+    @property
+    def source_path(self) -> Path:
+        return self._path
+
     @property
     def name(self):
         return validate_filename(self._path.name)
@@ -248,8 +329,9 @@ class PathKey(AbstractKey):
         full_path = self._path.resolve()
         try:
             return full_path.relative_to(self.project_path)
-        except:
-            return ''
+        except ValueError:
+            # paths outside of the project are identified by the full path, as h5 keys are
+            return str(full_path)
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -327,6 +409,10 @@ class H5Key(AbstractKey):
     def h5path(self):
         return self._h5path
 
+    @property
+    def source_path(self) -> Path:
+        return self._h5path
+
     @property
     def h5key(self):
         return self._h5key
@@ -364,32 +450,46 @@ class FolderH5Key(FolderKey, H5Key):
     def update(self):
         super().update()
         try:
-            with File(str(self._h5path.resolve()), 'r') as f:
-                if self._h5key:
-                    f = f[self._h5key]
-                for key in sorted(list(f.keys())):
-                    item = f[key]
-                    if isinstance(item, Group):
-                        if self.is_project and IMAGE_PROJECT_KEY in item.attrs.keys():
-                            self._image_children.append(
-                                ImageH5Key(project_path=self.project_path, parent=self, h5path=self._h5path,
-                                           h5key='/'.join((self._h5key, key)), is_project=True, idx=len(self._image_children)))
-                        else:
-                            self._folder_children.append(
-                                FolderH5Key(project_path=self.project_path, parent=self, h5path=self._h5path,
-                                            h5key='/'.join((self._h5key, key)),
-                                            is_project=self.is_project))
-                    elif isinstance(item, Dataset) and len(item.shape) == 2:
-                        self._image_children.append(
-                            ImageH5Key(project_path=self.project_path, parent=self, h5path=self._h5path,
-                                       h5key='/'.join((self._h5key, key)),
-                                       is_project=False, idx=len(self._image_children)))
+            with H5_FILE_POOL.open(self._h5path) as f:
+                group = f[self._h5key] if self._h5key else f
+                links = [(key, group.get(key, getlink=True)) for key in sorted(list(group.keys()))]
         except Exception as err:
             raise InvalidKey(err)
 
+        for key, link in links:
+            h5path, h5key = _resolve_link(self._h5path, self._h5key, key, link)
+            is_external = h5path != self._h5path
+            try:
+                with H5_FILE_POOL.open(h5path) as f:
+                    self._add_child(f[h5key], h5path, h5key, is_project=self.is_project and not is_external)
+            except (OSError, KeyError) as err:
+                # broken external links do not make the rest of the file unavailable
+                logger.warning(f'Could not open {self._h5path}:{self._h5key}/{key}: {err}')
+
+    def _add_child(self, item, h5path: Path, h5key: str, is_project: bool):
+        if isinstance(item, Group):
+            if is_project and IMAGE_PROJECT_KEY in item.attrs.keys():
+                self._image_children.append(
+                    ImageH5Key(project_path=self.project_path, parent=self, h5path=h5path,
+                               h5key=h5key, is_project=True, idx=len(self._image_children)))
+            elif _has_external_links(item):
+                self._folder_children.append(
+                    FolderNexusKey(project_path=self.project_path, parent=self, h5path=h5path, h5key=h5key))
+            else:
+                self._folder_children.append(
+                    FolderH5Key(project_path=self.project_path, parent=self, h5path=h5path,
+                                h5key=h5key, is_project=is_project))
+        elif isinstance(item, Dataset) and len(item.shape) == 2:
+            self._image_children.append(
+                ImageH5Key(project_path=self.project_path, parent=self, h5path=h5path,
+                           h5key=h5key, is_project=False, idx=len(self._image_children)))
+        elif isinstance(item, Dataset) and len(item.shape) == 3:
+            self._folder_children.append(
+                FolderH5StackKey(project_path=self.project_path, parent=self, h5path=h5path, h5key=h5key))
+
     def is_valid(self) -> bool:
         try:
-            with File(str(self._h5path.resolve()), 'r') as f:
+            with H5_FILE_POOL.open(self._h5path) as f:
                 if self._h5key:
                     f = f[self._h5key]
                 if isinstance(f, Group):
@@ -414,6 +514,8 @@ class FolderPathKey(FolderKey, PathKey):
                     self._folder_children.append(FolderPathKey(self.project_path, self, path=p))
                 elif p.suffix in H5_FORMAT:
                     self._folder_children.append(FolderH5Key(self.project_path, self, h5path=p))
+                elif _is_tiff_stack(p):
+                    self._folder_children.append(FolderTiffStackKey(self.project_path, self, path=p))
                 elif p.suffix in AVAILABLE_IMAGE_FORMATS:
                     self._image_children.append(ImagePathKey(self.project_path, self, path=p, idx=len(self._image_children)))
         except Exception as err:
@@ -447,19 +549,20 @@ class ImageH5Key(ImageKey, H5Key):
 
     def get_image(self):
         try:
-            with File(str(self._h5path.resolve()), 'r') as f:
-                image = f[self._h5key]
-                if self.is_project:
-                    return image['image'][()]
-                elif len(image.shape) == 2:
-                    return image[()]
+            lazy_image = self.get_lazy_image()
+            if lazy_image is not None and (self.is_project or lazy_image.ndim == 2):
+                return lazy_image.read()
         except Exception as err:
             logger.exception(err)
             return
 
+    def get_lazy_image(self) -> LazyH5Image:
+        dataset_path = '/'.join((self._h5key, 'image')) if self.is_project else self._h5key
+        return LazyH5Image(self._h5path, dataset_path)
+
     def is_valid(self) -> bool:
         try:
-            with File(str(self._h5path.resolve()), 'r') as f:
+            with H5_FILE_POOL.open(self._h5path) as f:
                 dset = f[self._h5key]
                 if not self.is_project and isinstance(dset, Dataset) and len(dset.shape) == 2:
                     return True
@@ -473,6 +576,182 @@ class ImageH5Key(ImageKey, H5Key):
             return False
 
 
+class FolderH5StackKey(FolderKey, H5Key):
+    """
+    (N, H, W) dataset of an h5 file. Each frame is an image child read by h5py slicing.
+    """
+
+    def __init__(self, project_path: Path, parent: FolderKey, *, h5path: Path, h5key: str):
+        super().__init__(project_path, parent, h5path=h5path, h5key=h5key, is_project=False)
+
+    def update(self):
+        super().update()
+        try:
+            with H5_FILE_POOL.open(self._h5path) as f:
+                frames_num = f[self._h5key].shape[0]
+        except Exception as err:
+            raise InvalidKey(err)
+        self._image_children = [
+            ImageH5FrameKey(project_path=self.project_path, parent=self, h5path=self._h5path,
+                            h5key=self._h5key, frame=frame, idx=frame)
+            for frame in range(frames_num)
+        ]
+
+    def is_valid(self) -> bool:
+        try:
+            with H5_FILE_POOL.open(self._h5path) as f:
+                dset = f[self._h5key]
+                return isinstance(dset, Dataset) and len(dset.shape) == 3
+        except (FileNotFoundError, KeyError, IOError):
+            return False
+        except Exception as err:
+            logger.exception(err)
+            return False
+
+
+class ImageH5FrameKey(FrameKey, H5Key):
+    def __init__(self, project_path: Path, parent: FolderKey, *,
+                 h5path: Path, h5key: str, frame: int, idx: int = None):
+        super().__init__(project_path, parent, h5path=h5path, h5key=h5key,
+                         is_project=False, frame=frame, idx=idx)
+
+    def get_image(self):
+        try:
+            return self.get_lazy_image().read()
+        except Exception as err:
+            logger.exception(err)
+            return
+
+    def get_lazy_image(self) -> LazyH5Image:
+        return LazyH5Image(self._h5path, self._h5key, frame=self._frame)
+
+    def is_valid(self) -> bool:
+        try:
+            with H5_FILE_POOL.open(self._h5path) as f:
+                dset = f[self._h5key]
+                return isinstance(dset, Dataset) and len(dset.shape) == 3 and self._frame < dset.shape[0]
+        except (FileNotFoundError, KeyError, IOError):
+            return False
+        except Exception as err:
+            logger.exception(err)
+            return False
+
+
+class FolderNexusKey(FolderKey, H5Key):
+    """
+    Data group of an Eiger/NeXus master file, whose entries are (N, H, W) datasets,
+    usually external links to separate data files. All frames of all datasets form one series;
+    frames are read directly from the data files, compressed chunks are decoded per frame
+    by the locally available HDF5 filter plugins (e.g. bitshuffle/LZ4).
+    """
+
+    def __init__(self, project_path: Path, parent: FolderKey, *, h5path: Path, h5key: str):
+        super().__init__(project_path, parent, h5path=h5path, h5key=h5key, is_project=False)
+
+    def update(self):
+        super().update()
+        try:
+            sources = self._get_frame_sources()
+        except Exception as err:
+            raise InvalidKey(err)
+
+        for h5path, h5key, frames_num in sources:
+            for frame in range(frames_num):
+                idx = len(self._image_children)
+                self._image_children.append(
+                    ImageNexusFrameKey(project_path=self.project_path, parent=self, h5path=h5path, h5key=h5key,
+                                       frame=frame, series_frame=idx, idx=idx))
+
+    def _get_frame_sources(self) -> List[Tuple[Path, str, int]]:
+        with H5_FILE_POOL.open(self._h5path) as f:
+            group = f[self._h5key]
+            links = [(key, group.get(key, getlink=True)) for key in sorted(list(group.keys()))]
+
+        sources = []
+
+        for key, link in links:
+            h5path, h5key = _resolve_link(self._h5path, self._h5key, key, link)
+            try:
+                with H5_FILE_POOL.open(h5path) as f:
+                    dset = f[h5key]
+                    if isinstance(dset, Dataset) and len(dset.shape) == 3:
+                        check_filters(dset)
+                        sources.append((h5path, h5key, dset.shape[0]))
+            except (OSError, KeyError) as err:
+                logger.warning(f'Could not open {self._h5path}:{self._h5key}/{key}: {err}')
+        return sources
+
+    def is_valid(self) -> bool:
+        try:
+            with H5_FILE_POOL.open(self._h5path) as f:
+                return isinstance(f[self._h5key], Group)
+        except (FileNotFoundError, KeyError, IOError):
+            return False
+        except Exception as err:
+            logger.exception(err)
+            return False
+
+
+class ImageNexusFrameKey(ImageH5FrameKey):
+    """
+    Frame of a NeXus series. Named by its number in the whole series rather than in the data file.
+    """
+
+    def __init__(self, project_path: Path, parent: FolderKey, *,
+                 h5path: Path, h5key: str, frame: int, series_frame: int, idx: int = None):
+        super().__init__(project_path, parent, h5path=h5path, h5key=h5key, frame=frame, idx=idx)
+        self._series_frame: int = series_frame
+
+    @property
+    def series_frame(self) -> int:
+        return self._series_frame
+
+    @property
+    def name(self):
+        return f'frame_{self._series_frame:06d}'
+
+
+class FolderTiffStackKey(FolderKey, PathKey):
+    """
+    Multi-page tiff file. Each frame is an image child decoded (or memory-mapped) separately.
+    """
+
+    def __init__(self, project_path: Path, parent: FolderKey, *, path: Path):
+        super().__init__(project_path, parent, path=path)
+
+    def update(self):
+        super().update()
+        try:
+            frames_num = tiff_stack_info(self._path)[0]
+        except Exception as err:
+            raise InvalidKey(err)
+        self._image_children = [
+            ImageTiffFrameKey(self.project_path, self, path=self._path, frame=frame, idx=frame)
+            for frame in range(frames_num)
+        ]
+
+    def is_valid(self) -> bool:
+        return self._path.is_file()
+
+
+class ImageTiffFrameKey(FrameKey, PathKey):
+    def __init__(self, project_path: Path, parent: FolderKey, *, path: Path, frame: int, idx: int = None):
+        super().__init__(project_path, parent, path=path, frame=frame, idx=idx)
+
+    def get_image(self):
+        try:
+            return self.get_lazy_image().read()
+        except Exception as err:
+            logger.exception(err)
+            return
+
+    def get_lazy_image(self) -> LazyTiffImage:
+        return LazyTiffImage(self._path, self._frame)
+
+    def is_valid(self) -> bool:
+        return self._path.is_file()
+
+
 class RemoveWeakrefs(object):
     def __init__(self, key: Union[FolderKey, ImageKey], *,
                  remove_subfolders: bool = False,
@@ -0,0 +1,158 @@
+from abc import abstractmethod
+from math import ceil
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+from ..read_image import read_tiff_frame, tiff_stack_info
+from .h5_pool import H5_FILE_POOL
+
+__all__ = ['LazyImage', 'ArrayImage', 'LazyH5Image', 'LazyTiffImage']
+
+
+class LazyImage(object):
+    """
+    Image handle that exposes shape and dtype without reading pixel data.
+    Indexing with slices reads only the requested window, steps are supported.
+    """
+
+    @property
+    @abstractmethod
+    def shape(self) -> Tuple[int, ...]:
+        pass
+
+    @property
+    @abstractmethod
+    def dtype(self) -> np.dtype:
+        pass
+
+    @abstractmethod
+    def __getitem__(self, item) -> np.ndarray:
+        pass
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def read(self) -> np.ndarray:
+        return self[()]
+
+    def window(self, rows: Tuple[int, int], columns: Tuple[int, int], step: int = 1) -> np.ndarray:
+        return self[rows[0]:rows[1]:step, columns[0]:columns[1]:step]
+
+    def preview_step(self, max_size: int) -> int:
+        return max(1, ceil(max(self.shape[-2:]) / max_size))
+
+    def preview(self, max_size: int) -> np.ndarray:
+        """
+        Reads every n-th pixel, so that the largest side of the result does not exceed max_size.
+        """
+        step = self.preview_step(max_size)
+        return self[::step, ::step]
+
+    def __array__(self, dtype=None, copy=None):
+        image = self.read()
+        return image if dtype is None else image.astype(dtype)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}(shape={self.shape}, dtype={self.dtype})>'
+
+
+class ArrayImage(LazyImage):
+    """
+    LazyImage interface for images that are already in memory (or memory-mapped).
+    """
+
+    def __init__(self, image: np.ndarray):
+        self._image = image
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self._image.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._image.dtype
+
+    def read(self) -> np.ndarray:
+        return self._image
+
+    def __getitem__(self, item) -> np.ndarray:
+        return self._image[item]
+
+
+class LazyH5Image(LazyImage):
+    """
+    Image stored as a dataset of an h5 file. Data are read through h5py slicing,
+    so windows and strided previews never materialise the whole frame.
+    If frame is given, the dataset is a (N, H, W) stack and only this frame is accessed.
+    """
+
+    def __init__(self, h5path: Path, dataset_path: str, frame: int = None):
+        self._h5path = h5path
+        self._dataset_path = dataset_path
+        self._frame = frame
+        self._shape = self._dtype = None
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        if self._shape is None:
+            self._read_meta()
+        return self._shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        if self._dtype is None:
+            self._read_meta()
+        return self._dtype
+
+    def __getitem__(self, item) -> np.ndarray:
+        if self._frame is not None:
+            item = (self._frame,) + (item if isinstance(item, tuple) else (item,))
+        with H5_FILE_POOL.open(self._h5path) as f:
+            return f[self._dataset_path][item]
+
+    def _read_meta(self):
+        with H5_FILE_POOL.open(self._h5path) as f:
+            dset = f[self._dataset_path]
+            self._shape, self._dtype = dset.shape, dset.dtype
+        if self._frame is not None:
+            self._shape = self._shape[1:]
+
+
+class LazyTiffImage(LazyImage):
+    """
+    Single frame of a (multi-page) tiff file. Uncompressed frames are memory-mapped,
+    so that windows are read from disk directly, compressed frames are decoded on access.
+    """
+
+    def __init__(self, path: Path, frame: int = 0):
+        self._path = path
+        self._frame = frame
+        self._shape = self._dtype = None
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        if self._shape is None:
+            self._read_meta()
+        return self._shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        if self._dtype is None:
+            self._read_meta()
+        return self._dtype
+
+    def read(self) -> np.ndarray:
+        return read_tiff_frame(self._path, self._frame)
+
+    def __getitem__(self, item) -> np.ndarray:
+        return self.read()[item]
+
+    def _read_meta(self):
+        _, self._shape, self._dtype = tiff_stack_info(self._path)
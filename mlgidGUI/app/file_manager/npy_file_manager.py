@@ -6,12 +6,28 @@ from .object_file_manager import _ObjectFileManager
 
 
 class _ReadNpy(_ObjectFileManager):
+    def is_stored(self, key) -> bool:
+        """
+        Whether an array of the key is stored in the project.
+        """
+        return _npy_path(self._get_path(key)).is_file()
+
     @staticmethod
     def _set_pickle(path: Path, value):
         np.save(str(path.resolve()) + '.npy', value)
 
     @staticmethod
     def _get_pickle(path: Path):
+        path = _npy_path(path)
         if path.is_file():
-            return np.load(str(path.resolve()) + '.npy', allow_pickle=True)
+            return np.load(str(path.resolve()), allow_pickle=True)
+
+    @staticmethod
+    def _del_pickle(path: Path):
+        path = _npy_path(path)
+        if path.is_file():
+            path.unlink()
+
 
+def _npy_path(path: Path) -> Path:
+    return path.with_name(path.name + '.npy')
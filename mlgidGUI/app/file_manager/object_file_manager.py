@@ -1,6 +1,7 @@
 import logging
 import pickle
 from pathlib import Path
+from typing import Callable
 
 from h5py import Group, File
 
@@ -27,6 +28,7 @@ class _ObjectFileManager(object):
     def __init__(self, project_structure: ProjectStructure):
         self.project_structure = project_structure
         self.folder: Path = None
+        self.on_change: Callable[[AbstractKey], None] or None = None
         self.init()
 
     def init(self):
@@ -67,11 +69,17 @@ class _ObjectFileManager(object):
     def del_h5(h5group: Group, key: ImageKey):
         pass
 
+    def _changed(self, key):
+        if self.on_change:
+            self.on_change(key)
+
     def __getitem__(self, key):
         return self._get_pickle(self._get_path(key))
 
     def __delitem__(self, key):
-        return self._del_pickle(self._get_path(key))
+        self._del_pickle(self._get_path(key))
+        self._changed(key)
 
     def __setitem__(self, key, value):
-        return self._set_pickle(self._get_path(key), value)
+        self._set_pickle(self._get_path(key), value)
+        self._changed(key)
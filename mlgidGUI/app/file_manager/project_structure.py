@@ -5,9 +5,9 @@ import logging
 from pathlib import Path
 from os import listdir
 
-from .keys import (AbstractKey, FolderKey, FolderH5Key, FolderPathKey,
+from .keys import (AbstractKey, FolderKey, FolderH5Key, FolderPathKey, FolderTiffStackKey,
                    ImageKey, ImagePathKey, H5_FORMAT, RemoveWeakrefs, CIFFileKey,
-                   AVAILABLE_IMAGE_FORMATS, CIF_EXTENSIONS)
+                   AVAILABLE_IMAGE_FORMATS, CIF_EXTENSIONS, _is_tiff_stack)
 
 
 class ProjectRootKey(FolderKey):
@@ -60,10 +60,20 @@ class ProjectRootKey(FolderKey):
                     return f, False
             self._folder_children.append(folder_key)
             for image in listdir(folder_key.path):
-                if (image.endswith(AVAILABLE_IMAGE_FORMATS)):
+                if _is_tiff_stack(folder_key.path / image):
+                    folder_key._folder_children.append(
+                        FolderTiffStackKey(project_path=self.path, parent=folder_key, path=folder_key.path / image))
+                elif (image.endswith(AVAILABLE_IMAGE_FORMATS)):
                     image_key = ImagePathKey(project_path=self.path, parent=folder_key, path=Path(image))
                     folder_key._image_children.append(image_key)
             return folder_key, True
+        elif path.is_file() and _is_tiff_stack(path):
+            key = FolderTiffStackKey(project_path=self.path, parent=self, path=path)
+            for f in self._folder_children:
+                if key == f:
+                    return f, False
+            self._folder_children.append(key)
+            return key, True
         elif path.is_file() and path.suffix in AVAILABLE_IMAGE_FORMATS:
             key = ImagePathKey(project_path = self.path, parent = self, path=path)
             for c in self._image_children:
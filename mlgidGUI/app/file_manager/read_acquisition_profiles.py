@@ -0,0 +1,59 @@
+import hashlib
+from pathlib import Path
+from typing import Dict
+
+from .object_file_manager import _ObjectFileManager
+from .keys import AbstractKey, FolderKey
+from ..acquisition_profile import AcquisitionProfile
+
+
+class _ReadAcquisitionProfiles(_ObjectFileManager):
+    """
+    Stores acquisition profiles (binning and detector crop) of folders. Images use the profile
+    of the closest folder that has one. Profiles are stored by the source path of the folder,
+    since folders outside of the project have no file key.
+    """
+    NAME = 'acquisition_profiles'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # profiles are looked up on every image read
+        self._profiles: Dict[FolderKey, AcquisitionProfile or None] = {}
+
+    def _get_path(self, key: FolderKey) -> Path or None:
+        try:
+            source_path = key.source_path.resolve()
+        except AttributeError:
+            return
+        identity = f'{source_path}|{key._file_key()}'
+        return self.folder / hashlib.sha1(identity.encode()).hexdigest()
+
+    def __getitem__(self, key: FolderKey) -> AcquisitionProfile or None:
+        if key not in self._profiles:
+            path = self._get_path(key)
+            self._profiles[key] = self._get_pickle(path) if path else None
+        return self._profiles[key]
+
+    def __setitem__(self, key: FolderKey, profile: AcquisitionProfile):
+        path = self._get_path(key)
+        if not path:
+            raise ValueError(f'Acquisition profile cannot be set for {key}.')
+        self._profiles.pop(key, None)
+        self._set_pickle(path, profile)
+        self._changed(key)
+
+    def __delitem__(self, key: FolderKey):
+        self._profiles.pop(key, None)
+        path = self._get_path(key)
+        if path:
+            self._del_pickle(path)
+            self._changed(key)
+
+    def get(self, key: AbstractKey) -> AcquisitionProfile:
+        folder = key if isinstance(key, FolderKey) else key.parent
+        while folder is not None:
+            profile = self[folder]
+            if profile is not None:
+                return profile
+            folder = folder.parent
+        return AcquisitionProfile()
@@ -1,9 +1,31 @@
+import logging
+from typing import Tuple, Sequence, List
+from pathlib import Path
+
 from h5py import Group
+
+from ..cache import CompressedLRUCache
 from .npy_file_manager import _ReadNpy
-from pathlib import Path
+from .h5_storage import H5StoragePolicy, create_dataset
+from .lazy_image import LazyImage, ArrayImage
+from .read_acquisition_profiles import _ReadAcquisitionProfiles
+from .keys import ImagePathKey
+from ..acquisition_profile import AcquisitionProfile
+from ..read_image import is_edf_file, read_edf_frames
+
+logger = logging.getLogger(__name__)
+
 
 class _ReadImage(_ReadNpy):
     NAME = 'images'
+    CACHE_SIZE = 2 ** 30
+
+    def __init__(self, *args, **kwargs):
+        # decoded images are cached compressed by (key, source file stamp), so that modified files are reread
+        self.cache: CompressedLRUCache = CompressedLRUCache(self.CACHE_SIZE)
+        # acquisition profiles of folders (binning and crop) are applied to images on reading
+        self.profiles: _ReadAcquisitionProfiles or None = None
+        super().__init__(*args, **kwargs)
 
     def init(self):
         path = self.project_structure.path
@@ -15,17 +37,90 @@ class _ReadImage(_ReadNpy):
         pass
 
     @staticmethod
-    def set_h5(h5group: Group, key, image):
+    def set_h5(h5group: Group, key, image, storage: H5StoragePolicy = None):
         _ReadImage.del_h5(h5group, key)
-        h5group.create_dataset('image', data=image)
+        create_dataset(h5group, 'image', image, storage)
 
     @staticmethod
     def del_h5(h5group: Group, key):
         if 'image' in h5group.keys():
             del h5group['image']
 
+    def get_profile(self, key) -> AcquisitionProfile:
+        return self.profiles.get(key) if self.profiles is not None else AcquisitionProfile()
+
     def __getitem__(self, key):
-        internal_path = self._get_path(key)
-        if internal_path.is_file():
-            return self._get_pickle(internal_path)
-        return key.get_image()
+        profile = self.get_profile(key)
+        if self.is_stored(key):
+            return profile.apply(self._get_pickle(self._get_path(key)))
+
+        cache_key = key, _file_stamp(key), profile
+        image = self.cache.get(cache_key)
+        if image is None:
+            image = key.get_image()
+            if image is not None:
+                image = profile.apply(image)
+                image.flags.writeable = False
+                self.cache[cache_key] = image
+        return image
+
+    def get_images(self, keys: Sequence, max_workers: int = None) -> List:
+        """
+        Returns the images of keys like __getitem__. Frames of edf series that are
+        neither stored in the project nor cached are read concurrently.
+        """
+        edf_keys = [key for key in keys if isinstance(key, ImagePathKey) and is_edf_file(key.path)
+                    and not self.is_stored(key)
+                    and (key, _file_stamp(key), self.get_profile(key)) not in self.cache]
+        read = {}
+        if len(edf_keys) > 1:
+            try:
+                frames = read_edf_frames([key.path for key in edf_keys], max_workers)
+            except Exception as err:
+                # corrupted frames are read one by one below
+                logger.exception(err)
+                frames = []
+            for key, image in zip(edf_keys, frames):
+                profile = self.get_profile(key)
+                image = profile.apply(image)
+                image.flags.writeable = False
+                self.cache[key, _file_stamp(key), profile] = image
+                read[key] = image
+        return [read[key] if key in read else self[key] for key in keys]
+
+    def get_lazy(self, key) -> LazyImage or None:
+        """
+        Returns a handle to the image that reads only the requested window or preview
+        if the image is neither stored in the project nor cached. Images of folders
+        with binning or crop are read completely.
+        """
+        profile = self.get_profile(key)
+        if not profile.is_identity:
+            image = self[key]
+            return ArrayImage(image) if image is not None else None
+
+        if self.is_stored(key):
+            return ArrayImage(self._get_pickle(self._get_path(key)))
+
+        image = self.cache.get((key, _file_stamp(key), profile))
+        if image is not None:
+            return ArrayImage(image)
+        return key.get_lazy_image()
+
+    def __delitem__(self, key):
+        self.cache.remove_if(lambda cache_key: cache_key[0] == key)
+        super().__delitem__(key)
+
+    def __setitem__(self, key, value):
+        self.cache.remove_if(lambda cache_key: cache_key[0] == key)
+        # the folder is created on the first stored image only
+        self.folder.mkdir(parents=True, exist_ok=True)
+        super().__setitem__(key, value)
+
+
+def _file_stamp(key) -> Tuple[int, int] or None:
+    try:
+        stat = key.source_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    except (AttributeError, OSError):
+        return
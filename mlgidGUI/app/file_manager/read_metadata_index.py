@@ -0,0 +1,5 @@
+from .object_file_manager import _ObjectFileManager
+
+
+class _ReadMetadataIndex(_ObjectFileManager):
+    NAME = 'metadata_index'
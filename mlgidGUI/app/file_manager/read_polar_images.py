@@ -1,22 +1,81 @@
 from h5py import Group
 from pathlib import Path
+
+import numpy as np
+
+from ..cache import CompressedLRUCache
+from ..geometry import Geometry
+from ..dtype_policy import as_float
+from .object_file_manager import _ObjectFileManager
 from .npy_file_manager import _ReadNpy
+from .h5_storage import H5StoragePolicy, create_polar_dataset, read_polar_dataset
 
 
 class _ReadPolarImage(_ReadNpy):
+    """
+    Stores polar images in the project. Polar images stored with set() keep the geometry
+    parameters and interpolation they were calculated with, and get() returns them only
+    while they match, so that stored images never replace the polar image of a changed geometry.
+    """
     NAME = 'polar_images'
+    CACHE_SIZE = 2 ** 29
+
+    def __init__(self, *args, **kwargs):
+        # polar images read from the project are kept compressed in memory
+        self.cache: CompressedLRUCache = CompressedLRUCache(self.CACHE_SIZE)
+        super().__init__(*args, **kwargs)
+
+    def __getitem__(self, key):
+        polar_image = self.cache.get(key)
+        if polar_image is None:
+            polar_image = super().__getitem__(key)
+            if polar_image is not None:
+                # images stored with another float type are converted to the one of the project
+                polar_image = as_float(polar_image)
+                polar_image.flags.writeable = False
+                self.cache[key] = polar_image
+        return polar_image
+
+    def get(self, key, geometry: Geometry, algorithm: int) -> np.ndarray or None:
+        if self.is_valid(key, geometry, algorithm):
+            return self[key]
+
+    def set(self, key, polar_image: np.ndarray, geometry: Geometry, algorithm: int):
+        self[key] = polar_image
+        _ObjectFileManager._set_pickle(self._get_params_path(key), _polar_params(geometry, algorithm))
+
+    def is_valid(self, key, geometry: Geometry, algorithm: int) -> bool:
+        return _ObjectFileManager._get_pickle(self._get_params_path(key)) == _polar_params(geometry, algorithm)
+
+    def _get_params_path(self, key) -> Path:
+        path = self._get_path(key)
+        return path.with_name(path.name + '.params')
+
+    def __delitem__(self, key):
+        del self.cache[key]
+        _ObjectFileManager._del_pickle(self._get_params_path(key))
+        super().__delitem__(key)
+
+    def __setitem__(self, key, value):
+        del self.cache[key]
+        _ObjectFileManager._del_pickle(self._get_params_path(key))
+        super().__setitem__(key, value)
 
     @staticmethod
     def get_h5(h5group: Group, key):
         if 'polar_image' in h5group.keys():
-            return h5group['polar_image'][()]
+            return read_polar_dataset(h5group['polar_image'])
 
     @staticmethod
-    def set_h5(h5group: Group, key, image):
+    def set_h5(h5group: Group, key, image, storage: H5StoragePolicy = None):
         _ReadPolarImage.del_h5(h5group, key)
-        h5group.create_dataset('polar_image', data=image)
+        create_polar_dataset(h5group, 'polar_image', image, storage)
 
     @staticmethod
     def del_h5(h5group: Group, key):
         if 'polar_image' in h5group.keys():
             del h5group['polar_image']
+
+
+def _polar_params(geometry: Geometry, algorithm: int) -> tuple:
+    return geometry.polar_key, int(algorithm)
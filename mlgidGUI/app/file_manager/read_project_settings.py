@@ -0,0 +1,13 @@
+from pathlib import Path
+
+from .object_file_manager import _ObjectFileManager
+
+
+class _ReadProjectSettings(_ObjectFileManager):
+    """
+    Stores project-wide settings (for instance, the float type of calculated arrays) by name.
+    """
+    NAME = 'settings'
+
+    def _get_path(self, key: str) -> Path:
+        return self.folder / key
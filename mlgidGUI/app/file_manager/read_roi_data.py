@@ -3,6 +3,7 @@ import logging
 from h5py import Group
 
 from .object_file_manager import _ObjectFileManager
+from .h5_storage import H5StoragePolicy, create_dataset
 from ..rois.roi_data import RoiData
 
 logger = logging.getLogger(__name__)
@@ -21,7 +22,7 @@ class _ReadRoiData(_ObjectFileManager):
             return roi_data
 
     @staticmethod
-    def set_h5(h5group: Group, key, value: RoiData):
+    def set_h5(h5group: Group, key, value: RoiData, storage: H5StoragePolicy = None):
         if 'roi_data' in h5group.keys():
             del h5group['roi_data']
 
@@ -29,7 +30,7 @@ class _ReadRoiData(_ObjectFileManager):
         roi_group = h5group.create_group('roi_data')
         for key, arr in rois_dict.items():
             try:
-                roi_group.create_dataset(key, data=arr)
+                create_dataset(roi_group, key, arr, storage)
             except Exception as err:
                 logger.exception(err)
 
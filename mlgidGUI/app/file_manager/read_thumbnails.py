@@ -0,0 +1,127 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+from ..dtype_policy import as_float
+from .object_file_manager import _ObjectFileManager
+from .lazy_image import LazyImage
+
+
+class _ReadThumbnails(_ObjectFileManager):
+    """
+    Stores downsampled 8-bit thumbnails of images in the project folder. Thumbnails of all SIZES
+    (a pyramid, each level is calculated from the previous one) are kept in a single npz file
+    named by the identity of the source file (path and frame or dataset) together with the
+    modification stamp of the source, so that modified files never show outdated thumbnails
+    and new thumbnails replace the outdated ones.
+    """
+    NAME = 'thumbnails'
+    SIZES: Tuple[int, ...] = (512, 128)
+
+    def _get_path(self, key) -> Path or None:
+        identity = _file_identity(key)
+        if identity is not None:
+            return self.folder / f'{identity}.npz'
+
+    def __contains__(self, key):
+        return self._read(key, with_images=False) is not None
+
+    def __getitem__(self, key) -> Dict[int, np.ndarray] or None:
+        return self._read(key)
+
+    def _read(self, key, with_images: bool = True) -> Dict[int, np.ndarray] or None:
+        path = self._get_path(key)
+        if not path or not path.is_file():
+            return
+        try:
+            with np.load(str(path)) as f:
+                # npz members are read on access, so checking the stamp does not read the images
+                if 'stamp' not in f.files or tuple(f['stamp']) != _file_stamp(key):
+                    return
+                if not with_images:
+                    return {}
+                return {int(name.split('_')[-1]): f[name] for name in f.files if name != 'stamp'}
+        except (OSError, ValueError):
+            return
+
+    def __setitem__(self, key, thumbnails: Dict[int, np.ndarray]):
+        path, stamp = self._get_path(key), _file_stamp(key)
+        if path and stamp:
+            np.savez(str(path), stamp=np.array(stamp, dtype=np.int64),
+                     **{f'size_{size}': image for size, image in thumbnails.items()})
+            self._changed(key)
+
+    def __delitem__(self, key):
+        # the path does not depend on the source stamp, so thumbnails of modified
+        # or deleted source files are removed as well
+        path = self._get_path(key)
+        if path and path.is_file():
+            path.unlink()
+            self._changed(key)
+
+    def get(self, key, size: int) -> np.ndarray or None:
+        """
+        Returns the smallest stored thumbnail that is not smaller than size (or the largest one).
+        """
+        thumbnails = self[key]
+        if not thumbnails:
+            return
+        sizes = sorted(thumbnails.keys())
+        return thumbnails[next((s for s in sizes if s >= size), sizes[-1])]
+
+    def create(self, key, lazy_image: LazyImage) -> Dict[int, np.ndarray]:
+        thumbnails = calc_thumbnails(lazy_image, self.SIZES)
+        self[key] = thumbnails
+        return thumbnails
+
+
+def calc_thumbnails(lazy_image: LazyImage, sizes: Tuple[int, ...]) -> Dict[int, np.ndarray]:
+    sizes = sorted(sizes, reverse=True)
+    # strided reading at twice the largest size is cheap for h5 and memory-mapped images,
+    # area interpolation then removes the aliasing of the strided preview.
+    image = _to_uint8(lazy_image.preview(2 * sizes[0]))
+    thumbnails = {}
+    for size in sizes:
+        image = _downsample(image, size)
+        thumbnails[size] = image
+    return thumbnails
+
+
+def _downsample(image: np.ndarray, size: int) -> np.ndarray:
+    height, width = image.shape[:2]
+    scale = size / max(height, width)
+    if scale >= 1:
+        return image
+    shape = max(1, round(width * scale)), max(1, round(height * scale))
+    return cv2.resize(image, shape, interpolation=cv2.INTER_AREA)
+
+
+def _to_uint8(image: np.ndarray, coef: float = 5000) -> np.ndarray:
+    image = as_float(image)
+    finite = np.isfinite(image)
+    if not finite.any():
+        return np.zeros(image.shape, dtype=np.uint8)
+    min_value, max_value = np.min(image[finite]), np.max(image[finite])
+    image = np.nan_to_num((image - min_value) / ((max_value - min_value) or 1))
+    image = np.log10(np.clip(image, 0, 1) * coef + 1) / np.log10(coef + 1)
+    return np.rint(image * 255).astype(np.uint8)
+
+
+def _file_identity(key) -> str or None:
+    try:
+        source_path = key.source_path.resolve()
+        identity = '|'.join(map(str, (source_path, key._file_key())))
+    except (AttributeError, OSError):
+        return
+    return hashlib.sha1(identity.encode()).hexdigest()
+
+
+def _file_stamp(key) -> Tuple[int, int] or None:
+    try:
+        stat = key.source_path.stat()
+    except (AttributeError, OSError):
+        return
+    return stat.st_mtime_ns, stat.st_size
@@ -5,6 +5,7 @@ from copy import deepcopy
 from ..file_manager import ImageKey
 from ..profiles import SavedProfile
 from ..utils import smooth_curve, baseline_correction
+from ..dtype_policy import float_dtype
 from .background import *
 from .functions import *
 from .fit import Fit
@@ -26,7 +27,7 @@ class FitObject(object):
         self.r_delta = (np.nanmax(r_axis) - np.nanmin(r_axis)) / r_axis.size
         self.min_range: float = self.r_delta * self.MINIMAL_NUM
         self.phi_delta = (np.nanmax(phi_axis) - np.nanmin(phi_axis)) / phi_axis.size
-        self.r_profile = np.nanmean(polar_image,axis=0)
+        self.r_profile = np.nanmean(polar_image, axis=0, dtype=float_dtype())
         self.aspect_ratio = self._aspect_ratio()
         self.bounds = self._bounds()
 
@@ -46,7 +47,7 @@ class FitObject(object):
     # profile methods:
 
     def set_profile(self, saved_profile: SavedProfile, update_baseline: bool = False):
-        if np.any(saved_profile.x != self.r_axis):
+        if not saved_profile.matches(self.r_axis):
             return
 
         self.saved_profile = saved_profile
@@ -69,7 +70,7 @@ class FitObject(object):
             self.saved_profile.x = self.r_axis
             r1, r2 = self.saved_profile.x_range
             x1, x2 = self._get_r_coords(r1), self._get_r_coords(r2)
-            self.saved_profile.raw_data = np.nanmean(self.polar_image,axis=0)
+            self.saved_profile.raw_data = np.nanmean(self.polar_image, axis=0, dtype=float_dtype())
             self.r_profile = smooth_curve(self.saved_profile.raw_data, self.saved_profile.sigma)
 
             baseline = np.zeros_like(self.r_profile)
@@ -84,7 +85,7 @@ class FitObject(object):
 
     def clear_profile(self):
         self.saved_profile = None
-        self.r_profile = np.nanmean(self.polar_image,axis=0)
+        self.r_profile = np.nanmean(self.polar_image, axis=0, dtype=float_dtype())
 
     # fit methods:
 
@@ -202,7 +203,7 @@ class FitObject(object):
 
     def _update_default_sigma(self, sigma: float):
         self.default_sigma = sigma
-        self.r_profile = smooth_curve(np.nanmean(self.polar_image,axis=0), sigma)
+        self.r_profile = smooth_curve(np.nanmean(self.polar_image, axis=0, dtype=float_dtype()), sigma)
 
         if self.saved_profile:
             self.saved_profile.sigma = sigma
@@ -233,7 +234,8 @@ class FitObject(object):
         return x, y
 
     def _get_r_coords(self, r):
-        return int((r - np.nanmin(self.r_axis)) / self.r_delta)
+        # the polar image may be a radial band, ranges are clipped to it
+        return min(max(int((r - np.nanmin(self.r_axis)) / self.r_delta), 0), self.r_axis.size)
 
     def _get_p_coords(self, p):
         return int((p - np.nanmin(self.phi_axis)) / self.phi_delta)
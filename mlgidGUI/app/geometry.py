@@ -1,9 +1,15 @@
 from typing import Tuple, NamedTuple
-from copy import deepcopy
+from copy import copy
 
+import cv2
 import numpy as np
 
-from .transformations import TransformationsHolder
+from .cache import ByteLRUCache
+from .dtype_policy import float_dtype
+from .transformations import TransformationsHolder, raw_coordinates
+
+
+AUTO_POLAR_SHAPE = 'auto'
 
 
 class AxesScale(object):
@@ -32,12 +38,62 @@ class BeamCenter(NamedTuple):
     y: float = 0
 
 
+class GIParameters(NamedTuple):
+    """
+    Grazing-incidence experiment parameters: wavelength in angstroms, sample-detector distance
+    and pixel size in the same length units and incidence angle in degrees.
+    """
+    wavelength: float
+    distance: float
+    pixel_size: float
+    incidence_angle: float
+
+
+class _PolarGrid(object):
+    """
+    Polar grids shared by geometries with the same beam center, r and phi ranges and polar shape.
+    Arrays are read-only, remap maps are built on the first use. Maps from raw images
+    are cached separately (see _RAW_REMAP_MAPS).
+    """
+    __slots__ = ('phi', 'r', 'yy', 'zz', 'remap_maps')
+
+    def __init__(self, phi: np.ndarray, r: np.ndarray, yy: np.ndarray, zz: np.ndarray):
+        for arr in (phi, r, yy, zz):
+            arr.flags.writeable = False
+        self.phi, self.r, self.yy, self.zz = phi, r, yy, zz
+        self.remap_maps = None
+
+    @property
+    def nbytes(self) -> int:
+        # interleaved float32 remap maps take 8 bytes per point
+        return self.phi.nbytes + self.r.nbytes + self.yy.nbytes + self.zz.nbytes + 8 * self.yy.size
+
+
+_POLAR_GRIDS = ByteLRUCache(2 ** 28, get_size=lambda grid: grid.nbytes)
+
+# remap maps of polar image parts (see Geometry.window_remap_maps)
+_WINDOW_MAPS = ByteLRUCache(2 ** 27)
+
+# remap maps from raw images by (grid key, transformation key, image shape), see Geometry.raw_remap_maps
+_RAW_REMAP_MAPS = ByteLRUCache(2 ** 28)
+
+
+def clear_polar_grids() -> None:
+    """
+    Clears the shared polar grids and remap maps (e.g. after the float type has been changed).
+    """
+    for cache in (_POLAR_GRIDS, _WINDOW_MAPS, _RAW_REMAP_MAPS):
+        cache.clear()
+
+
 class Geometry(object):
     def __init__(self, *, beam_center: tuple = (0, 0),
                  scale: float = 1.,
                  shape: Tuple[int, int] = (10, 10),
-                 polar_shape: Tuple[int, int] = (1024, 1024),
+                 polar_shape: Tuple[int, int] or str = (1024, 1024),
                  t_key: str = None, update: bool = True,
+                 gi: tuple = None,
+                 polar_budget: int = None,
                  **kwargs):
 
         self._beam_center = BeamCenter(*beam_center)
@@ -46,34 +102,54 @@ class Geometry(object):
         if t_key:
             self._transforms.update(t_key)
         self._shape = tuple(shape)
-        self._polar_shape = tuple(polar_shape)
+        # the automatic polar shape follows the ranges (see auto_polar_shape)
+        self._auto_polar = _is_auto(polar_shape)
+        self._polar_shape = (1024, 1024) if self._auto_polar else tuple(polar_shape)
+        self._polar_budget = int(polar_budget) if polar_budget else None
+        self._gi = GIParameters(*map(float, gi)) if gi is not None else None
 
         self._r_range = (0, 1)
         self._phi_range = (0, 2 * np.pi)
         self._ring_bounds = (0, 2 * np.pi)
-        self._r = self._phi = None
+        self._r = None
         self._y = self._z = None
-        self._polar_zz = self._polar_yy = None
-        self._polar_aspect_ratio = None
+        self._polar_grid: _PolarGrid or None = None
 
         if update:
             self.update()
 
     def to_dict(self) -> dict:
-        return dict(beam_center=tuple(self.beam_center),
-                    shape=self.shape,
-                    scale=self.scale,
-                    t_key=self.t.key,
-                    polar_shape=self.polar_shape)
+        d = dict(beam_center=tuple(self.beam_center),
+                 shape=self.shape,
+                 scale=self.scale,
+                 t_key=self.t.key,
+                 polar_shape=AUTO_POLAR_SHAPE if self.auto_polar else self.polar_shape)
+        if self.polar_budget is not None:
+            d['polar_budget'] = self.polar_budget
+        if self.gi is not None:
+            d['gi'] = tuple(self.gi)
+        return d
 
     @staticmethod
     def keys():
-        return 'beam_center', 'shape', 'scale', 't_key', 'polar_shape'
+        return 'beam_center', 'shape', 'scale', 't_key', 'polar_shape', 'polar_budget', 'gi'
 
     @classmethod
     def fromdict(cls, d: dict):
         return cls(**d)
 
+    def __getstate__(self):
+        # only the defining parameters are stored, grids are rebuilt or taken from the shared cache on load
+        return self.to_dict()
+
+    def __setstate__(self, state: dict):
+        if '_beam_center' in state:
+            # geometries pickled together with their grids
+            state = dict(beam_center=state['_beam_center'], shape=state['_shape'],
+                         scale=state['_scale'].scale, t_key=state['_transforms'].key,
+                         polar_shape=state['_polar_shape'])
+        self.__init__(**state)
+
     def __eq__(self, other):
         if type(other) != Geometry:
             return False
@@ -85,7 +161,15 @@ class Geometry(object):
         return self._transforms
 
     def copy(self) -> 'Geometry':
-        return deepcopy(self)
+        """
+        Returns a copy sharing the grids and axes with this geometry. Arrays are never modified
+        in place (parameter changes replace them), so the copies stay independent.
+        """
+        geometry = object.__new__(Geometry)
+        geometry.__dict__.update(self.__dict__)
+        geometry._scale = copy(self._scale)
+        geometry._transforms = TransformationsHolder(self.t.key)
+        return geometry
 
     @property
     def is_available(self) -> bool:
@@ -109,19 +193,142 @@ class Geometry(object):
 
     @property
     def polar_grids(self):
-        return self._polar_yy, self._polar_zz
+        grid = self._get_polar_grid()
+        if grid is None:
+            return None, None
+        return grid.yy, grid.zz
+
+    @property
+    def remap_maps(self) -> Tuple[np.ndarray, None] or None:
+        """
+        Polar grids converted once to the interleaved CV_32FC2 map of cv2.remap.
+        Built on the first use and kept until the polar grid changes.
+        """
+        grid = self._get_polar_grid()
+        if grid is None:
+            return
+        if grid.remap_maps is None:
+            # fixed-point CV_16SC2 maps lose sub-pixel precision and are not faster with OpenCV SIMD remap
+            grid.remap_maps = _convert_maps(grid.yy, grid.zz)
+        return grid.remap_maps
+
+    @property
+    def raw_remap_maps(self) -> Tuple[np.ndarray, None] or None:
+        """
+        Remap maps with the transformations composed into the coordinates, so that
+        raw (not transformed) images, including memory-mapped ones, are remapped directly.
+        """
+        if self.t.key == '1234':
+            return self.remap_maps
+        grid = self._get_polar_grid()
+        if grid is None:
+            return
+        key = self._grid_key(), self.t.key, tuple(self.shape)
+        maps = _RAW_REMAP_MAPS.get(key)
+        if maps is None:
+            maps = _RAW_REMAP_MAPS[key] = _convert_maps(*raw_coordinates(*key[1:], grid.yy, grid.zz))
+        return maps
+
+    def polar_window(self, r_range: Tuple[float, float] = None,
+                     phi_range: Tuple[float, float] = None) -> Tuple[slice, slice] or None:
+        """
+        Index window (phi, r) of the polar image covering r_range (in the units of r_axis)
+        and phi_range (degrees, as phi_axis). Missing ranges cover the whole axis.
+        Bounds are rounded outwards to the polar bins.
+        """
+        if self._y is None:
+            return
+        num_phi, num_r = self.polar_shape
+        if r_range is not None:
+            r_range = np.divide(r_range, self.scale)
+        if phi_range is not None:
+            phi_range = np.deg2rad(phi_range)
+        return _axis_slice(phi_range, self.phi_range, num_phi), _axis_slice(r_range, self.r_range, num_r)
+
+    def window_axes(self, window: Tuple[slice, slice]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Parts of phi_axis and r_axis within the window, calculated without the polar grids.
+        """
+        phi = np.linspace(*self.phi_range, self.polar_shape[0])[window[0]]
+        r = np.linspace(*self.r_range, self.polar_shape[1])[window[1]]
+        phi *= 180 / np.pi
+        return phi, r * self.scale
+
+    def window_remap_maps(self, window: Tuple[slice, slice], raw: bool = False) -> Tuple[np.ndarray, None] or None:
+        """
+        Remap maps of the part of the polar image within the window (see polar_window),
+        with the transformations composed in if raw is True. The coordinates coincide with
+        the ones of the full polar grids, which are not built. Maps are cached and shared
+        by geometries with the same parameters.
+        """
+        if self._y is None:
+            return
+        window = tuple(slice(*w.indices(size)[:2]) for w, size in zip(window, self.polar_shape))
+        if any(w.start >= w.stop for w in window):
+            return
+        raw_key = (self.t.key, tuple(self.shape)) if raw and self.t.key != '1234' else None
+        key = (tuple(self.beam_center), tuple(self.r_range), tuple(self.phi_range), tuple(self.polar_shape),
+               float_dtype().name, raw_key, tuple((w.start, w.stop) for w in window))
+        maps = _WINDOW_MAPS.get(key)
+        if maps is None:
+            yy, zz = _polar_coordinates(self.beam_center, self.r_range, self.phi_range, self.polar_shape, window)[2:]
+            if raw_key:
+                yy, zz = raw_coordinates(*raw_key, yy, zz)
+            maps = _WINDOW_MAPS[key] = _convert_maps(yy, zz)
+        return maps
+
+    def preview_remap_maps(self, polar_shape: Tuple[int, int], binning: int = 1) -> Tuple[np.ndarray, None] or None:
+        """
+        Remap maps of a coarse polar image covering the same r and phi ranges, calculated
+        from the image binned by an integer factor. The maps are not cached,
+        they are meant for previews while the geometry is being changed.
+        """
+        if self._y is None:
+            return
+        yy, zz = _polar_coordinates(self.beam_center, self.r_range, self.phi_range, polar_shape)[2:]
+        if binning > 1:
+            # the binned pixel i covers the pixels from i * binning to (i + 1) * binning - 1
+            offset = (binning - 1) / 2
+            yy = (yy - offset) / binning
+            zz = (zz - offset) / binning
+        return _convert_maps(yy, zz)
+
+    @property
+    def gi(self) -> GIParameters or None:
+        """
+        Grazing-incidence parameters used for reciprocal space maps (see reciprocal_space module).
+        """
+        return self._gi
+
+    def set_gi(self, gi: tuple or None):
+        self._gi = GIParameters(*map(float, gi)) if gi is not None else None
+
+    @property
+    def polar_key(self) -> tuple:
+        """
+        Parameters that define the polar image of an image with this geometry.
+        """
+        return tuple(self.shape), tuple(self.beam_center), self.t.key, tuple(self.polar_shape)
 
     @property
     def r_axis(self):
+        if self._r is None:
+            grid = self._get_polar_grid()
+            if grid is not None:
+                self._r = grid.r * self.scale
         return self._r
 
     @property
     def phi_axis(self):
-        return self._phi
+        grid = self._get_polar_grid()
+        return grid.phi if grid is not None else None
 
     @property
     def polar_aspect_ratio(self):
-        return self._polar_aspect_ratio
+        if self._y is None:
+            return
+        (p_min, p_max), (r_min, r_max) = self.phi_range, self.r_range
+        return (p_max - p_min) * 180 / np.pi * self.polar_shape[0] / (r_max - r_min) / self.polar_shape[1] / self.scale
 
     @property
     def y_axis(self):
@@ -139,6 +346,20 @@ class Geometry(object):
     def polar_shape(self):
         return self._polar_shape
 
+    @property
+    def auto_polar(self) -> bool:
+        """
+        True if the polar shape is derived from the detector geometry (see auto_polar_shape).
+        """
+        return self._auto_polar
+
+    @property
+    def polar_budget(self) -> int or None:
+        """
+        Maximal number of pixels of automatic polar images, the number of image pixels if None.
+        """
+        return self._polar_budget
+
     @property
     def scale(self):
         return self._scale.scale
@@ -169,31 +390,47 @@ class Geometry(object):
             return True
         return False
 
-    def set_polar_shape(self, shape: Tuple[int, int], update: bool = True):
-        if shape != self.polar_shape:
-            self._polar_shape = shape
+    def set_polar_shape(self, shape: Tuple[int, int] or str, update: bool = True):
+        """
+        Sets the polar shape (phi, r) or, with AUTO_POLAR_SHAPE, the automatic polar shape.
+        """
+        self._auto_polar = _is_auto(shape)
+        if self._auto_polar:
+            shape = self._calc_auto_polar_shape()
+        if tuple(shape) != self.polar_shape:
+            self._polar_shape = tuple(shape)
             if update:
                 self.update_polar()
             return True
         return False
 
+    def set_polar_budget(self, budget: int or None, update: bool = True):
+        self._polar_budget = int(budget) if budget else None
+        if self.auto_polar:
+            return self.set_polar_shape(AUTO_POLAR_SHAPE, update)
+        return False
+
     def update(self):
         if not self.is_available:
             return
         self._update_ranges()
-        self._update_polar_grid()
+        if self.auto_polar:
+            self._polar_shape = self._calc_auto_polar_shape()
+        self._polar_grid = None
         self._update_axes_on_scale()
 
     def update_polar(self):
-        self._update_polar_grid()
-        self._r *= self.scale
-        self._polar_aspect_ratio /= self.scale
+        self._polar_grid = None
+        self._r = None
 
     def _update_ranges(self):
         self._y = (np.arange(self._shape[1]) - self._beam_center.y)
         self._z = (np.arange(self._shape[0]) - self._beam_center.z)
 
-        yy, zz = np.meshgrid(self._y, self._z)
+        # r and phi are monotonic in both coordinates within each quadrant around the beam center,
+        # so the extrema are reached at the corners of the detector parts lying in the quadrants.
+        yy, zz = np.meshgrid(_quadrant_bounds(self._shape[1], self._beam_center.y) - self._beam_center.y,
+                             _quadrant_bounds(self._shape[0], self._beam_center.z) - self._beam_center.z)
         rr = np.sqrt(yy ** 2 + zz ** 2)
         phi = np.arctan2(zz, yy)
         self._r_range = (np.nanmin(rr), np.nanmax(rr))
@@ -201,21 +438,33 @@ class Geometry(object):
         angle, angle_std = (p_max + p_min) / 2 * 180 / np.pi, (p_max - p_min) * 180 / np.pi
         self._ring_bounds = (angle, angle_std)
 
-    def _update_polar_grid(self):
-        self._phi = np.linspace(*self.phi_range, self.polar_shape[0])
-        self._r = np.linspace(*self.r_range, self.polar_shape[1])
-
-        r_matrix = self._r[np.newaxis, :].repeat(self.polar_shape[0], axis=0)
-        p_matrix = self._phi[:, np.newaxis].repeat(self.polar_shape[1], axis=1)
-
-        self._polar_yy = r_matrix * np.cos(p_matrix) + self.beam_center.y
-        self._polar_zz = r_matrix * np.sin(p_matrix) + self.beam_center.z
-
-        self._phi *= 180 / np.pi
-
-        aspect_ratio = (np.nanmax(self._phi) - np.nanmin(self._phi)) * \
-                       self.polar_shape[0] / (self._r_range[1] - self._r_range[0]) / self.polar_shape[1]
-        self._polar_aspect_ratio = aspect_ratio
+    def _calc_auto_polar_shape(self) -> Tuple[int, int]:
+        budget = self.polar_budget or self.shape[0] * self.shape[1]
+        return auto_polar_shape(self.r_range, self.phi_range, budget)
+
+    def _get_polar_grid(self) -> _PolarGrid or None:
+        # grids are built on the first use, so that changing the beam center only updates the ranges
+        if self._polar_grid is not None and self._polar_grid.yy.dtype != float_dtype():
+            self._polar_grid = None
+        if self._polar_grid is None and self._y is not None:
+            # geometries of a series of images usually coincide, so the grids are shared
+            key = self._grid_key()
+            grid = _POLAR_GRIDS.get(key)
+            if grid is None:
+                grid = self._calc_polar_grid()
+                _POLAR_GRIDS[key] = grid
+            self._polar_grid = grid
+        return self._polar_grid
+
+    def _grid_key(self) -> tuple:
+        return (tuple(self.beam_center), tuple(self.r_range), tuple(self.phi_range), tuple(self.polar_shape),
+                float_dtype().name)
+
+    def _calc_polar_grid(self) -> _PolarGrid:
+        phi, r, polar_yy, polar_zz = _polar_coordinates(self.beam_center, self.r_range, self.phi_range,
+                                                        self.polar_shape)
+        phi *= 180 / np.pi
+        return _PolarGrid(phi, r, polar_yy, polar_zz)
 
     def _update_axes_on_scale(self, init: bool = True):
         if init:
@@ -223,10 +472,10 @@ class Geometry(object):
         else:
             scale = self.scale_change
 
-        self._r = self._r * scale
         self._y = self._y * scale
         self._z = self._z * scale
-        self._polar_aspect_ratio = self._polar_aspect_ratio / scale
+        # scaled on the next access
+        self._r = None
 
     def r2p(self, r):
         return (r - self.r_range[0]) / (self.r_range[1] - self.r_range[0]) * self.polar_shape[1]
@@ -234,3 +483,61 @@ class Geometry(object):
     def a2p(self, a):
         return (a / 180 * np.pi - self.phi_range[0]) / (self.phi_range[1] - self.phi_range[0]) * self.polar_shape[0]
 
+
+def auto_polar_shape(r_range: Tuple[float, float], phi_range: Tuple[float, float],
+                     budget: int = None) -> Tuple[int, int]:
+    """
+    Polar shape (phi, r) sampling the image at its pixel size: radial bins are one pixel wide
+    and angular bins are one pixel long at the largest radius, where the pixel footprint
+    covers the smallest angle. If the polar image exceeds the budget (number of pixels),
+    both sizes are reduced in the same proportion.
+    """
+    (r_min, r_max), (phi_min, phi_max) = r_range, phi_range
+    num_r = int(np.ceil(r_max - r_min)) + 1
+    num_phi = int(np.ceil(r_max * (phi_max - phi_min))) + 1
+    if budget and num_r * num_phi > budget:
+        factor = np.sqrt(budget / (num_r * num_phi))
+        num_r, num_phi = max(1, int(num_r * factor)), max(1, int(num_phi * factor))
+    return num_phi, num_r
+
+
+def _is_auto(polar_shape) -> bool:
+    # polar shapes read from h5 attributes are arrays
+    return isinstance(polar_shape, str) and polar_shape == AUTO_POLAR_SHAPE
+
+
+def _axis_slice(bounds: Tuple[float, float] or None, axis_range: Tuple[float, float], size: int) -> slice:
+    if bounds is None:
+        return slice(0, size)
+    step = (axis_range[1] - axis_range[0]) / max(size - 1, 1) or 1
+    start = int(np.floor((min(bounds) - axis_range[0]) / step))
+    stop = int(np.ceil((max(bounds) - axis_range[0]) / step)) + 1
+    return slice(min(max(start, 0), size), min(max(stop, 0), size))
+
+
+def _polar_coordinates(beam_center: BeamCenter, r_range: tuple, phi_range: tuple, polar_shape: tuple,
+                       window: Tuple[slice, slice] = (slice(None), slice(None))):
+    # parts of the grids within the window are calculated from the same axes as the full grids
+    phi = np.linspace(*phi_range, polar_shape[0])[window[0]]
+    r = np.linspace(*r_range, polar_shape[1])[window[1]]
+    # grids are calculated in the float type of the project without full-size temporaries
+    dtype = float_dtype()
+    r_row = r.astype(dtype)[np.newaxis, :]
+    yy = r_row * np.cos(phi).astype(dtype)[:, np.newaxis] + dtype.type(beam_center.y)
+    zz = r_row * np.sin(phi).astype(dtype)[:, np.newaxis] + dtype.type(beam_center.z)
+    return phi, r, yy, zz
+
+
+def _convert_maps(yy: np.ndarray, zz: np.ndarray) -> Tuple[np.ndarray, None]:
+    return cv2.convertMaps(np.asarray(yy, dtype=np.float32), np.asarray(zz, dtype=np.float32), cv2.CV_32FC2)
+
+
+def _quadrant_bounds(size: int, center: float) -> np.ndarray:
+    # first and last pixel indices below and above the center
+    split = min(max(int(np.ceil(center)), 0), size)
+    bounds = []
+    if split > 0:
+        bounds += [0, split - 1]
+    if split < size:
+        bounds += [split, size - 1]
+    return np.array(bounds, dtype=float)
@@ -13,10 +13,12 @@ from .geometry import Geometry
 class GeometryHolder(QObject):
     sigBeamCenterChanged = pyqtSignal()
     sigGeometryChangeFinished = pyqtSignal()
+    sigGeometryChanging = pyqtSignal()
     sigPolarGeometryChanged = pyqtSignal()
     sigTransformed = pyqtSignal()
     sigScaleChanged = pyqtSignal()
     sigRingBoundsChanged = pyqtSignal(tuple)
+    sigGIChanged = pyqtSignal()
 
     log = logging.getLogger(__name__)
 
@@ -27,6 +29,7 @@ class GeometryHolder(QObject):
         self._current_geometry = None
         self._ring_bounds = (0, np.pi * 2)
         self._current_key: ImageKey or None = None
+        self._change_pending: bool = False
 
     def transform_image(self, raw_image: np.ndarray):
         return self.geometry.t(raw_image)
@@ -48,21 +51,32 @@ class GeometryHolder(QObject):
     def is_default(self) -> bool:
         return self._current_geometry is None
 
-    def change_image(self, image_key: ImageKey, image: np.ndarray = None):
+    def change_image(self, image_key: ImageKey, image: np.ndarray = None,
+                     geometries: Tuple[Geometry, Geometry] = None, transformed: bool = False):
+        """
+        Changes the current image key and loads its geometry. If geometries are provided as
+        a (default_geometry, geometry) tuple, they are used instead of reading them from the
+        file manager. If transformed is True, the image is expected to be transformed already.
+        """
         if image_key == self._current_key:
             return
 
         self.save_state()
 
         self._current_key = image_key
+        self._change_pending = False
         if not self._current_key:
             return
 
-        self._default_geometry = self._fm.geometries.default[image_key.parent] or Geometry()
-        self._current_geometry = self._fm.geometries[image_key]
+        if geometries is None:
+            geometries = self._fm.geometries.default[image_key.parent], self._fm.geometries[image_key]
+
+        self._default_geometry = geometries[0] or Geometry()
+        self._current_geometry = geometries[1]
 
         if image is not None:
-            image = self.transform_image(image)
+            if not transformed:
+                image = self.transform_image(image)
             if image.shape != self.geometry.shape:
                 self.set_shape(image.shape)
         return image
@@ -93,6 +107,10 @@ class GeometryHolder(QObject):
 
     @pyqtSlot(tuple, bool, name='changeBeamCenter')
     def set_beam_center(self, beam_center: tuple, finished: bool = True):
+        """
+        Changes the beam center. Unfinished (interactive) changes emit sigGeometryChanging
+        instead of sigGeometryChangeFinished, which is emitted once by finish_change.
+        """
         if (beam_center[0] == self.geometry.beam_center.z and
                 beam_center[1] == self.geometry.beam_center.y):
             return
@@ -102,6 +120,16 @@ class GeometryHolder(QObject):
         self.sigBeamCenterChanged.emit()
         self.check_ring_bounds()
         if finished:
+            self._change_pending = False
+            self.sigGeometryChangeFinished.emit()
+        else:
+            self._change_pending = True
+            self.sigGeometryChanging.emit()
+
+    @pyqtSlot(name='finishGeometryChange')
+    def finish_change(self):
+        if self._change_pending:
+            self._change_pending = False
             self.sigGeometryChangeFinished.emit()
 
     def set_shape(self, shape: Tuple[int, int]):
@@ -109,11 +137,15 @@ class GeometryHolder(QObject):
             self._current_geometry = self.geometry.copy()
         self._current_geometry.set_shape(shape)
 
-    @pyqtSlot(tuple, name='changePolarShape')
-    def set_polar_shape(self, shape: Tuple[int, int]):
+    def set_polar_shape(self, shape: Tuple[int, int] or str, budget: int = None):
+        """
+        Sets the polar shape or, with AUTO_POLAR_SHAPE, the automatic polar shape limited by the budget.
+        """
         if not self._current_geometry:
             self._current_geometry = self.geometry.copy()
+        self._current_geometry.set_polar_budget(budget, update=False)
         self._current_geometry.set_polar_shape(shape)
+        self._change_pending = False
         self.sigGeometryChangeFinished.emit()
 
     @pyqtSlot(float, name='changeScale')
@@ -125,6 +157,18 @@ class GeometryHolder(QObject):
         self._current_geometry.set_scale(scale)
         self.sigScaleChanged.emit()
 
+    @pyqtSlot(object, name='changeGI')
+    def set_gi(self, gi: tuple or None):
+        """
+        Sets the grazing-incidence parameters (see GIParameters) used for reciprocal space maps.
+        """
+        if self.geometry.gi == (tuple(map(float, gi)) if gi is not None else None):
+            return
+        if not self._current_geometry:
+            self._current_geometry = self.geometry.copy()
+        self._current_geometry.set_gi(gi)
+        self.sigGIChanged.emit()
+
     def check_ring_bounds(self):
         if self.geometry and self.geometry.ring_bounds != self._ring_bounds:
             self._ring_bounds = self.geometry.ring_bounds
@@ -1,28 +1,42 @@
 import logging
-from typing import List
+from typing import List, Tuple
 from datetime import datetime as dt
 
 import numpy as np
 
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, QTimer, QThreadPool
 
 from .rois.roi_dict import RoiDict, Roi
-from .geometry import Geometry
+from .geometry import Geometry, AUTO_POLAR_SHAPE
+from .acquisition_profile import AcquisitionProfile
 from .geometry_holder import GeometryHolder
 from .polar_image import (PolarImage, InterpolationParams,
-                          INTERPOLATION_ALGORITHMS, INTERPOLATION_ALGORITHMS_INVERSED)
+                          INTERPOLATION_ALGORITHMS, INTERPOLATION_ALGORITHMS_INVERSED, AUTO_SIZE, FIXED_SIZE)
 from .file_manager import FileManager, ImageKey
-from .fitting import FitObject
+from .fitting import FitObject, RangeStrategy
+from .dtype_policy import float_dtype
+from .integration import AzimuthalIntegrator
+from .image_prefetch import ImagePrefetcher
+from .utils import Worker
 
 
 class ImageHolder(QObject):
     sigImageChanged = pyqtSignal()
     sigPolarImageChanged = pyqtSignal()
+    sigPolarPreviewChanged = pyqtSignal()
+    sigRadialProfileChanged = pyqtSignal()
     sigFitOpen = pyqtSignal(object)
     sigFitSaved = pyqtSignal(tuple)
     sigEmptyImage = pyqtSignal()
     sigCIFPeaksChanged = pyqtSignal(float)
 
+    # polar previews shown while the beam center is dragged: the image is binned to about
+    # PREVIEW_IMAGE_SIZE pixels, the polar shape is reduced to PREVIEW_POLAR_SIZE and
+    # previews are calculated at most once per PREVIEW_INTERVAL milliseconds
+    PREVIEW_IMAGE_SIZE = 512
+    PREVIEW_POLAR_SIZE = 256
+    PREVIEW_INTERVAL = 40
+
     log = logging.getLogger(__name__)
 
     def __init__(self, fm: FileManager, g_holder: GeometryHolder, roi_dict: RoiDict):
@@ -33,10 +47,23 @@ class ImageHolder(QObject):
         self._current_key: ImageKey = None
         self._polar_image = PolarImage()
         self._g_holder = g_holder
-
+        self._prefetcher = ImagePrefetcher(fm)
+        self._polar_preview = None
+        self._binned_image = None
+        self._integrator = None
+        self._integrator_key = None
+        self._q_thread_pool = QThreadPool(self)
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self.PREVIEW_INTERVAL)
+        self._preview_timer.timeout.connect(self._update_polar_preview)
+
+        self._fm.sigProjectClosed.connect(self._prefetcher.clear)
+        self._fm.sigFloatDtypeChanged.connect(self._prefetcher.clear)
         self._roi_dict.sigFitRoisOpen.connect(self.open_fit_rois)
         self._g_holder.sigPolarGeometryChanged.connect(self._update_polar_image)
         self._g_holder.sigGeometryChangeFinished.connect(self._update_polar_image)
+        self._g_holder.sigGeometryChanging.connect(self._schedule_polar_preview)
         self._g_holder.sigTransformed.connect(self._update_image)
 
     @property
@@ -59,10 +86,18 @@ class ImageHolder(QObject):
     def polar_image(self) -> np.ndarray or None:
         return self._polar_image.polar_image
 
+    @property
+    def polar_preview(self) -> np.ndarray or None:
+        return self._polar_preview
+
     @property
     def polar_params(self) -> InterpolationParams:
         return self._polar_image.polar_params
 
+    @property
+    def prefetcher(self) -> ImagePrefetcher:
+        return self._prefetcher
+
     @property
     def g_holder(self) -> GeometryHolder:
         return self._g_holder
@@ -85,17 +120,32 @@ class ImageHolder(QObject):
             self.sigEmptyImage.emit()
             return
 
-        image = self._fm.images[image_key]
+        prefetched = self._prefetcher.take(image_key)
+
+        if prefetched is not None:
+            image = prefetched.raw_image
+        else:
+            image = self._fm.images[image_key]
 
         if image is None:
             self.sigEmptyImage.emit()
             return
 
-        polar_image = self._fm.polar_images[image_key]
         prev_geometry = self.geometry
-
         self._raw_image = image
-        self._image = self.g_holder.change_image(image_key, image)
+
+        if prefetched is not None:
+            self._image = self.g_holder.change_image(
+                image_key, prefetched.image, (prefetched.default_geometry, prefetched.geometry), transformed=True)
+            polar_image = prefetched.polar_image
+            if prefetched.algorithm is not None and prefetched.algorithm != self.polar_params.algorithm:
+                polar_image = None
+            roi_data = prefetched.roi_data
+        else:
+            self._image = self.g_holder.change_image(image_key, image)
+            polar_image = self._fm.polar_images.get(image_key, self.geometry, self.polar_params.algorithm)
+            roi_data = None
+
         self._update_polar_image(polar_image, False)
 
         if self.geometry.beam_center != prev_geometry.beam_center:
@@ -107,33 +157,98 @@ class ImageHolder(QObject):
         self.sigPolarImageChanged.emit()
 
         # self.g_holder.check_ring_bounds()
-        self._roi_dict.change_image(image_key)
+        self._roi_dict.change_image(image_key, roi_data)
+
+        self._prefetcher.prefetch_neighbours(image_key, self.polar_params.algorithm)
 
     def get_data_by_key(self, image_key: ImageKey, save: bool = False):
-        polar_image = self._fm.polar_images[image_key]
         image = self._fm.images[image_key]
         geometry = self.g_holder.get_geometry(image_key)
         if image is None or geometry is None:
             return None, None, None
 
-        image = geometry.t(image)
+        raw_image, image = image, geometry.t(image)
         if geometry.shape != image.shape:
             geometry.set_shape(image.shape)
+        algorithm = self.polar_params.algorithm
+        polar_image = self._fm.polar_images.get(image_key, geometry, algorithm)
         if polar_image is None:
-            yy, zz = geometry.polar_grids
-            polar_image = self.polar.calc_polar_image(image, yy, zz, self.polar_params.algorithm)
-            if save:
-                self._fm.polar_images[image_key] = polar_image
+            polar_image = self.polar.remap(raw_image, geometry, algorithm, raw=True)
+            if save and polar_image is not None:
+                self._fm.polar_images.set(image_key, polar_image, geometry, algorithm)
         return image, polar_image, geometry
 
+    def get_polar_window_by_key(self, image_key: ImageKey, r_range: Tuple[float, float] = None,
+                                phi_range: Tuple[float, float] = None, r_pad: int = 0):
+        """
+        Returns the part of the polar image within the ranges (see Geometry.polar_window) extended
+        by r_pad radial bins on both sides, with the parts of phi and r axes, or Nones if the ranges
+        are outside of the polar image. The polar image of the current image or a stored one is sliced,
+        otherwise only the part is calculated.
+        """
+        if image_key is not None and image_key == self._current_key:
+            image, geometry, polar_image = self.raw_image, self.geometry, self.polar_image
+        else:
+            image, geometry, polar_image = self._fm.images[image_key], self.g_holder.get_geometry(image_key), None
+        if image is None or geometry is None:
+            return None, None, None
+
+        shape = geometry.t(image).shape
+        if geometry.shape != shape:
+            geometry.set_shape(shape)
+        window = geometry.polar_window(r_range, phi_range)
+        if window is None or any(w.start >= w.stop for w in window):
+            return None, None, None
+        phi_window, r_window = window
+        window = phi_window, slice(max(r_window.start - r_pad, 0), min(r_window.stop + r_pad, geometry.polar_shape[1]))
+        algorithm = self.polar_params.algorithm
+        if polar_image is None:
+            polar_image = self._fm.polar_images.get(image_key, geometry, algorithm)
+        if polar_image is not None:
+            polar_part = polar_image[window]
+        else:
+            polar_part = self.polar.remap_window(image, geometry, window, algorithm, raw=True)
+        if polar_part is None or not polar_part.size:
+            return None, None, None
+        return (polar_part, *geometry.window_axes(window))
+
     def _update_polar_image(self, polar_image=None, emit: bool = True):
+        self._preview_timer.stop()
+        self._polar_preview = self._binned_image = None
         if polar_image is not None:
             self._polar_image.set_polar_image(polar_image)
         else:
-            self._polar_image.update(self.geometry, self.image)
+            self._polar_image.update(self.geometry, self.raw_image, raw=True)
         if emit:
             self.sigPolarImageChanged.emit()
 
+    @pyqtSlot(name='schedulePolarPreview')
+    def _schedule_polar_preview(self):
+        # the timer is not restarted by further changes, which caps the preview rate
+        if not self._preview_timer.isActive():
+            self._preview_timer.start()
+
+    @pyqtSlot(name='updatePolarPreview')
+    def _update_polar_preview(self):
+        self._polar_preview = self.calc_polar_preview()
+        if self._polar_preview is not None:
+            self.sigPolarPreviewChanged.emit()
+
+    def calc_polar_preview(self) -> np.ndarray or None:
+        """
+        Calculates a coarse polar image of the current image with the current geometry
+        from the binned image. Its shape is the polar shape reduced to PREVIEW_POLAR_SIZE.
+        """
+        if self.image is None:
+            return
+        if self._binned_image is None or self._binned_image[0] is not self.image:
+            binning = max(1, max(self.image.shape) // self.PREVIEW_IMAGE_SIZE)
+            self._binned_image = self.image, binning, AcquisitionProfile(binning).apply(self.image)
+        _, binning, binned_image = self._binned_image
+        reduction = max(1., max(self.geometry.polar_shape) / self.PREVIEW_POLAR_SIZE)
+        polar_shape = tuple(max(1, int(round(size / reduction))) for size in self.geometry.polar_shape)
+        return self.polar.remap_preview(binned_image, self.geometry, polar_shape, binning)
+
     def _update_image(self, polar_image: np.ndarray = None, emit: bool = True) -> None:
         if self.raw_image is None:
             return
@@ -146,19 +261,53 @@ class ImageHolder(QObject):
             self.sigImageChanged.emit()
 
     def set_polar_image_params(self, params: dict):
-        shape = (params.get('phi_size', self.polar_params.shape[0]),
-                 params.get('r_size', self.polar_params.shape[1]))
+        if params.get('size') == AUTO_SIZE:
+            shape = AUTO_POLAR_SHAPE
+        else:
+            shape = (params.get('phi_size', self.polar_params.shape[0]),
+                     params.get('r_size', self.polar_params.shape[1]))
         algorithm = INTERPOLATION_ALGORITHMS.get(params.get('mode', None), self.polar_params.algorithm)
-        self.polar.set_params(shape=shape, algorithm=algorithm)
-        self.g_holder.set_polar_shape(shape)
+        self.polar.set_params(algorithm=algorithm)
+        self.g_holder.set_polar_shape(shape, params.get('max_pixels'))
+        self.polar.set_params(shape=self.geometry.polar_shape)
 
     def polar_image_params_dict(self):
         return dict(phi_size=self.geometry.polar_shape[0], r_size=self.geometry.polar_shape[1],
+                    size=AUTO_SIZE if self.geometry.auto_polar else FIXED_SIZE,
+                    max_pixels=self.geometry.polar_budget,
                     algorithm=INTERPOLATION_ALGORITHMS_INVERSED[self.polar_params.algorithm])
 
     def get_radial_profile(self) -> np.ndarray or None:
+        """
+        Mean intensity of the detector pixels in the radial bins of the polar image.
+        The integration matrix is calculated in the background, the profile of the polar image
+        is returned until it is ready (sigRadialProfileChanged is emitted then).
+        """
+        if self.image is None:
+            return
+        key = self.geometry.polar_key, float_dtype().name
+        if self._integrator is not None and self._integrator[0] == key:
+            return self._integrator[1].integrate(self.image)
+        self._build_integrator(key)
         return self.polar.get_radial_profile()
 
+    def _build_integrator(self, key: tuple):
+        if self._integrator_key == key:
+            return
+        self._integrator_key = key
+        worker = Worker(_create_integrator, key, self.geometry.copy())
+        worker.signals.result.connect(self._set_integrator)
+        self._q_thread_pool.start(worker)
+
+    @pyqtSlot(object, name='setIntegrator')
+    def _set_integrator(self, result: tuple):
+        key, integrator = result
+        if key != self._integrator_key:
+            return
+        self._integrator = result
+        if self.image is not None and key == (self.geometry.polar_key, float_dtype().name):
+            self.sigRadialProfileChanged.emit()
+
     def get_angular_profile(self, key: int) -> np.ndarray or None:
         if key is None:
             try:
@@ -168,17 +317,32 @@ class ImageHolder(QObject):
         else:
             roi = self._roi_dict[key]
 
-        return self.polar.get_angular_profile(self.geometry, roi)
+        return self.get_angular_profile_by_key(self._current_key, roi)
+
+    def get_angular_profile_by_key(self, image_key: ImageKey, roi: Roi) -> np.ndarray or None:
+        """
+        Angular profile of the ring roi, only the ring is calculated if the polar image is not stored.
+        """
+        polar_part = self.get_polar_window_by_key(image_key, roi.r_range)[0]
+        if polar_part is not None:
+            return np.nanmean(polar_part, axis=1, dtype=float_dtype())
 
     @pyqtSlot(list, name='openFitRois')
     def open_fit_rois(self, rois: List[Roi]):
-        self.sigFitOpen.emit(self.create_fit_object(rois))
-
-    def create_fit_object(self, rois: List[Roi]) -> FitObject:
-        fit_object = FitObject(self._current_key, self.polar_image,
-                               self.geometry.r_axis, self.geometry.phi_axis)
+        fit_object = self.create_fit_object(rois)
+        if fit_object is not None:
+            self.sigFitOpen.emit(fit_object)
+
+    def create_fit_object(self, rois: List[Roi]) -> FitObject or None:
+        """
+        Creates a fit object of the current image on the full radial axis, so that fit ranges
+        are not limited and saved profiles (defined on the full axis) can be applied.
+        """
+        polar_image, phi_axis, r_axis = self.get_polar_window_by_key(self._current_key)
+        if polar_image is None:
+            return
+        fit_object = FitObject(self._current_key, polar_image, r_axis, phi_axis)
         profile = self._fm.profiles[self._current_key]
-
         if profile:
             fit_object.set_profile(profile)
 
@@ -186,6 +350,26 @@ class ImageHolder(QObject):
             fit_object.new_fit(roi)
         return fit_object
 
+    def create_fit_object_by_key(self, image_key: ImageKey, rois: List[Roi]) -> FitObject or None:
+        """
+        Creates a fit object from the radial band of the polar image covering the default fit ranges of the rois,
+        so that only the band is calculated if the polar image is not stored. Meant for folder-wide fitting,
+        saved profiles are not applied since they are defined on the full radial axis.
+        """
+        if not rois:
+            return
+        factor = RangeStrategy().range_factor + 1
+        r_range = (min(roi.radius - roi.width * factor for roi in rois),
+                   max(roi.radius + roi.width * factor for roi in rois))
+        # fit ranges are at least FitObject.MINIMAL_NUM radial bins wide
+        polar_part, phi_axis, r_axis = self.get_polar_window_by_key(image_key, r_range, r_pad=FitObject.MINIMAL_NUM)
+        if polar_part is None:
+            return
+        fit_object = FitObject(image_key, polar_part, r_axis, phi_axis)
+        for roi in rois:
+            fit_object.new_fit(roi)
+        return fit_object
+
     @pyqtSlot(object, name='applyFit')
     def apply_fit(self, fit_object: FitObject):
         name = dt.now().ctime()
@@ -198,3 +382,7 @@ class ImageHolder(QObject):
         self._roi_dict.apply_fit([fit.roi for fit in fit_object.fits.values()], fit_object.image_key)
 
         self.sigFitSaved.emit((fit_object.image_key, name))
+
+
+def _create_integrator(key: tuple, geometry: Geometry) -> Tuple[tuple, AzimuthalIntegrator]:
+    return key, AzimuthalIntegrator(geometry)
@@ -0,0 +1,137 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError
+from threading import Lock
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from .cache import ByteLRUCache, get_nbytes
+from .geometry import Geometry
+from .polar_image import PolarImage
+from .file_manager import FileManager, ImageKey, FolderKey, AbstractKey
+from .rois.roi_data import RoiData
+
+
+class PrefetchedImage(NamedTuple):
+    raw_image: np.ndarray
+    image: np.ndarray
+    polar_image: np.ndarray or None
+    algorithm: int or None  # interpolation of the polar image
+    geometry: Geometry or None
+    default_geometry: Geometry or None
+    roi_data: RoiData or None
+
+
+class ImagePrefetcher(object):
+    """
+    Loads the frames next to the current image in a background thread:
+    raw and transformed images, stored or freshly calculated polar images, geometries and
+    roi data are kept in a byte-bounded cache. Entries are taken from the cache once
+    (ownership of geometries and roi data passes to the caller) and are dropped whenever
+    the file manager reports that the corresponding data has changed.
+    """
+
+    log = logging.getLogger(__name__)
+
+    def __init__(self, fm: FileManager, *,
+                 next_num: int = 2, prev_num: int = 1,
+                 max_bytes: int = 512 * 2 ** 20):
+        self._fm = fm
+        self.next_num = next_num
+        self.prev_num = prev_num
+        self._cache = ByteLRUCache(max_bytes, get_size=lambda data: get_nbytes(data[:3]))
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ImagePrefetcher')
+        self._pending: Dict[ImageKey, Future] = {}
+        self._lock = Lock()
+        self._version: int = 0
+
+        self._fm.add_data_changed_callback(self.invalidate)
+
+    @property
+    def cache(self) -> ByteLRUCache:
+        return self._cache
+
+    def take(self, image_key: ImageKey) -> PrefetchedImage or None:
+        with self._lock:
+            future = self._pending.pop(image_key, None)
+        if future is not None:
+            try:
+                future.result()
+            except CancelledError:
+                pass
+        return self._cache.pop(image_key)
+
+    def prefetch_neighbours(self, image_key: ImageKey, algorithm: int):
+        keys = self._neighbours(image_key)
+
+        with self._lock:
+            for key in list(self._pending.keys()):
+                if key not in keys and self._pending[key].cancel():
+                    del self._pending[key]
+            for key in keys:
+                if key not in self._cache and key not in self._pending:
+                    self._pending[key] = self._executor.submit(self._load, key, algorithm, self._version)
+
+    def invalidate(self, key: AbstractKey or None):
+        with self._lock:
+            self._version += 1
+        if key is None:
+            self._cache.clear()
+        elif isinstance(key, FolderKey):
+            self._cache.remove_if(lambda k: k == key or k.parent == key)
+        else:
+            del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+        self._cache.clear()
+
+    def _neighbours(self, image_key: ImageKey) -> List[ImageKey]:
+        folder: FolderKey = image_key.parent
+        if not folder:
+            return []
+        idx = image_key.idx
+        if idx is None:
+            idx = folder.image_idx(image_key)
+            if idx is None:
+                return []
+        indices = list(range(idx + 1, idx + 1 + self.next_num)) + \
+                  list(range(idx - 1, max(idx - 1 - self.prev_num, -1), -1))
+        keys = [folder.image_by_key(i) for i in indices]
+        return [key for key in keys if key is not None]
+
+    def _load(self, image_key: ImageKey, algorithm: int, version: int):
+        try:
+            data = self._load_data(image_key, algorithm)
+        except Exception as err:
+            self.log.exception(err)
+            data = None
+
+        with self._lock:
+            self._pending.pop(image_key, None)
+            if data is None or version != self._version:
+                return
+            self._cache[image_key] = data
+
+    def _load_data(self, image_key: ImageKey, algorithm: int) -> PrefetchedImage or None:
+        raw_image = self._fm.images[image_key]
+        if raw_image is None:
+            return
+
+        geometry = self._fm.geometries[image_key]
+        default_geometry = self._fm.geometries.default[image_key.parent]
+        effective_geometry = geometry or default_geometry or Geometry()
+
+        image = effective_geometry.t(raw_image)
+        polar_image = self._fm.polar_images.get(image_key, effective_geometry, algorithm)
+
+        if polar_image is None and effective_geometry.shape == image.shape:
+            polar_image = PolarImage.remap(raw_image, effective_geometry, algorithm, raw=True)
+
+        roi_data = self._fm.rois_data[image_key]
+
+        return PrefetchedImage(raw_image, image, polar_image, algorithm, geometry, default_geometry, roi_data)
@@ -2,9 +2,11 @@ import cv2 as cv
 import numpy as np
 from numpy import nanmax, nanmin, nan_to_num
 
+from .dtype_policy import as_float
+
 
 def clahe(img, limit: float = 5000):
-    return cv.createCLAHE(clipLimit=limit, tileGridSize=(1, 1)).apply(img.astype('uint16')).astype(np.float32)
+    return as_float(cv.createCLAHE(clipLimit=limit, tileGridSize=(1, 1)).apply(img.astype('uint16')))
 
 
 def norm_img(img):
@@ -17,6 +19,8 @@ def standard_contrast_correction(
         coef: float = 5000,
         log: bool = True,
 ):
+    # integer images are converted once, the following operations keep the float type
+    img = as_float(img)
     if log:
         img = np.log10(norm_img(img) * coef + 1)
 
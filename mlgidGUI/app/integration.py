@@ -0,0 +1,125 @@
+from typing import Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .cache import ByteLRUCache
+from .geometry import Geometry
+from .dtype_policy import float_dtype, as_float
+
+__all__ = ['AzimuthalIntegrator']
+
+
+def _matrix_nbytes(matrix: sparse.csr_matrix) -> int:
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+
+_MATRICES = ByteLRUCache(2 ** 28, get_size=_matrix_nbytes)
+
+_CHUNK_SIZE = 2 ** 20
+
+
+class AzimuthalIntegrator(object):
+    """
+    Radial profiles and cakes calculated directly from detector pixels.
+
+    Pixel contributions to the polar bins of the geometry (radial bins centered at
+    geometry.r_axis, angular bins at geometry.phi_axis) are stored as a sparse CSR matrix,
+    so that integrating a frame is a single matrix-vector product. Pixels are split into
+    split x split sub-pixels, each contributing to the bin it falls in.
+    Matrices are calculated in the float type of the project and shared by geometries
+    with the same parameters.
+
+    The mask (True for excluded pixels) and the normalization (for instance, a flat field or
+    a solid angle correction) are arrays of the image shape. The result in each bin is
+    sum(w * image) / sum(w * normalization) over the unmasked pixels, which is the mean intensity
+    when no normalization is given. Empty bins are set to zero.
+    """
+
+    def __init__(self, geometry: Geometry, *, angular: bool = False, split: int = 2,
+                 mask: np.ndarray = None, normalization: np.ndarray = None):
+        self._shape = tuple(geometry.shape)
+        self._result_shape = tuple(geometry.polar_shape) if angular else tuple(geometry.polar_shape[1:])
+        self._matrix = _get_matrix(geometry, angular, split)
+
+        if mask is not None:
+            weights = (~np.asarray(mask, dtype=bool)).ravel().astype(self._matrix.dtype)
+            self._matrix = (self._matrix @ sparse.diags(weights)).tocsr()
+        if normalization is None:
+            self._normalization = np.ones(self._matrix.shape[1], dtype=float_dtype())
+        else:
+            self._normalization = as_float(normalization, contiguous=True).ravel()
+        self._denominator = self._matrix @ self._normalization
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """
+        Shape of the result: (phi, r) for cakes and (r,) for radial profiles.
+        """
+        return self._result_shape
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        return self._matrix
+
+    def integrate(self, image: np.ndarray) -> np.ndarray or None:
+        if image is None or tuple(image.shape) != self._shape:
+            return
+        image = as_float(image, contiguous=True).ravel()
+        denominator = self._denominator
+        if np.isnan(image.sum()):
+            # nan pixels are excluded like the masked ones, which costs a second product
+            valid = ~np.isnan(image)
+            image = np.where(valid, image, 0)
+            denominator = self._matrix @ np.where(valid, self._normalization, 0)
+        signal = self._matrix @ image
+        result = np.zeros_like(signal)
+        np.divide(signal, denominator, out=result, where=denominator > 0)
+        return result.reshape(self.shape)
+
+
+def _get_matrix(geometry: Geometry, angular: bool, split: int) -> sparse.csr_matrix:
+    # the matrix does not depend on the scale and transformations (geometries describe transformed images)
+    key = (tuple(geometry.shape), tuple(geometry.beam_center), tuple(geometry.r_range),
+           tuple(geometry.phi_range), tuple(geometry.polar_shape), angular, split, float_dtype().name)
+    matrix = _MATRICES.get(key)
+    if matrix is None:
+        matrix = _calc_matrix(geometry, angular, split)
+        _MATRICES[key] = matrix
+    return matrix
+
+
+def _calc_matrix(geometry: Geometry, angular: bool, split: int) -> sparse.csr_matrix:
+    num_phi, num_r = geometry.polar_shape
+    num_bins = num_phi * num_r if angular else num_r
+    (r_min, r_max), (phi_min, phi_max) = geometry.r_range, geometry.phi_range
+    r_step = (r_max - r_min) / max(num_r - 1, 1) or 1
+    phi_step = (phi_max - phi_min) / max(num_phi - 1, 1) or 1
+
+    offsets = (np.arange(split) + 0.5) / split - 0.5
+    dtype = float_dtype()
+    weight = dtype.type(1 / split ** 2)
+    rows_per_chunk = max(1, _CHUNK_SIZE // geometry.shape[1])
+    chunks = []
+
+    for z_start in range(0, geometry.shape[0], rows_per_chunk):
+        z = np.arange(z_start, min(z_start + rows_per_chunk, geometry.shape[0])) - geometry.beam_center.z
+        y = np.arange(geometry.shape[1]) - geometry.beam_center.y
+        bins = []
+        for dz in offsets:
+            for dy in offsets:
+                yy, zz = np.meshgrid(y + dy, z + dz)
+                r_bins = np.clip(np.rint((np.hypot(yy, zz) - r_min) / r_step), 0, num_r - 1).astype(np.int32)
+                if angular:
+                    phi_bins = np.clip(np.rint((np.arctan2(zz, yy) - phi_min) / phi_step),
+                                       0, num_phi - 1).astype(np.int32)
+                    r_bins += phi_bins * num_r
+                bins.append(r_bins.ravel())
+        num_chunk_pixels = bins[0].size
+        columns = np.tile(np.arange(num_chunk_pixels, dtype=np.int32), len(bins))
+        data = np.full(columns.size, weight, dtype=dtype)
+        # duplicate entries (sub-pixels in the same bin) are summed by the conversion
+        chunks.append(sparse.csc_matrix((data, (np.concatenate(bins), columns)),
+                                        shape=(num_bins, num_chunk_pixels)))
+
+    return sparse.hstack(chunks, format='csr')
@@ -0,0 +1,283 @@
+import logging
+import re
+from datetime import datetime
+from threading import Event
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+import tifffile
+
+from .edf_reader import read_edf_header
+from .file_manager import FileManager, FolderKey, ImageKey, H5_FILE_POOL
+from .file_manager.keys import FrameKey, H5Key
+
+logger = logging.getLogger(__name__)
+
+_TIMESTAMP_COLUMNS = ('Date', 'date', 'DateTime', 'time', 'Time')
+_TIMESTAMP_FORMATS = (
+    '%a %b %d %H:%M:%S %Y',
+    '%Y:%m:%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%b/%d %H:%M:%S.%f',
+)
+
+_DESCRIPTION_ITEM = re.compile(r'^([A-Za-z_][\w.\-]*)\s*(?:=|:|\s)\s*(.*)$')
+_NUMBER_WITH_UNIT = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*[A-Za-z%]*\s*$')
+
+
+class MetadataTable(object):
+    """
+    Columnar table of header metadata of the images of a folder. Rows are identified by
+    the source file path and the frame or dataset of the image (see row_key), numeric columns are float arrays (NaN for missing values),
+    other columns are arrays of strings. The 'timestamp' column contains the acquisition
+    time in seconds parsed from the header dates, 'file_mtime' the modification time of the file.
+    """
+
+    def __init__(self, row_keys: List[str], stamps: List[tuple], columns: Dict[str, np.ndarray]):
+        self.row_keys: List[str] = row_keys
+        self.stamps: List[tuple] = stamps
+        self._columns: Dict[str, np.ndarray] = columns
+        self._rows: Dict[str, int] = {row_id: i for i, row_id in enumerate(row_keys)}
+
+    @classmethod
+    def from_rows(cls, row_keys: List[str], stamps: List[tuple], rows: List[Dict[str, Any]]) -> 'MetadataTable':
+        names = sorted(set().union(*rows)) if rows else []
+        columns = {name: _to_column([row.get(name) for row in rows]) for name in names}
+        return cls(row_keys, stamps, columns)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns.keys())
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def row(self, row_id: str) -> Dict[str, Any] or None:
+        idx = self._rows.get(row_id)
+        if idx is not None:
+            return {name: column[idx] for name, column in self._columns.items() if not _is_missing(column[idx])}
+
+    def values(self, keys: Iterable[ImageKey], name: str) -> np.ndarray:
+        """
+        Returns values of the column for the image keys (NaN or '' for keys that are not indexed).
+        """
+        column = self._columns[name]
+        missing = np.nan if column.dtype.kind == 'f' else ''
+        indices = [self._rows.get(row_key(key)) for key in keys]
+        return np.array([missing if idx is None else column[idx] for idx in indices], dtype=column.dtype)
+
+    def sort_keys(self, keys: Iterable[ImageKey], name: str, reverse: bool = False) -> List[ImageKey]:
+        """
+        Sorts image keys by the column values. Keys without values are put at the end.
+        """
+        keys = list(keys)
+        values = self.values(keys, name)
+        if values.dtype.kind == 'f':
+            missing = np.isnan(values)
+            order = np.argsort(-values if reverse else values, kind='stable')
+        else:
+            missing = values == ''
+            order = np.argsort(values, kind='stable')
+            if reverse:
+                order = order[::-1]
+        order = [i for i in order if not missing[i]] + [i for i in np.flatnonzero(missing)]
+        return [keys[i] for i in order]
+
+    def filter_keys(self, keys: Iterable[ImageKey], name: str,
+                    min_value: float = None, max_value: float = None,
+                    predicate: Callable[[np.ndarray], np.ndarray] = None) -> List[ImageKey]:
+        """
+        Selects image keys whose column values are within [min_value, max_value]
+        and/or satisfy a vectorized predicate.
+        """
+        keys = list(keys)
+        values = self.values(keys, name)
+        mask = np.ones(len(keys), dtype=bool)
+        if min_value is not None:
+            mask &= values >= min_value
+        if max_value is not None:
+            mask &= values <= max_value
+        if predicate is not None:
+            mask &= predicate(values)
+        return [key for key, selected in zip(keys, mask) if selected]
+
+    def __len__(self):
+        return len(self.row_keys)
+
+    def __repr__(self):
+        return f'<MetadataTable({len(self)} rows, {len(self._columns)} columns)>'
+
+
+def row_key(key: ImageKey) -> str:
+    try:
+        source_path = key.source_path.resolve()
+    except AttributeError:
+        source_path = ''
+    return f'{source_path}|{key._file_key()}'
+
+
+def read_key_metadata(key: ImageKey) -> Dict[str, Any]:
+    """
+    Reads header metadata of the image without decoding pixel data:
+    edf headers, tiff tags of the frame page or h5 dataset attributes.
+    """
+    metadata = {}
+
+    if isinstance(key, H5Key):
+        with H5_FILE_POOL.open(key.h5path) as f:
+            dset = f[key.h5key]
+            metadata.update((name, _to_scalar(value)) for name, value in dset.attrs.items())
+    else:
+        path = key.source_path
+        if path.name.endswith(('.edf', '.edf.gz')):
+            metadata.update(_expand_lists(read_edf_header(path)))
+        elif path.suffix in ('.tif', '.tiff'):
+            metadata.update(_read_tiff_tags(path, key.frame if isinstance(key, FrameKey) else 0))
+
+    try:
+        metadata['file_mtime'] = key.source_path.stat().st_mtime
+    except (AttributeError, OSError):
+        pass
+    metadata['timestamp'] = _parse_timestamp(metadata)
+    return {name: value for name, value in metadata.items() if value is not None}
+
+
+def build_metadata_index(fm: FileManager, folder_key: FolderKey, *,
+                         process_callback: Callable[[int], None] = None,
+                         set_max_callback: Callable[[int], None] = None,
+                         cancel_event: Event = None) -> MetadataTable or None:
+    """
+    Indexes the headers of all images of the folder and stores the table in the project.
+    Rows of files that have not changed since the previous indexing are reused.
+    Meant to be run as a background job (see UpdateWorker). Returns None if cancelled.
+    """
+    keys = list(folder_key.image_children)
+    if set_max_callback:
+        set_max_callback(len(keys))
+
+    previous: MetadataTable or None = fm.metadata_index[folder_key]
+    row_keys, stamps, rows = [], [], []
+
+    for i, key in enumerate(keys, 1):
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        row_id, stamp = row_key(key), _stamp(key)
+        row = None
+        if previous is not None and stamp is not None:
+            idx = previous._rows.get(row_id)
+            if idx is not None and previous.stamps[idx] == stamp:
+                row = previous.row(row_id)
+        if row is None:
+            try:
+                row = read_key_metadata(key)
+            except Exception as err:
+                logger.exception(err)
+                row = {}
+        row_keys.append(row_id)
+        stamps.append(stamp)
+        rows.append(row)
+        if process_callback:
+            process_callback(i)
+
+    table = MetadataTable.from_rows(row_keys, stamps, rows)
+    fm.metadata_index[folder_key] = table
+    return table
+
+
+def _read_tiff_tags(path, frame: int) -> Dict[str, Any]:
+    metadata = {}
+    with tifffile.TiffFile(str(path)) as tif:
+        # virtual frames (ImageJ stacks with a single IFD) share the tags of the first page
+        page = tif.pages[frame] if frame < len(tif.pages) else tif.pages[0]
+        for tag in page.tags.values():
+            value = _to_scalar(tag.value)
+            if value is not None:
+                metadata[tag.name] = value
+    description = metadata.get('ImageDescription')
+    if isinstance(description, str):
+        metadata.update(_parse_description(description))
+    return metadata
+
+
+def _parse_description(description: str) -> Dict[str, str]:
+    # 'key=value', 'key: value' and Pilatus-like '# key value' lines
+    items = {}
+    for line in description.splitlines():
+        match = _DESCRIPTION_ITEM.match(line.strip().lstrip('#').strip())
+        if match:
+            items[match.group(1)] = match.group(2).strip()
+    return items
+
+
+def _expand_lists(header: Dict[str, str]) -> Dict[str, Any]:
+    # ESRF headers keep motor and counter positions as space separated lists:
+    # motor_mne = th tth; motor_pos = 0.1 0.2 -> motor_th = 0.1, motor_tth = 0.2
+    metadata = dict(header)
+    for name, value in header.items():
+        if not name.endswith('_mne'):
+            continue
+        prefix = name[:-len('_mne')]
+        positions = header.get(f'{prefix}_pos')
+        if positions is None:
+            continue
+        for mne, pos in zip(value.split(), positions.split()):
+            metadata[f'{prefix}_{mne}'] = pos
+    return metadata
+
+
+def _parse_timestamp(metadata: Dict[str, Any]) -> float or None:
+    for name in _TIMESTAMP_COLUMNS:
+        value = metadata.get(name)
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        for timestamp_format in _TIMESTAMP_FORMATS:
+            try:
+                return datetime.strptime(value, timestamp_format).timestamp()
+            except ValueError:
+                continue
+
+
+def _to_scalar(value) -> Any:
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8').strip('\x00')
+        except UnicodeDecodeError:
+            return
+    if isinstance(value, np.ndarray) and value.size == 1:
+        value = value.item()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (bool, int, float, str)):
+        return value
+
+
+def _to_column(values: List[Any]) -> np.ndarray:
+    try:
+        return np.array([np.nan if value is None else _to_number(value) for value in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array(['' if value is None else str(value) for value in values], dtype=object)
+
+
+def _to_number(value) -> float:
+    if isinstance(value, str):
+        match = _NUMBER_WITH_UNIT.match(value)
+        if match is None:
+            raise ValueError(value)
+        value = match.group(1)
+    return float(value)
+
+
+def _is_missing(value) -> bool:
+    return value == '' or (isinstance(value, float) and np.isnan(value))
+
+
+def _stamp(key: ImageKey) -> Tuple[int, int] or None:
+    try:
+        stat = key.source_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+    except (AttributeError, OSError):
+        return
@@ -4,6 +4,7 @@ import cv2
 import numpy as np
 
 from .geometry import Geometry
+from .dtype_policy import float_dtype, as_float
 from ..app.rois.roi import Roi
 
 INTERPOLATION_ALGORITHMS = {
@@ -15,6 +16,11 @@ INTERPOLATION_ALGORITHMS = {
 
 INTERPOLATION_ALGORITHMS_INVERSED = {v: k for k, v in INTERPOLATION_ALGORITHMS.items()}
 
+# polar image size modes: the size set by the user or derived from the detector geometry
+FIXED_SIZE = 'Fixed'
+AUTO_SIZE = 'Auto'
+POLAR_SIZE_MODES = (FIXED_SIZE, AUTO_SIZE)
+
 
 class InterpolationParams(NamedTuple):
     shape: Tuple[int, int] = (1024, 1024)
@@ -49,13 +55,12 @@ class PolarImage(object):
         self._parameters = InterpolationParams(self.polar_params.shape, algorithm)
         self.update(geometry, image)
 
-    def update(self, geometry: Geometry, image: np.ndarray):
+    def update(self, geometry: Geometry, image: np.ndarray, raw: bool = False):
         if image is None:
             self._polar_img = None
             return
 
-        yy, zz = geometry.polar_grids
-        self._polar_img = self.calc_polar_image(image, yy, zz, self.polar_params.algorithm)
+        self._polar_img = self.remap(image, geometry, self.polar_params.algorithm, raw)
 
     def set_polar_image(self, img: np.ndarray):
         self._polar_img = img
@@ -66,31 +71,68 @@ class PolarImage(object):
     def calc_polar_image(img: np.ndarray, yy: np.ndarray, zz: np.ndarray,
                          algorithm=cv2.INTER_LINEAR) -> np.ndarray or None:
         try:
-            return cv2.remap(img.astype(np.float32),
-                             yy.astype(np.float32),
-                             zz.astype(np.float32),
+            return cv2.remap(as_float(img),
+                             np.asarray(yy, dtype=np.float32),
+                             np.asarray(zz, dtype=np.float32),
                              interpolation=algorithm)
         except cv2.error:
             return
 
+    @staticmethod
+    def remap(img: np.ndarray, geometry: Geometry, algorithm=cv2.INTER_LINEAR,
+              raw: bool = False) -> np.ndarray or None:
+        """
+        Calculates the polar image with the cached remap maps of the geometry,
+        so that images sharing a geometry do not convert the polar grids again.
+        If raw is True, the image is not transformed yet and the transformations
+        of the geometry are applied by the remap itself.
+        """
+        maps = geometry.raw_remap_maps if raw else geometry.remap_maps
+        if maps is None:
+            return
+        try:
+            return cv2.remap(as_float(img, contiguous=True), *maps, interpolation=algorithm)
+        except cv2.error:
+            return
+
+    @staticmethod
+    def remap_window(img: np.ndarray, geometry: Geometry, window: Tuple[slice, slice],
+                     algorithm=cv2.INTER_LINEAR, raw: bool = False) -> np.ndarray or None:
+        """
+        Calculates only the part of the polar image within the window (see Geometry.polar_window),
+        which equals the same part of the full polar image.
+        """
+        maps = geometry.window_remap_maps(window, raw)
+        if maps is None:
+            return
+        try:
+            return cv2.remap(as_float(img, contiguous=True), *maps, interpolation=algorithm)
+        except cv2.error:
+            return
+
+    @staticmethod
+    def remap_preview(binned_img: np.ndarray, geometry: Geometry, polar_shape: Tuple[int, int],
+                      binning: int = 1, algorithm=cv2.INTER_LINEAR) -> np.ndarray or None:
+        """
+        Calculates a coarse polar image of the given shape from the image binned by an integer factor.
+        """
+        maps = geometry.preview_remap_maps(polar_shape, binning)
+        if maps is None:
+            return
+        try:
+            return cv2.remap(as_float(binned_img, contiguous=True), *maps, interpolation=algorithm)
+        except cv2.error:
+            return
+
     def get_radial_profile(self) -> np.ndarray or None:
         if self.polar_image is None:
             return
-        return np.nanmean(self.polar_image,axis=0)
+        return np.nanmean(self.polar_image, axis=0, dtype=float_dtype())
 
     def get_angular_profile(self, geometry: Geometry, roi: Roi) -> np.ndarray or None:
         if self.polar_image is None:
             return
-        r1, r2 = roi.radius - roi.width / 2, roi.radius + roi.width / 2
-
-        r_min, r_max = geometry.r_range
-        scale = geometry.scale
-        r_size = self.polar_image.shape[1]
-        r_ratio = (r_max - r_min) / r_size * scale
-
-        r1, r2 = int((r1 - r_min) / r_ratio), int((r2 - r_min) / r_ratio)
-        r1, r2 = max(min((r1, r2)), 0), min(max((r1, r2)), r_size)
-
-        if r1 > r_size or r2 < 0:
+        window = geometry.polar_window(roi.r_range)
+        if window is None or window[1].start >= window[1].stop:
             return
-        return np.nanmean(self.polar_image[:, r1:r2],axis=1)
+        return np.nanmean(self.polar_image[window], axis=1, dtype=float_dtype())
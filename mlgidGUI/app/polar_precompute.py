@@ -0,0 +1,161 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Event
+from time import perf_counter
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import cv2
+
+from .file_manager import FileManager, FolderKey, ImageKey
+from .geometry import Geometry
+from .polar_image import PolarImage
+
+logger = logging.getLogger(__name__)
+
+
+class PolarPrecomputeResult(NamedTuple):
+    computed: int
+    skipped: int
+    failed: int
+    elapsed: float
+    cancelled: bool
+
+    @property
+    def throughput(self) -> float:
+        """
+        Calculated polar images per second.
+        """
+        return self.computed / self.elapsed if self.elapsed > 0 else 0.
+
+
+def precompute_polar_images(fm: FileManager, folder_key: FolderKey, *,
+                            algorithm: int = cv2.INTER_LINEAR,
+                            overwrite: bool = False,
+                            max_workers: int = None,
+                            batch_size: int = 16,
+                            process_callback: Callable[[int], None] = None,
+                            set_max_callback: Callable[[int], None] = None,
+                            cancel_event: Event = None) -> PolarPrecomputeResult:
+    """
+    Calculates and stores polar images of all images of the folder. Images are grouped
+    by geometry, so that the remap maps of each geometry are built once, and remapped in batches
+    by a thread pool (cv2.remap releases the GIL) while the next batch is read.
+    Frames of edf series in a batch are read concurrently (see _ReadImage.get_images).
+    Images with a valid stored polar image are skipped unless overwrite is set.
+    Meant to be run as a background job (see UpdateWorker), stops as soon as cancel_event is set.
+    """
+    start = perf_counter()
+    keys = list(folder_key.image_children)
+    if set_max_callback:
+        set_max_callback(len(keys))
+
+    processed = computed = skipped = failed = 0
+    cancelled = False
+    pending: List[Tuple[ImageKey, Geometry, Future]] = []
+
+    def report():
+        if process_callback:
+            process_callback(processed)
+
+    def store(batch: List[Tuple[ImageKey, Geometry, Future]]):
+        nonlocal processed, computed, failed
+        for key, geometry, future in batch:
+            polar_image = future.result()
+            if polar_image is not None:
+                fm.polar_images.set(key, polar_image, geometry, algorithm)
+                computed += 1
+            else:
+                failed += 1
+            processed += 1
+            report()
+
+    max_workers = max_workers or min(4, os.cpu_count() or 1)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='PolarPrecompute') as executor:
+        for group_geometry, group_keys in _group_by_geometry(fm, keys):
+            shaped_geometries: Dict[tuple, Geometry] = {}
+
+            for i in range(0, len(group_keys), batch_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                submitted = []
+                batch_keys = []
+                for key in group_keys[i:i + batch_size]:
+                    if not overwrite and fm.polar_images.is_valid(key, group_geometry, algorithm):
+                        skipped += 1
+                        processed += 1
+                        report()
+                        continue
+                    batch_keys.append(key)
+                for key, image in zip(batch_keys, _read_images(fm, batch_keys, max_workers)):
+                    if image is None:
+                        failed += 1
+                        processed += 1
+                        report()
+                        continue
+                    # transformations are applied by the remap maps, the view only gives the shape
+                    geometry = _shaped_geometry(group_geometry, group_geometry.t(image).shape, shaped_geometries)
+                    if geometry is not group_geometry and not overwrite and \
+                            fm.polar_images.is_valid(key, geometry, algorithm):
+                        skipped += 1
+                        processed += 1
+                        report()
+                        continue
+                    submitted.append((key, geometry,
+                                      executor.submit(PolarImage.remap, image, geometry, algorithm, True)))
+                # results of the previous batch are stored while the current batch is remapped
+                store(pending)
+                pending = submitted
+            if cancelled:
+                break
+        store(pending)
+
+    result = PolarPrecomputeResult(computed, skipped, failed, perf_counter() - start, cancelled)
+    logger.info(f'Polar images of {folder_key.name}: {computed} calculated ({result.throughput:.1f} images/s), '
+                f'{skipped} skipped, {failed} failed{", cancelled" if cancelled else ""}.')
+    return result
+
+
+def _read_images(fm: FileManager, keys: List[ImageKey], max_workers: int) -> list:
+    try:
+        return fm.images.get_images(keys, max_workers)
+    except Exception as err:
+        logger.exception(err)
+    images = []
+    for key in keys:
+        try:
+            images.append(fm.images[key])
+        except Exception as err:
+            logger.exception(err)
+            images.append(None)
+    return images
+
+
+def _group_by_geometry(fm: FileManager, keys: List[ImageKey]) -> List[Tuple[Geometry, List[ImageKey]]]:
+    default_geometries: Dict[FolderKey, Geometry] = {}
+    groups: Dict[tuple, Tuple[Geometry, List[ImageKey]]] = {}
+
+    for key in keys:
+        geometry = fm.geometries[key]
+        if geometry is None:
+            if key.parent not in default_geometries:
+                default_geometries[key.parent] = fm.geometries.default[key.parent] or Geometry()
+            geometry = default_geometries[key.parent]
+        groups.setdefault(geometry.polar_key, (geometry, []))[1].append(key)
+    return list(groups.values())
+
+
+def _shaped_geometry(geometry: Geometry, shape: Tuple[int, int], shaped_geometries: Dict[tuple, Geometry]) -> Geometry:
+    # geometries are adjusted to the image shape the same way GeometryHolder does when an image is opened
+    if tuple(geometry.shape) == tuple(shape):
+        shaped = geometry
+    else:
+        shaped = shaped_geometries.get(tuple(shape))
+        if shaped is None:
+            shaped = shaped_geometries[tuple(shape)] = geometry.copy()
+            shaped.set_shape(tuple(shape))
+    # maps are built once per geometry here rather than concurrently by the workers
+    shaped.raw_remap_maps
+    return shaped
@@ -28,6 +28,12 @@ class SavedProfile:
     baseline_params: BaselineParams
     baseline: np.ndarray = None
 
+    def matches(self, x: np.ndarray) -> bool:
+        """
+        Whether the profile is defined on the axis x (axes of other shapes never match).
+        """
+        return self.x is not None and x is not None and self.x.shape == x.shape and np.all(self.x == x)
+
 
 class SmoothedProfile(QObject):
     sigSigmaChanged = pyqtSignal()
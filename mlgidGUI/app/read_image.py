@@ -1,21 +1,112 @@
 # -*- coding: utf-8 -*-
-from typing import Union
+import sys
+from typing import Union, Dict, Tuple, Sequence, List
 from pathlib import Path
 
 import numpy as np
-from PIL import Image
-from .edf_reader import read_edf
+from .edf_reader import read_edf, read_edf_series
 import tifffile
 
+# edf header dicts learned from the last read frame of each folder.
+# Frames of a series share the header layout, so the header of a new frame
+# does not have to be parsed as long as the file size matches the template.
+_EDF_HEADER_TEMPLATES: Dict[Path, dict] = {}
+
+_NATIVE_BYTEORDER = '<' if sys.byteorder == 'little' else '>'
+_GRAYSCALE_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
 
 def read_image(filepath: Union[Path, str]) -> np.array:
-    if isinstance(filepath, Path):
-        filepath = str(filepath.resolve())
+    if isinstance(filepath, str):
+        filepath = Path(filepath)
+    filepath = filepath.resolve()
 
-    if filepath.endswith('.edf') or filepath.endswith('.edf.gz'):
-        image = read_edf(filepath)
+    if is_edf_file(filepath):
+        image = _read_edf_series_frame(filepath)
     else:
-        image = tifffile.imread(filepath)
-        if len(image.shape) > 2:
-            image = np.array(Image.open(filepath).convert('L'))
-    return image
\ No newline at end of file
+        image = read_tiff_frame(filepath)
+    return image
+
+
+def _read_edf_series_frame(filepath: Path) -> np.ndarray:
+    folder = filepath.parent
+    image, header_dict = read_edf(filepath, header_dict=_EDF_HEADER_TEMPLATES.get(folder), return_dict=True)
+    _EDF_HEADER_TEMPLATES[folder] = header_dict
+    return image
+
+
+def is_edf_file(filepath: Path) -> bool:
+    return filepath.name.endswith('.edf') or filepath.name.endswith('.edf.gz')
+
+
+def read_edf_frames(filepaths: Sequence[Union[Path, str]], max_workers: int = None) -> List[np.ndarray]:
+    """
+    Reads frames of edf series concurrently (see read_edf_series) and returns them in the order of filepaths.
+    Frames of each folder share the header template of the folder.
+    """
+    filepaths = [Path(filepath).resolve() for filepath in filepaths]
+    images: List[np.ndarray or None] = [None] * len(filepaths)
+    folders: Dict[Path, List[int]] = {}
+    for i, filepath in enumerate(filepaths):
+        folders.setdefault(filepath.parent, []).append(i)
+
+    for folder, indices in folders.items():
+        if folder not in _EDF_HEADER_TEMPLATES:
+            first = indices.pop(0)
+            images[first] = _read_edf_series_frame(filepaths[first])
+        frames = read_edf_series([filepaths[i] for i in indices], _EDF_HEADER_TEMPLATES[folder], max_workers)
+        for i, image in zip(indices, frames):
+            images[i] = image
+    return images
+
+
+def tiff_stack_info(filepath: Union[Path, str]) -> Tuple[int, Tuple[int, int], np.dtype]:
+    """
+    Returns the number of frames, the frame shape and dtype of a tiff file without decoding pixel data.
+    """
+    with tifffile.TiffFile(str(filepath)) as tif:
+        frames = _tiff_frames(tif)
+        keyframe = frames[0].keyframe
+        return len(frames), (keyframe.imagelength, keyframe.imagewidth), keyframe.dtype
+
+
+def read_tiff_frame(filepath: Union[Path, str], frame: int = 0, use_mmap: bool = True) -> np.ndarray:
+    """
+    Reads a single frame of a (multi-page) tiff file. The page metadata are inspected first:
+    uncompressed contiguous frames stored in native byte order are returned as read-only memory-mapped
+    views, other frames are decoded once. Multi-sample (RGB) frames are reduced to luminance
+    keeping the original dtype. The whole stack is never loaded.
+    """
+    filepath = str(filepath)
+    with tifffile.TiffFile(filepath) as tif:
+        page = _tiff_frames(tif)[frame]
+        if use_mmap and page.is_memmappable and tif.byteorder == _NATIVE_BYTEORDER:
+            image = np.memmap(filepath, dtype=page.dtype, mode='r',
+                              offset=page.dataoffsets[0], shape=page.shape).view(np.ndarray)
+        else:
+            image = page.asarray()
+        axes = page.axes
+
+    if image.ndim > 2:
+        image = _to_grayscale(image, axes)
+    return image
+
+
+def _tiff_frames(tif: tifffile.TiffFile) -> Sequence:
+    # a single series may contain virtual frames (e.g. ImageJ hyperstacks with one IFD),
+    # files with several series are treated page by page.
+    if len(tif.series) == 1:
+        return tif.series[0].pages
+    return tif.pages
+
+
+def _to_grayscale(image: np.ndarray, axes: str) -> np.ndarray:
+    if 'S' in axes:
+        image = np.moveaxis(image, axes.index('S'), -1)
+    image = image.reshape(*image.shape[:2], -1)
+    if image.shape[-1] < 3:
+        return np.ascontiguousarray(image[..., 0])
+    gray = image[..., :3] @ _GRAYSCALE_WEIGHTS
+    if np.issubdtype(image.dtype, np.integer):
+        gray = np.rint(gray)
+    return gray.astype(image.dtype)
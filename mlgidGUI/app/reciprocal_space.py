@@ -0,0 +1,161 @@
+from typing import NamedTuple, Tuple
+
+import cv2
+import numpy as np
+
+from .cache import ByteLRUCache
+from .geometry import Geometry
+from .dtype_policy import float_dtype, as_float
+
+__all__ = ['QGrid', 'q_lut', 'default_q_grid', 'q_remap_maps', 'remap_to_q']
+
+# coordinates of points that are not seen by the detector, far enough outside the image
+_OUTSIDE = -16.
+
+
+class QGrid(NamedTuple):
+    """
+    Regular reciprocal space grid: q ranges in inverse angstroms and (q_z, q_xy) shape.
+    Rows of the resampled images go along q_z, columns along q_xy.
+    """
+    q_xy_range: Tuple[float, float]
+    q_z_range: Tuple[float, float]
+    shape: Tuple[int, int]
+
+    @property
+    def q_xy_axis(self) -> np.ndarray:
+        return np.linspace(*self.q_xy_range, self.shape[1])
+
+    @property
+    def q_z_axis(self) -> np.ndarray:
+        return np.linspace(*self.q_z_range, self.shape[0])
+
+
+class _QLut(object):
+    __slots__ = ('q_xy', 'q_z', 'q_xy_range', 'q_z_range')
+
+    def __init__(self, q_xy: np.ndarray, q_z: np.ndarray):
+        for arr in (q_xy, q_z):
+            arr.flags.writeable = False
+        self.q_xy, self.q_z = q_xy, q_z
+        self.q_xy_range = float(q_xy.min()), float(q_xy.max())
+        self.q_z_range = float(q_z.min()), float(q_z.max())
+
+    @property
+    def nbytes(self) -> int:
+        return self.q_xy.nbytes + self.q_z.nbytes
+
+
+_Q_LUTS = ByteLRUCache(2 ** 27, get_size=lambda lut: lut.nbytes)
+_Q_MAPS = ByteLRUCache(2 ** 27)
+
+
+def q_lut(geometry: Geometry) -> Tuple[np.ndarray, np.ndarray] or None:
+    """
+    Returns read-only arrays of q_xy and q_z (inverse angstroms) of every pixel of
+    the image described by the geometry, or None if its grazing-incidence parameters are not set.
+    Arrays are calculated once and shared by geometries with the same parameters.
+    """
+    lut = _get_lut(geometry)
+    if lut is None:
+        return
+    return lut.q_xy, lut.q_z
+
+
+def default_q_grid(geometry: Geometry, shape: Tuple[int, int] = None) -> QGrid or None:
+    """
+    Grid covering the q ranges of the detector, with the image shape unless another shape is given.
+    """
+    lut = _get_lut(geometry)
+    if lut is None:
+        return
+    return QGrid(lut.q_xy_range, lut.q_z_range, tuple(shape or geometry.shape))
+
+
+def q_remap_maps(geometry: Geometry, q_grid: QGrid) -> Tuple[np.ndarray, None] or None:
+    """
+    Remap maps of cv2.remap from the image to the q grid. The inverse mapping is analytic,
+    maps are cached for each geometry and grid, so resampling a series costs one remap per frame.
+    """
+    if geometry.gi is None:
+        return
+    key = _lut_key(geometry), tuple(q_grid.q_xy_range), tuple(q_grid.q_z_range), tuple(q_grid.shape)
+    maps = _Q_MAPS.get(key)
+    if maps is None:
+        q_xy, q_z = np.meshgrid(q_grid.q_xy_axis, q_grid.q_z_axis)
+        yy, zz = _q_to_pixels(geometry, q_xy, q_z)
+        maps = cv2.convertMaps(np.asarray(yy, dtype=np.float32), np.asarray(zz, dtype=np.float32), cv2.CV_32FC2)
+        _Q_MAPS[key] = maps
+    return maps
+
+
+def remap_to_q(image: np.ndarray, geometry: Geometry, q_grid: QGrid = None,
+               algorithm: int = cv2.INTER_LINEAR) -> np.ndarray or None:
+    """
+    Resamples the (transformed) image to a regular q_xy - q_z grid (default_q_grid if not provided).
+    Points not seen by the detector are set to zero.
+    """
+    q_grid = q_grid or default_q_grid(geometry)
+    if q_grid is None:
+        return
+    maps = q_remap_maps(geometry, q_grid)
+    try:
+        return cv2.remap(as_float(image, contiguous=True), *maps, interpolation=algorithm)
+    except cv2.error:
+        return
+
+
+def _lut_key(geometry: Geometry) -> tuple:
+    return tuple(geometry.shape), tuple(geometry.beam_center), tuple(geometry.gi), float_dtype().name
+
+
+def _get_lut(geometry: Geometry) -> _QLut or None:
+    if geometry.gi is None:
+        return
+    key = _lut_key(geometry)
+    lut = _Q_LUTS.get(key)
+    if lut is None:
+        lut = _Q_LUTS[key] = _calc_lut(geometry)
+    return lut
+
+
+def _calc_lut(geometry: Geometry) -> _QLut:
+    # the detector is perpendicular to the direct beam, which hits it at the beam center;
+    # y goes along the columns, z goes up (against the image rows), so that q_z > 0 above the horizon
+    gi = geometry.gi
+    k = 2 * np.pi / gi.wavelength
+    alpha_i = np.deg2rad(gi.incidence_angle)
+    y = (np.arange(geometry.shape[1]) - geometry.beam_center.y) * gi.pixel_size
+    z = (geometry.beam_center.z - np.arange(geometry.shape[0])) * gi.pixel_size
+
+    two_theta = np.arctan2(y, gi.distance)[np.newaxis, :]
+    alpha_f = np.arctan2(z[:, np.newaxis], np.hypot(gi.distance, y)[np.newaxis, :]) - alpha_i
+    cos_alpha_f = np.cos(alpha_f)
+
+    q_x = k * (cos_alpha_f * np.cos(two_theta) - np.cos(alpha_i))
+    q_y = k * cos_alpha_f * np.sin(two_theta)
+    q_xy = as_float(np.copysign(np.hypot(q_x, q_y), q_y))
+    q_z = as_float(k * (np.sin(alpha_f) + np.sin(alpha_i)))
+    return _QLut(q_xy, q_z)
+
+
+def _q_to_pixels(geometry: Geometry, q_xy: np.ndarray, q_z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    gi = geometry.gi
+    k = 2 * np.pi / gi.wavelength
+    alpha_i = np.deg2rad(gi.incidence_angle)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        alpha_f = np.arcsin(q_z / k - np.sin(alpha_i))
+        cos_alpha_f, cos_alpha_i = np.cos(alpha_f), np.cos(alpha_i)
+        # q_x ** 2 + q_y ** 2 = q_xy ** 2 gives the in-plane exit angle
+        cos_two_theta = (cos_alpha_f ** 2 + cos_alpha_i ** 2 - (q_xy / k) ** 2) / (2 * cos_alpha_f * cos_alpha_i)
+        two_theta = np.copysign(np.arccos(cos_two_theta), q_xy)
+
+        y = gi.distance * np.tan(two_theta)
+        z = np.tan(alpha_f + alpha_i) * np.hypot(gi.distance, y)
+
+    # points behind the detector plane or out of the Ewald sphere are not measured
+    seen = (np.abs(cos_two_theta) <= 1) & (np.cos(two_theta) > 0) & (np.abs(alpha_f + alpha_i) < np.pi / 2)
+    yy = np.where(seen, y / gi.pixel_size + geometry.beam_center.y, _OUTSIDE)
+    zz = np.where(seen, geometry.beam_center.z - z / gi.pixel_size, _OUTSIDE)
+    return yy, zz
@@ -134,6 +134,10 @@ class Roi:
     def has_fixed_angles(self) -> bool:
         return self.type == RoiTypes.segment
 
+    @property
+    def r_range(self) -> Tuple[float, float]:
+        return self.radius - self.width / 2, self.radius + self.width / 2
+
     @property
     def intensity(self) -> float or None:
         if self.is_fitted:
@@ -111,16 +111,16 @@ class RoiDict(QObject):
             self._meta_data = None
             self.log.debug(f'Empty folder selected')
 
-    def change_image(self, image_key: ImageKey):
+    def change_image(self, image_key: ImageKey, roi_data: RoiData = None):
         self.clear()
         self._current_key = image_key
         if not self._current_key:
             return
-        self._update()
+        self._update(roi_data)
         self.sig_deleted_rois_updated.emit(tuple(self._meta_data.get_deleted_rois(self._current_key)))
 
-    def _update(self):
-        self._roi_data = self._fm.rois_data[self._current_key] or RoiData()
+    def _update(self, roi_data: RoiData = None):
+        self._roi_data = roi_data or self._fm.rois_data[self._current_key] or RoiData()
         self._roi_data.change_ring_bounds(self._geometry_holder.geometry.ring_bounds)
         self._meta_data = self._fm.rois_meta_data[self._current_key] or RoiMetaData(self._current_key.parent)
         self._meta_data.update_metadata(self._roi_data, self._current_key)
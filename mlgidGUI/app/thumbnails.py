@@ -0,0 +1,41 @@
+import logging
+from threading import Event
+from typing import Callable, Iterable
+
+from .file_manager import FileManager, ImageKey
+
+logger = logging.getLogger(__name__)
+
+
+def build_thumbnails(fm: FileManager, keys: Iterable[ImageKey], *,
+                     process_callback: Callable[[int], None] = None,
+                     set_max_callback: Callable[[int], None] = None,
+                     cancel_event: Event = None,
+                     overwrite: bool = False) -> int:
+    """
+    Calculates and stores thumbnails of the images that do not have them yet.
+    Meant to be run as a background job (see UpdateWorker): progress is reported
+    after each image, the job stops as soon as cancel_event is set.
+    Returns the number of calculated thumbnails.
+    """
+    keys = list(keys)
+    if set_max_callback:
+        set_max_callback(len(keys))
+
+    created = 0
+
+    for i, key in enumerate(keys, 1):
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        if overwrite or key not in fm.thumbnails:
+            try:
+                lazy_image = fm.images.get_lazy(key)
+                if lazy_image is not None:
+                    fm.thumbnails.create(key, lazy_image)
+                    created += 1
+            except Exception as err:
+                logger.exception(err)
+        if process_callback:
+            process_callback(i)
+
+    return created
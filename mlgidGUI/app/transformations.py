@@ -1,8 +1,10 @@
 from enum import Enum
+from typing import Tuple
 
 import numpy as np
 
-__all__ = ['TransformationsHolder', 'Transformation', 'UnknownTransformation']
+__all__ = ['TransformationsHolder', 'Transformation', 'UnknownTransformation', 'transform_window',
+           'raw_coordinates']
 
 
 class UnknownTransformation(ValueError):
@@ -80,3 +82,60 @@ class TransformationsHolder(object):
                 self._img = op(self._img)
         except KeyError:
             raise UnknownTransformation(f'Key {key} doesn\'t correspond to any known transformation.')
+
+
+def transform_window(key: str, window: Tuple[int, int, int, int],
+                     shape: Tuple[int, int]) -> Tuple[Tuple[int, int, int, int], Tuple[int, int]]:
+    """
+    Returns the (z_min, z_max, y_min, y_max) window of an image of the shape
+    and the image shape after the transformation with the key.
+    """
+    try:
+        operations = _T_DICT[key or '1234']
+    except KeyError:
+        raise UnknownTransformation(f'Key {key} doesn\'t correspond to any known transformation.')
+
+    (z_min, z_max, y_min, y_max), (height, width) = window, shape
+    for op in operations:
+        if isinstance(op, Flip) and op.axis == 0:
+            z_min, z_max = height - z_max, height - z_min
+        elif isinstance(op, Flip):
+            y_min, y_max = width - y_max, width - y_min
+        elif op.k == 1:
+            z_min, z_max, y_min, y_max = width - y_max, width - y_min, z_min, z_max
+            height, width = width, height
+        else:
+            z_min, z_max, y_min, y_max = y_min, y_max, height - z_max, height - z_min
+            height, width = width, height
+    return (z_min, z_max, y_min, y_max), (height, width)
+
+
+def raw_coordinates(key: str, shape: Tuple[int, int],
+                    yy: np.ndarray, zz: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts (y, z) pixel coordinates in an image of the shape transformed with the key
+    to the coordinates in the image before the transformation.
+    """
+    try:
+        operations = _T_DICT[key or '1234']
+    except KeyError:
+        raise UnknownTransformation(f'Key {key} doesn\'t correspond to any known transformation.')
+
+    # shapes of the images the operations are applied to
+    shapes = []
+    height, width = shape
+    for op in reversed(operations):
+        if isinstance(op, Rotate):
+            height, width = width, height
+        shapes.append((height, width))
+
+    for op, (height, width) in zip(reversed(operations), shapes):
+        if isinstance(op, Flip) and op.axis == 0:
+            zz = height - 1 - zz
+        elif isinstance(op, Flip):
+            yy = width - 1 - yy
+        elif op.k == 1:
+            yy, zz = width - 1 - zz, yy
+        else:
+            yy, zz = zz, height - 1 - yy
+    return yy, zz
@@ -121,6 +121,7 @@ class DoubleSlider(QSlider):
 
 class LabeledSlider(QWidget):
     valueChanged = pyqtSignal(float)
+    valueChangeFinished = pyqtSignal(float)
 
     _HEIGHT = 50
     _WIDTH_MIN = 300
@@ -143,6 +144,7 @@ class LabeledSlider(QWidget):
         self.line_edit.setStyleSheet('QLineEdit {  border: none; }')
 
         self.slider.valueChangedByHand.connect(self._set_value_from_slider)
+        self.slider.sliderReleased.connect(self._emit_finished)
 
         layout = QHBoxLayout(self)
         layout.addWidget(self.label)
@@ -192,6 +194,10 @@ class LabeledSlider(QWidget):
             color_animation(self.line_edit)
 
         self.valueChanged.emit(self.slider.value())
+        self._emit_finished()
+
+    def _emit_finished(self):
+        self.valueChangeFinished.emit(self.slider.value())
 
     def set_value(self, value: float, change_bounds: bool = True):
         if change_bounds and value < self.slider.minimum():
@@ -849,7 +849,7 @@ class FittingProfile(BasicProfile):
         if not saved_profile:
             saved_profile = self.profile_fm[self.current_key] if self.current_key else None
 
-        if not saved_profile or np.any(saved_profile.x != x):
+        if not saved_profile or not saved_profile.matches(x):
             self.clear_baseline()
             self.set_data(y, x)
 
@@ -12,6 +12,7 @@ import qdarkstyle
 import qdarkgraystyle
 
 from ..app import App
+from ..app.dtype_policy import FLOAT_DTYPES, float_dtype
 
 from ..__version import __version__
 
@@ -253,6 +254,17 @@ class GIWAXSMainWindow(QMainWindow):
             theme_action = self.themes_menu.addAction(theme)
             theme_action.triggered.connect(lambda *x, t=theme: self.sigSetStyle.emit(t))
 
+        self.float_dtype_menu = self.preferences.addMenu('Float precision')
+        self.float_dtype_menu.aboutToShow.connect(self._update_float_dtype_menu)
+        for dtype in FLOAT_DTYPES:
+            dtype_action = self.float_dtype_menu.addAction(dtype)
+            dtype_action.setCheckable(True)
+            dtype_action.triggered.connect(lambda *x, d=dtype: self.app.fm.set_float_dtype(d))
+
+    def _update_float_dtype_menu(self):
+        for action in self.float_dtype_menu.actions():
+            action.setChecked(action.text() == float_dtype().name)
+
     def _init_shortcuts(self):
         self.copy_shortcut = QShortcut(QKeySequence("Ctrl+C"), self)
         self.copy_shortcut.activated.connect(lambda *x: self.app.roi_dict.copy_rois('selected'))
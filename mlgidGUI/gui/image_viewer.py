@@ -10,6 +10,9 @@ from PyQt5.QtWidgets import (
     QMainWindow,
     QWidget,
     QVBoxLayout,
+    QFormLayout,
+    QGroupBox,
+    QDoubleSpinBox,
     QPushButton, QLabel, QLineEdit
 )
 
@@ -25,6 +28,7 @@ from ..app.rois.roi import Roi
 from ..app.cif_rois.cif_peaks_calculation import cif_results
 from ..app import App
 from ..app.transformations import Transformation
+from ..app.geometry import GIParameters
 
 from .basic_widgets import (
     CustomImageViewer,
@@ -36,6 +40,7 @@ from .basic_widgets import (
 from .roi_widgets.roi_2d_ring_widget import Roi2DRing, CIF2DRing
 from mlgidGUI.gui.roi_widgets.cif_peak_widget import CIFPoint
 from .roi_widgets.abstract_roi_holder import AbstractRoiHolder
+from .reciprocal_space_viewer import ReciprocalSpaceViewer
 
 from .tools import (
     Icon,
@@ -155,18 +160,20 @@ class MainImageViewer(ImageViewer):
         beam_center = tuple(self.app.geometry.beam_center)
         if image is not None and self._geometry_params_widget is None:
             self._geometry_params_widget = GeometryParametersWidget(
-                image.shape, beam_center, scale=scale)
+                image.shape, beam_center, scale=scale, gi=self.app.geometry.gi)
             self.center_roi.show()
             self._geometry_params_widget.change_center.connect(lambda x:
                                                                self.app.geometry_holder.set_beam_center(x, False))
+            self._geometry_params_widget.change_center_finished.connect(self.app.geometry_holder.finish_change)
             self._geometry_params_widget.scale_changed.connect(
                 self.app.geometry_holder.set_scale)
+            self._geometry_params_widget.gi_changed.connect(self.app.geometry_holder.set_gi)
             self._geometry_params_widget.close_event.connect(self._on_closing_geometry_parameters)
 
     def _on_closing_geometry_parameters(self):
         self.center_roi.set_size()
         self._geometry_params_widget = None
-        self.app.geometry_holder.sigGeometryChangeFinished.emit()
+        self.app.geometry_holder.finish_change()
 
     def _on_beam_center_changed(self):
         beam_center = self.app.geometry.beam_center
@@ -186,20 +193,29 @@ class ImageDrawRoiController(DrawRoiController):
 
 class GeometryParametersWidget(QWidget):
     change_center = pyqtSignal(list)
+    change_center_finished = pyqtSignal()
     change_zero_angle = pyqtSignal(float)
     change_invert_angle = pyqtSignal(bool)
     scale_changed = pyqtSignal(float)
+    gi_changed = pyqtSignal(object)
 
     close_event = pyqtSignal()
 
+    # labels, ranges, decimals and defaults of the grazing-incidence parameters
+    GI_PARAMETERS = (('Wavelength (Å)', (1e-3, 100), 4, 1.),
+                     ('Sample-detector distance', (1e-3, 1e6), 3, 300.),
+                     ('Pixel size', (1e-6, 1e3), 5, 0.172),
+                     ('Incidence angle (°)', (0, 90), 4, 0.1))
+
     def __init__(self, image_shape: tuple,
                  beam_center: tuple, zero_angle: float = 0,
-                 angle_direction: bool = True, scale: float = 1):
+                 angle_direction: bool = True, scale: float = 1, gi: GIParameters = None):
         super(GeometryParametersWidget, self).__init__(None, Qt.WindowStaysOnTopHint)
         self.beam_center = list(beam_center)
         self.image_shape = image_shape
         self.zero_angle = zero_angle
         self.scale = scale
+        self.gi = gi
         self.angle_direction = angle_direction
         self._init__ui()
         self.setWindowTitle('Set geometry')
@@ -217,10 +233,12 @@ class GeometryParametersWidget(QWidget):
         self.x_slider = LabeledSlider('Y center', (0, self.image_shape[1]),
                                       self.beam_center[1], self, decimals=0)
         self.x_slider.valueChanged.connect(self._connect_func(1))
+        self.x_slider.valueChangeFinished.connect(self.change_center_finished)
 
         self.y_slider = LabeledSlider('Z center', (0, self.image_shape[0]),
                                       self.beam_center[0], self, decimals=0)
         self.y_slider.valueChanged.connect(self._connect_func(0))
+        self.y_slider.valueChangeFinished.connect(self.change_center_finished)
 
         # self.angle_slider = AnimatedSlider('Zero angle', (0, 360),
         #                                    self.zero_angle, self,
@@ -237,7 +255,24 @@ class GeometryParametersWidget(QWidget):
 
         layout.addWidget(self.x_slider)
         layout.addWidget(self.y_slider)
+        self.gi_box = QGroupBox('Grazing incidence', self)
+        self.gi_box.setCheckable(True)
+        self.gi_box.setChecked(self.gi is not None)
+        self.gi_box.toggled.connect(self.on_gi_changed)
+        gi_layout = QFormLayout(self.gi_box)
+        self.gi_spin_boxes = []
+        for (label, (min_, max_), decimals, default), value in zip(self.GI_PARAMETERS,
+                                                                    self.gi or (None,) * 4):
+            spin_box = QDoubleSpinBox(self.gi_box)
+            spin_box.setDecimals(decimals)
+            spin_box.setRange(min_, max_)
+            spin_box.setValue(default if value is None else value)
+            spin_box.editingFinished.connect(self.on_gi_changed)
+            gi_layout.addRow(label, spin_box)
+            self.gi_spin_boxes.append(spin_box)
+
         layout.addWidget(self.scale_edit)
+        layout.addWidget(self.gi_box)
         # layout.addWidget(self.angle_slider)
         # layout.addWidget(self.invert_angle_box)
 
@@ -245,6 +280,13 @@ class GeometryParametersWidget(QWidget):
         self.scale = value
         self.scale_changed.emit(value)
 
+    def on_gi_changed(self, *args):
+        if self.gi_box.isChecked():
+            self.gi = GIParameters(*(spin_box.value() for spin_box in self.gi_spin_boxes))
+        else:
+            self.gi = None
+        self.gi_changed.emit(self.gi)
+
     def _connect_func(self, ind: int):
         def beam_center_changed(value):
             self.beam_center[ind] = value
@@ -305,6 +347,9 @@ class Basic2DImageWidget(QMainWindow):
         set_beam_center_action.triggered.connect(
             self.image_viewer.open_geometry_parameters)
 
+        reciprocal_space_action = toolbar.addAction(Icon('interpolate'), 'Reciprocal space')
+        reciprocal_space_action.triggered.connect(lambda: ReciprocalSpaceViewer(self))
+
         self._set_default_geometry_button = QPushButton('Save as default geometry')
         self._set_default_geometry_button.clicked.connect(self.app.geometry_holder.save_as_default)
         toolbar.addWidget(self._set_default_geometry_button)
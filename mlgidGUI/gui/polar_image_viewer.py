@@ -12,7 +12,7 @@ from .roi_widgets.abstract_roi_holder import AbstractRoiHolder
 
 from ..app.app import App
 from ..app.rois.roi import Roi, RoiTypes
-from ..app.polar_image import INTERPOLATION_ALGORITHMS
+from ..app.polar_image import INTERPOLATION_ALGORITHMS, POLAR_SIZE_MODES, FIXED_SIZE
 from .tools import Icon
 
 
@@ -43,6 +43,7 @@ class PolarImageViewer(AbstractRoiHolder, QMainWindow):
             text='&Phi;', color='white', font_size='large')
         self.setCentralWidget(self._image_viewer)
         self.app.image_holder.sigPolarImageChanged.connect(self._update_image)
+        self.app.image_holder.sigPolarPreviewChanged.connect(self._update_preview)
         self.app.geometry_holder.sigScaleChanged.connect(self._on_scale_changed)
         self.app.image_holder.sigEmptyImage.connect(self._image_viewer.clear_image)
         # self.app.roi_dict.sig_roi_moved.connect(self._image_viewer.set_auto_range)
@@ -75,11 +76,19 @@ class PolarImageViewer(AbstractRoiHolder, QMainWindow):
             self._image_viewer.set_data(img)
             self.set_axes()
 
+    @pyqtSlot(name='updatePreview')
+    def _update_preview(self):
+        img = self.app.image_holder.polar_preview
+        if img is not None:
+            self._image_viewer.set_data(img)
+            self.set_axes()
+
     def set_axes(self):
         if self._image_viewer.image_item.image is None:
             return
         p1, p2 = self.app.geometry.phi_range
-        r1, r2 = np.nanmin(self.app.geometry.r_axis), self.app.geometry.r_axis.max()
+        # the ranges do not require the polar grids, which are not built for previews
+        r1, r2 = np.multiply(self.app.geometry.r_range, self.app.geometry.scale)
         self._image_viewer.set_x_axis(r1, r2)
         self._image_viewer.set_y_axis(p1 * 180 / np.pi, p2 * 180 / np.pi)
         self._image_viewer.view_box.setAspectLocked(
@@ -114,30 +123,37 @@ class PolarDrawRoi(DrawRoiController):
 
 class InterpolateSetupWindow(BasicInputParametersWidget):
     P = BasicInputParametersWidget.InputParameters
-    PARAMETER_TYPES = (P('r_size', 'Radius axis size', int),
+    PARAMETER_TYPES = (P('size', 'Polar image size', str,
+                         'Auto samples the image at its pixel size (one pixel wide radial bins and one pixel '
+                         'long angular bins at the largest radius), the axis sizes below are ignored.'),
+                       P('r_size', 'Radius axis size', int),
                        P('phi_size', 'Angle axis size', int),
+                       P('max_pixels', 'Maximal number of pixels (auto size)', int,
+                         'Limits automatic polar images, the number of image pixels if empty.', True),
                        P('mode', 'Interpolation algorithm', str))
 
     NAME = 'Interpolation parameters'
 
-    DEFAULT_DICT = dict(r_size=1024, phi_size=1024, mode='Bilinear')
+    DEFAULT_DICT = dict(size=FIXED_SIZE, r_size=1024, phi_size=1024, max_pixels=None, mode='Bilinear')
 
     def _get_layout(self,
                     input_parameter: BasicInputParametersWidget.InputParameters):
         if input_parameter.name == 'mode':
-            return self._get_mode_layout(input_parameter)
+            return self._get_mode_layout(input_parameter, list(INTERPOLATION_ALGORITHMS.keys()))
+        elif input_parameter.name == 'size':
+            return self._get_mode_layout(input_parameter, list(POLAR_SIZE_MODES))
         else:
             return super()._get_layout(input_parameter)
 
-    def _get_mode_layout(self, input_parameter: BasicInputParametersWidget.InputParameters):
+    def _get_mode_layout(self, input_parameter: BasicInputParametersWidget.InputParameters, items: list):
 
         current_value = self.default_dict.get(input_parameter.name, None)
         if current_value is None:
-            current_value = next(iter(INTERPOLATION_ALGORITHMS.keys()))
+            current_value = items[0]
         label_widget = QLabel(input_parameter.label)
         input_widget = QComboBox()
         input_widget.setEditable(False)
-        input_widget.addItems(list(INTERPOLATION_ALGORITHMS.keys()))
+        input_widget.addItems(items)
         input_widget.setCurrentText(current_value)
         layout = QHBoxLayout()
         layout.addWidget(label_widget, Qt.AlignHCenter)
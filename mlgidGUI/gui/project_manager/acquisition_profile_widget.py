@@ -0,0 +1,85 @@
+from PyQt5.QtWidgets import QDialog, QGridLayout, QPushButton, QComboBox, QSpinBox, QCheckBox
+from PyQt5.QtCore import Qt, pyqtSlot
+
+from ..basic_widgets import Label
+from ..tools import Icon, show_error
+from ...app.acquisition_profile import AcquisitionProfile
+from ...app.file_manager import FileManager, FolderKey
+
+
+class AcquisitionProfileWidget(QDialog):
+    """
+    Sets the binning and detector crop applied to the images of a folder at load time.
+    """
+
+    BINNING = (1, 2, 4)
+
+    def __init__(self, fm: FileManager, folder_key: FolderKey, parent=None):
+        super().__init__(parent)
+        self._fm = fm
+        self._folder_key = folder_key
+        self.setWindowTitle(f'Acquisition profile: {folder_key.name}')
+        self.setWindowIcon(Icon('window_icon'))
+        self.setWindowFlag(Qt.Window, True)
+        self.setWindowModality(Qt.WindowModal)
+        self.setAttribute(Qt.WA_DeleteOnClose, True)
+
+        self._init_ui(fm.acquisition_profiles.get(folder_key))
+        self._init_layout()
+        self._init_connections()
+        self.show()
+
+    def _init_ui(self, profile: AcquisitionProfile):
+        self.binning_box = QComboBox(self)
+        self.binning_box.addItems([f'{b}x{b}' for b in self.BINNING])
+        if profile.binning in self.BINNING:
+            self.binning_box.setCurrentIndex(self.BINNING.index(profile.binning))
+
+        self.crop_box = QCheckBox('Crop detector', self)
+        self.crop_box.setChecked(profile.crop is not None)
+        self.crop_spin_boxes = []
+        for value in profile.crop or (0, 0, 0, 0):
+            spin_box = QSpinBox(self)
+            spin_box.setRange(0, 2 ** 16)
+            spin_box.setValue(value)
+            spin_box.setEnabled(profile.crop is not None)
+            self.crop_spin_boxes.append(spin_box)
+
+        self.apply_btn = QPushButton('Apply', self)
+        self.cancel_btn = QPushButton('Cancel', self)
+
+    def _init_layout(self):
+        layout = QGridLayout(self)
+        layout.addWidget(Label('Binning', self), 0, 0)
+        layout.addWidget(self.binning_box, 0, 1, 1, 2)
+        layout.addWidget(self.crop_box, 1, 0, 1, 3)
+        for row, name in enumerate(('z', 'y'), 2):
+            layout.addWidget(Label(f'{name} pixels (from, to)', self), row, 0)
+            layout.addWidget(self.crop_spin_boxes[2 * row - 4], row, 1)
+            layout.addWidget(self.crop_spin_boxes[2 * row - 3], row, 2)
+        layout.addWidget(self.apply_btn, 4, 1)
+        layout.addWidget(self.cancel_btn, 4, 2)
+
+    def _init_connections(self):
+        self.crop_box.toggled.connect(self._crop_toggled)
+        self.apply_btn.clicked.connect(self._apply)
+        self.cancel_btn.clicked.connect(self.close)
+
+    @pyqtSlot(bool, name='cropToggled')
+    def _crop_toggled(self, checked: bool):
+        for spin_box in self.crop_spin_boxes:
+            spin_box.setEnabled(checked)
+
+    @property
+    def profile(self) -> AcquisitionProfile:
+        crop = tuple(box.value() for box in self.crop_spin_boxes) if self.crop_box.isChecked() else None
+        return AcquisitionProfile(self.BINNING[self.binning_box.currentIndex()], crop)
+
+    @pyqtSlot(name='applyProfile')
+    def _apply(self):
+        try:
+            self._fm.set_acquisition_profile(self._folder_key, self.profile)
+        except ValueError as err:
+            show_error(str(err), error_title='Wrong acquisition profile')
+            return
+        self.accept()
@@ -0,0 +1,143 @@
+from threading import Event
+from typing import List
+
+import numpy as np
+
+from PyQt5.QtWidgets import (QWidget, QGridLayout, QComboBox, QCheckBox, QLineEdit,
+                             QTableWidget, QTableWidgetItem, QAbstractItemView)
+from PyQt5.QtCore import Qt, pyqtSlot
+
+from ..background_tasks import BackgroundTasks
+from ..basic_widgets import Label
+from ..basic_widgets.progress_bar import progress_bar_factory
+from ..tools import Icon
+from ...app.file_manager import FileManager, FolderKey, ImageKey
+from ...app.metadata_index import MetadataTable, build_metadata_index
+from ...app.utils import UpdateWorker
+
+
+class MetadataIndexWidget(QWidget):
+    """
+    Images of a folder sorted and filtered by a header metadata column. The folder is indexed
+    by a background job (unchanged files are taken from the stored index), the images are listed
+    in the file order until the index is ready.
+    """
+
+    def __init__(self, fm: FileManager, folder_key: FolderKey, parent=None):
+        super().__init__(parent)
+        self._fm = fm
+        self._folder_key = folder_key
+        self._keys: List[ImageKey] = list(folder_key.image_children)
+        self._table: MetadataTable or None = None
+        self._cancel_event = Event()
+
+        self.setWindowFlag(Qt.Window)
+        self.setAttribute(Qt.WA_DeleteOnClose, True)
+        self.setWindowTitle(f'Metadata: {folder_key.name}')
+        self.setWindowIcon(Icon('window_icon'))
+        self.resize(600, 700)
+
+        self._init_ui()
+        self._init_connections()
+        self._fm.sigProjectClosed.connect(self.close)
+        self._update_rows()
+        self._build_index()
+        self.show()
+
+    def _init_ui(self):
+        self.column_box = QComboBox(self)
+        self.descending_box = QCheckBox('Descending', self)
+        self.min_edit = QLineEdit(self)
+        self.min_edit.setPlaceholderText('min')
+        self.max_edit = QLineEdit(self)
+        self.max_edit.setPlaceholderText('max')
+        self.table_widget = QTableWidget(0, 2, self)
+        self.table_widget.setHorizontalHeaderLabels(['Image', ''])
+        self.table_widget.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table_widget.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_widget.horizontalHeader().setStretchLastSection(True)
+
+        layout = QGridLayout(self)
+        layout.addWidget(Label('Sort by', self), 0, 0)
+        layout.addWidget(self.column_box, 0, 1, 1, 2)
+        layout.addWidget(self.descending_box, 0, 3)
+        layout.addWidget(Label('Range', self), 1, 0)
+        layout.addWidget(self.min_edit, 1, 1)
+        layout.addWidget(self.max_edit, 1, 2)
+        layout.addWidget(self.table_widget, 2, 0, 1, 4)
+
+    def _init_connections(self):
+        self.column_box.currentTextChanged.connect(self._update_rows)
+        self.descending_box.toggled.connect(self._update_rows)
+        self.min_edit.editingFinished.connect(self._update_rows)
+        self.max_edit.editingFinished.connect(self._update_rows)
+        self.table_widget.cellClicked.connect(self._on_clicked)
+
+    def _build_index(self):
+        worker = UpdateWorker(build_metadata_index, self._fm, self._folder_key, cancel_event=self._cancel_event)
+        worker.signals.result.connect(self._set_table)
+        BackgroundTasks().tasks.add_progress_bar(progress_bar_factory(
+            len(self._keys), 'Indexing metadata', 'Metadata indexed',
+            cancel_btn=True, block_window=False,
+            set_process_sig=worker.signals.sigSetProgress,
+            set_finished_sig=worker.signals.finished,
+            set_max_sig=worker.signals.sigSetMax,
+            cancel_callback=self._cancel_event.set))
+        BackgroundTasks().tasks.add_worker(worker)
+
+    @pyqtSlot(object, name='setTable')
+    def _set_table(self, table: MetadataTable or None):
+        if table is None:
+            return
+        self._table = table
+        self.column_box.blockSignals(True)
+        self.column_box.clear()
+        self.column_box.addItems(table.columns)
+        if 'timestamp' in table.columns:
+            self.column_box.setCurrentText('timestamp')
+        self.column_box.blockSignals(False)
+        self._update_rows()
+
+    @pyqtSlot(name='updateRows')
+    def _update_rows(self, *args):
+        name = self.column_box.currentText()
+        keys, values = self._keys, None
+        if self._table is not None and name in self._table.columns:
+            # ranges apply to numeric columns only
+            numeric = self._table.column(name).dtype.kind == 'f'
+            self.min_edit.setEnabled(numeric)
+            self.max_edit.setEnabled(numeric)
+            if numeric:
+                keys = self._table.filter_keys(keys, name, _to_float(self.min_edit.text()),
+                                               _to_float(self.max_edit.text()))
+            keys = self._table.sort_keys(keys, name, self.descending_box.isChecked())
+            values = self._table.values(keys, name)
+
+        self.table_widget.setHorizontalHeaderLabels(['Image', name])
+        self.table_widget.setRowCount(len(keys))
+        for row, key in enumerate(keys):
+            item = QTableWidgetItem(key.name)
+            item.setData(Qt.UserRole, key)
+            self.table_widget.setItem(row, 0, item)
+            self.table_widget.setItem(row, 1, QTableWidgetItem(_to_text(values[row]) if values is not None else ''))
+
+    @pyqtSlot(int, int, name='onClicked')
+    def _on_clicked(self, row: int, column: int):
+        self._fm.change_image(self.table_widget.item(row, 0).data(Qt.UserRole))
+
+    def closeEvent(self, event):
+        self._cancel_event.set()
+        super().closeEvent(event)
+
+
+def _to_float(text: str) -> float or None:
+    try:
+        return float(text.replace(',', '.'))
+    except ValueError:
+        return
+
+
+def _to_text(value) -> str:
+    if isinstance(value, float):
+        return '' if np.isnan(value) else f'{value:g}'
+    return str(value)
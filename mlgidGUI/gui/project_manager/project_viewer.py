@@ -1,13 +1,22 @@
 from pathlib import Path
+from threading import Event
 
 from PyQt5.QtWidgets import (QTreeView, QMenu,
                              QWidget, QHBoxLayout, QLabel)
 from PyQt5.QtGui import QStandardItem, QStandardItemModel
 from PyQt5.QtCore import Qt
 
-from ..basic_widgets import RoundedPushButton
+from ..background_tasks import BackgroundTasks
+from ..basic_widgets import RoundedPushButton, TextNotification
+from ..basic_widgets.progress_bar import progress_bar_factory
 from ..tools import Icon, get_folder_filepath, get_filepath_dialog
+from ...app.app import App
 from ...app.file_manager import FileManager, ImageKey, FolderKey
+from ...app.polar_precompute import precompute_polar_images, PolarPrecomputeResult
+from ...app.utils import UpdateWorker
+from .thumbnails_widget import ThumbnailsWidget
+from .metadata_index_widget import MetadataIndexWidget
+from .acquisition_profile_widget import AcquisitionProfileWidget
 
 
 class FileModel(QStandardItemModel):
@@ -133,6 +142,18 @@ class FileViewer(QTreeView):
         if isinstance(item, FolderItem):
             update_folder = menu.addAction('Update folder')
             update_folder.triggered.connect(item.update)
+            show_thumbnails = menu.addAction('Show thumbnails')
+            show_thumbnails.triggered.connect(
+                lambda *x, it=item: self._show_thumbnails(it))
+            metadata_index = menu.addAction('Sort and filter by metadata')
+            metadata_index.triggered.connect(
+                lambda *x, it=item: self._show_metadata_index(it))
+            acquisition_profile = menu.addAction('Acquisition profile')
+            acquisition_profile.triggered.connect(
+                lambda *x, it=item: self._show_acquisition_profile(it))
+            precompute_polar = menu.addAction('Precompute polar images')
+            precompute_polar.triggered.connect(
+                lambda *x, it=item: self._precompute_polar_images(it))
             close_folder = menu.addAction('Remove from project')
             close_folder.triggered.connect(
                 lambda *x, it=item: self._remove_item(it))
@@ -145,6 +166,43 @@ class FileViewer(QTreeView):
             return
         menu.exec_(self.viewport().mapToGlobal(position))
 
+    def _show_thumbnails(self, item: FolderItem):
+        if not item.key.is_updated():
+            item.update()
+        ThumbnailsWidget(self._fm, item.key, self)
+
+    def _show_metadata_index(self, item: FolderItem):
+        if not item.key.is_updated():
+            item.update()
+        MetadataIndexWidget(self._fm, item.key, self)
+
+    def _show_acquisition_profile(self, item: FolderItem):
+        if not item.key.is_updated():
+            item.update()
+        AcquisitionProfileWidget(self._fm, item.key, self)
+
+    def _precompute_polar_images(self, item: FolderItem):
+        if not item.key.is_updated():
+            item.update()
+        cancel_event = Event()
+        worker = UpdateWorker(precompute_polar_images, self._fm, item.key,
+                              algorithm=App().image_holder.polar_params.algorithm,
+                              cancel_event=cancel_event)
+        worker.signals.result.connect(self._polar_images_precomputed)
+        BackgroundTasks().tasks.add_progress_bar(progress_bar_factory(
+            item.key.images_num, 'Calculating polar images', 'Polar images calculated',
+            cancel_btn=True, block_window=False,
+            set_process_sig=worker.signals.sigSetProgress,
+            set_finished_sig=worker.signals.finished,
+            set_max_sig=worker.signals.sigSetMax,
+            cancel_callback=cancel_event.set))
+        BackgroundTasks().tasks.add_worker(worker)
+
+    def _polar_images_precomputed(self, result: PolarPrecomputeResult):
+        BackgroundTasks().tasks.add_notification(TextNotification(
+            'Polar images', f'{result.computed} calculated ({result.throughput:.1f} images/s), '
+                            f'{result.skipped} skipped, {result.failed} failed'))
+
     def _remove_item(self, item: FolderItem or ImageItem):
         self._fm.remove_key(item.key)
         self.clear()
@@ -0,0 +1,89 @@
+from threading import Event
+from typing import List
+
+import numpy as np
+
+from PyQt5.QtWidgets import QListWidget, QListWidgetItem, QListView
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+from PyQt5.QtCore import Qt, QSize, pyqtSlot
+
+from ..background_tasks import BackgroundTasks
+from ..tools import Icon
+from ...app.file_manager import FileManager, FolderKey, ImageKey
+from ...app.thumbnails import build_thumbnails
+from ...app.utils import UpdateWorker
+
+
+class ThumbnailsWidget(QListWidget):
+    """
+    Overview of all images of a folder. Stored thumbnails are shown immediately,
+    missing ones are calculated by a background job and appear as soon as they are ready.
+    """
+
+    THUMBNAIL_SIZE = 128
+
+    def __init__(self, fm: FileManager, folder_key: FolderKey, parent=None):
+        super().__init__(parent)
+        self._fm = fm
+        self._keys: List[ImageKey] = list(folder_key.image_children)
+        self._missing_rows: List[int] = []
+        self._cancel_event = Event()
+
+        self.setWindowFlag(Qt.Window)
+        self.setAttribute(Qt.WA_DeleteOnClose, True)
+        self.setWindowTitle(folder_key.name)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setIconSize(QSize(self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE))
+        self.resize(6 * (self.THUMBNAIL_SIZE + 20), 4 * (self.THUMBNAIL_SIZE + 40))
+
+        self._init_items()
+        self.itemClicked.connect(self._on_clicked)
+        self._fm.sigProjectClosed.connect(self.close)
+        self._build_missing_thumbnails()
+        self.show()
+
+    def _init_items(self):
+        for key in self._keys:
+            item = QListWidgetItem(key.name)
+            item.setData(Qt.UserRole, key)
+            self.addItem(item)
+            self._set_icon(item, key)
+
+    def _set_icon(self, item: QListWidgetItem, key: ImageKey):
+        thumbnail = self._fm.thumbnails.get(key, self.THUMBNAIL_SIZE)
+        if thumbnail is not None:
+            item.setIcon(_to_icon(thumbnail))
+        else:
+            item.setIcon(Icon('data'))
+
+    def _build_missing_thumbnails(self):
+        self._missing_rows = [row for row, key in enumerate(self._keys) if key not in self._fm.thumbnails]
+        if not self._missing_rows:
+            return
+        missing_keys = [self._keys[row] for row in self._missing_rows]
+        worker = UpdateWorker(build_thumbnails, self._fm, missing_keys, cancel_event=self._cancel_event)
+        worker.signals.sigSetProgress.connect(self._thumbnail_ready)
+        BackgroundTasks().tasks.add_worker(worker)
+
+    @pyqtSlot(int, name='thumbnailReady')
+    def _thumbnail_ready(self, num: int):
+        row = self._missing_rows[num - 1]
+        self._set_icon(self.item(row), self._keys[row])
+
+    @pyqtSlot(QListWidgetItem, name='onClicked')
+    def _on_clicked(self, item: QListWidgetItem):
+        self._fm.change_image(item.data(Qt.UserRole))
+
+    def closeEvent(self, event):
+        self._cancel_event.set()
+        super().closeEvent(event)
+
+
+def _to_icon(thumbnail: np.ndarray) -> QIcon:
+    thumbnail = np.ascontiguousarray(thumbnail)
+    height, width = thumbnail.shape
+    q_image = QImage(thumbnail.data, width, height, width, QImage.Format_Grayscale8).copy()
+    return QIcon(QPixmap.fromImage(q_image))
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from PyQt5.QtCore import Qt, QRectF
+
+from ..app import App
+from ..app.reciprocal_space import default_q_grid, remap_to_q
+from .basic_widgets import CustomImageViewer
+from .tools import Icon, center_widget
+
+
+class ReciprocalSpaceViewer(CustomImageViewer):
+    """
+    Current image resampled to the q_xy - q_z grid defined by the grazing-incidence
+    parameters of its geometry (set in the geometry parameters window).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.app = App()
+        self.setWindowFlag(Qt.Window, True)
+        self.setAttribute(Qt.WA_DeleteOnClose, True)
+        self.setWindowTitle('Reciprocal space')
+        self.setWindowIcon(Icon('window_icon'))
+        self.resize(700, 600)
+
+        # rows of the resampled image go along q_z, which is shown upwards
+        self.image_plot.vb.invertY(False)
+        self.image_plot.setLabel('bottom', 'q<sub>xy</sub> (Å<sup>-1</sup>)')
+        self.image_plot.setLabel('left', 'q<sub>z</sub> (Å<sup>-1</sup>)')
+
+        self._signals = (self.app.image_holder.sigPolarImageChanged,
+                         self.app.geometry_holder.sigGIChanged)
+        for signal in self._signals:
+            signal.connect(self.update_image)
+        self.update_image()
+        center_widget(self)
+        self.show()
+
+    def update_image(self):
+        image, geometry = self.app.image, self.app.geometry
+        q_grid = default_q_grid(geometry) if image is not None else None
+        q_image = remap_to_q(image, geometry, q_grid) if q_grid is not None else None
+        if q_image is None:
+            self.clear_image()
+            self.image_plot.setTitle('Set the grazing-incidence parameters of the geometry')
+            return
+        self.image_plot.setTitle(None)
+        self.set_data(q_image)
+        (q_xy_min, q_xy_max), (q_z_min, q_z_max) = q_grid.q_xy_range, q_grid.q_z_range
+        self.image_item.setRect(QRectF(q_xy_min, q_z_min, q_xy_max - q_xy_min, q_z_max - q_z_min))
+        self.set_auto_range()
+
+    def closeEvent(self, a0) -> None:
+        for signal in self._signals:
+            signal.disconnect(self.update_image)
+        super().closeEvent(a0)
@@ -64,8 +64,9 @@ class SaveWindow(QWidget):
         layout.addWidget(self.options_widget.bool_options, 2, 0)
         layout.addWidget(self.options_widget.text_options, 2, 1)
         layout.addWidget(self.num_select_widget, 2, 2)
-        layout.addWidget(self.save_button, 3, 0)
-        layout.addWidget(self.cancel_button, 3, 1)
+        layout.addWidget(self.options_widget.storage_options, 3, 0, 1, 3)
+        layout.addWidget(self.save_button, 4, 0)
+        layout.addWidget(self.cancel_button, 4, 1)
 
         self.setMinimumWidth(600)
 
@@ -8,6 +8,7 @@ from ...app.data_manager import (
     TextFormats,
     MetaTextFormats,
 )
+from ...app.file_manager import H5StoragePolicy, PolarImageDtype, available_compressions
 from ...gui.basic_widgets import Label
 
 
@@ -24,6 +25,7 @@ class OptionsWidget(QWidget):
         self.bool_options = BoolOptionsWidget(saving_parameters, self)
         self.text_options = TextFormatOptions(saving_parameters, self)
         self.text_options.setHidden(True)
+        self.storage_options = H5StorageOptions(saving_parameters, self)
 
     def set_format(self, save_format: SaveFormats, saving_parameters: SavingParameters):
         if self._current_format != save_format:
@@ -32,25 +34,30 @@ class OptionsWidget(QWidget):
                 saving_parameters.set_entire_h5_params()
                 self.bool_options.setDisabled(True)
                 self.text_options.setHidden(True)
+                self.storage_options.setHidden(False)
             elif save_format.value == SaveFormats.partial_h5.value:
                 saving_parameters.set_partial_h5_params()
                 self.bool_options.setDisabled(False)
                 self.text_options.setHidden(True)
+                self.storage_options.setHidden(False)
             elif save_format.value == SaveFormats.text.value:
                 self.bool_options.setDisabled(False)
                 self.text_options.setHidden(False)
+                self.storage_options.setHidden(True)
             elif save_format.value in (
                     SaveFormats.object_detection.value,
                     SaveFormats.partial_h5.value,
             ):
                 self.bool_options.setDisabled(True)
                 self.text_options.setHidden(True)
+                self.storage_options.setHidden(True)
             else:
                 raise ValueError(f'Unknown save format {save_format}.')
 
     def update_params(self, params: SavingParameters):
         self.bool_options.update_params(params)
         self.text_options.update_params(params)
+        self.storage_options.update_params(params)
 
 
 class BoolOptionsWidget(QWidget):
@@ -103,3 +110,45 @@ class TextFormatOptions(QWidget):
     def update_params(self, params: SavingParameters):
         params.text_format = TextFormats(self.text_format.currentText())
         params.meta_text_format = MetaTextFormats(self.meta_text_format.currentText())
+
+
+class H5StorageOptions(QWidget):
+    NO_COMPRESSION = 'none'
+
+    def __init__(self, saving_parameters: SavingParameters, parent=None):
+        super().__init__(parent)
+
+        self._init_ui(saving_parameters)
+
+    def _init_ui(self, saving_parameters: SavingParameters):
+        layout = QGridLayout(self)
+        self.compression = QComboBox(self)
+        self.compression.addItems([self.NO_COMPRESSION] + available_compressions())
+
+        self.shuffle = QCheckBox(self)
+
+        self.polar_dtype = QComboBox(self)
+        self.polar_dtype.addItems([value.value for value in PolarImageDtype])
+
+        storage = saving_parameters.storage
+        self.compression.setCurrentText(storage.compression or self.NO_COMPRESSION)
+        self.shuffle.setChecked(storage.shuffle)
+        self.polar_dtype.setCurrentText(storage.polar_dtype.value)
+
+        layout.addWidget(Label('Compression'), 0, 0)
+        layout.addWidget(self.compression, 1, 0)
+        layout.addWidget(Label('Shuffle'), 2, 0)
+        layout.addWidget(self.shuffle, 3, 0)
+        layout.addWidget(Label('Polar images type'), 4, 0)
+        layout.addWidget(self.polar_dtype, 5, 0)
+
+    def update_params(self, params: SavingParameters):
+        compression = self.compression.currentText()
+        compression = None if compression == self.NO_COMPRESSION else compression
+        params.storage = H5StoragePolicy(
+            compression=compression,
+            compression_opts=params.storage.compression_opts if compression == params.storage.compression else None,
+            chunks=params.storage.chunks,
+            shuffle=self.shuffle.isChecked(),
+            polar_dtype=PolarImageDtype(self.polar_dtype.currentText()),
+        )
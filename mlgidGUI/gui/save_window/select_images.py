@@ -9,7 +9,7 @@ from PyQt5.QtWidgets import (
     QTreeWidgetItem,
     QSplitter,
 )
-from PyQt5.QtCore import Qt, pyqtSlot, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSlot, pyqtSignal, QRectF
 
 from ...app import Roi, App
 from ...app.file_manager import ImageKey, FolderKey
@@ -20,6 +20,9 @@ from ...gui.image_viewer import ImageViewer
 class SelectImagesWindow(QWidget):
     sigApplyClicked = pyqtSignal(dict)
 
+    # images are shown as strided previews, so that large h5 frames are read partially
+    PREVIEW_SIZE = 1024
+
     def __init__(self, path_dict: Dict[FolderKey, List[ImageKey]], parent=None):
         super().__init__(parent)
         self.setWindowFlag(Qt.Window, True)
@@ -68,9 +71,14 @@ class SelectImagesWindow(QWidget):
         self._image_viewer.clear_rois()
 
         image_data: ImageData = self.app.data_manager.load_image_data(
-            image_key, flags=ImageDataFlags.IMAGE | ImageDataFlags.ROI_DATA)
+            image_key, flags=ImageDataFlags.IMAGE | ImageDataFlags.ROI_DATA, preview_size=self.PREVIEW_SIZE)
         if image_data.image is not None:
             self._image_viewer.set_data(image_data.image)
+            # previews are shown in the pixel coordinates of the full image, as the rois
+            height, width = image_data.image.shape[:2]
+            rect = QRectF(0, 0, width * image_data.preview_step, height * image_data.preview_step)
+            self._image_viewer.image_item.setRect(rect)
+            self._image_viewer.view_box.setRange(rect=rect, padding=0)
             if image_data.roi_data:
                 self._image_viewer.add_rois(image_data.roi_data.values())
         else:
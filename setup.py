@@ -61,6 +61,10 @@ setup(
         'xmlobj',
         'xrayutilities==1.7.7'
     ],
+    extras_require={
+        # bitshuffle/LZ4 and other HDF5 compression filters used by Eiger detectors
+        'eiger': ['hdf5plugin'],
+    },
     include_package_data=True,
     keywords='xray python giwaxs scientific-analysis',
     url='https://pypi.org/project/giwaxs-gui',
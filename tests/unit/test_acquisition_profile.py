@@ -0,0 +1,66 @@
+import numpy as np
+import tifffile
+
+from mlgidGUI.app.acquisition_profile import AcquisitionProfile
+from mlgidGUI.app.file_manager import FileManager
+from mlgidGUI.app.geometry import Geometry
+
+
+def test_apply_profile():
+    image = np.arange(10 * 13, dtype=np.uint16).reshape(10, 13)
+    profile = AcquisitionProfile(binning=2, crop=(1, 10, 2, 13))
+
+    binned = profile.apply(image)
+    assert binned.shape == profile.shape(image.shape) == (4, 5)
+    assert binned.dtype == np.float32
+    np.testing.assert_allclose(binned[0, 0], image[1:3, 2:4].mean())
+    assert AcquisitionProfile().apply(image) is image
+
+
+def test_profile_geometry():
+    image = np.zeros((100, 130), dtype=np.uint16)
+    image[30:34, 51:55] = 1
+    profile = AcquisitionProfile(binning=4, crop=(10, 90, 7, 121))
+
+    for t_key in ('1234', '2413', '4231'):
+        geometry = Geometry(beam_center=(33.5, 60.25), shape=image.shape, t_key=t_key, scale=0.1)
+        binned_geometry = profile.geometry_from_detector(geometry, image.shape)
+        binned_image = binned_geometry.t(profile.apply(image))
+        assert binned_geometry.shape == binned_image.shape
+
+        # the same detector pixels have the same scaled coordinates relative to the beam center
+        position = (np.argwhere(geometry.t(image)).mean(0) - geometry.beam_center) * geometry.scale
+        binned_position = (np.argwhere(binned_image).mean(0) - binned_geometry.beam_center) * binned_geometry.scale
+        np.testing.assert_allclose(binned_position, position)
+
+        restored = profile.geometry_to_detector(binned_geometry, image.shape)
+        np.testing.assert_allclose(restored.beam_center, geometry.beam_center)
+        assert np.isclose(restored.scale, geometry.scale)
+
+
+def test_folder_profile(tmp_path):
+    data_path = tmp_path / 'data'
+    data_path.mkdir()
+    tifffile.imwrite(data_path / 'image.tiff', np.ones((40, 60), dtype=np.uint16))
+
+    fm = FileManager()
+    fm.open_project(tmp_path / 'project')
+    folder_key = fm.add_root_path_to_project(data_path)
+    folder_key.update()
+    image_key, = folder_key.image_children
+    fm.geometries.default[folder_key] = Geometry(beam_center=(20, 30), shape=(40, 60))
+
+    fm.set_acquisition_profile(folder_key, AcquisitionProfile(binning=2, crop=(0, 40, 10, 60)))
+
+    assert fm.images[image_key].shape == (20, 25)
+    geometry = fm.geometries.default[folder_key]
+    assert geometry.shape == (20, 25) and geometry.scale == 2
+    np.testing.assert_allclose(geometry.beam_center, (9.75, 9.75))
+
+    fm.close_project()
+    fm.open_project(tmp_path / 'project')
+    folder_key, = fm.root.folder_children
+    folder_key.update()
+    image_key, = folder_key.image_children
+    assert fm.acquisition_profiles.get(image_key) == AcquisitionProfile(2, (0, 40, 10, 60))
+    assert fm.images[image_key].shape == (20, 25)
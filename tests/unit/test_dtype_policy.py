@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+import pytest
+
+from mlgidGUI.app.dtype_policy import float_dtype, set_float_dtype, DEFAULT_FLOAT_DTYPE
+from mlgidGUI.app.file_manager import FileManager
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.image_processing import standard_contrast_correction
+from mlgidGUI.app.polar_image import PolarImage
+
+from .test_image_holder import _image_holder
+
+
+def test_float_dtype_policy(tmp_path):
+    image = np.random.default_rng(0).poisson(4, (30, 40)).astype(np.int32)
+    geometry = Geometry(shape=image.shape, beam_center=(25, 20), polar_shape=(16, 16))
+    assert float_dtype() == np.float32
+    assert geometry.polar_grids[0].dtype == np.float32
+    assert PolarImage.remap(image, geometry).dtype == np.float32
+    assert standard_contrast_correction(image).dtype == np.float32
+
+    fm = FileManager()
+    fm.open_project(tmp_path / 'project')
+    try:
+        fm.set_float_dtype('float64')
+        other = Geometry(shape=image.shape, beam_center=(25, 20), polar_shape=(16, 16))
+        assert other.polar_grids[0].dtype == np.float64
+        assert PolarImage.remap(image, other).dtype == np.float64
+        np.testing.assert_allclose(PolarImage.remap(image, other), PolarImage.remap(image, geometry), atol=1e-4)
+        with pytest.raises(ValueError):
+            fm.set_float_dtype('float16')
+
+        fm.close_project()
+        assert float_dtype() == np.dtype(DEFAULT_FLOAT_DTYPE)
+        fm.open_project(tmp_path / 'project')
+        assert float_dtype() == np.float64
+    finally:
+        fm.close_project()
+        set_float_dtype(DEFAULT_FLOAT_DTYPE)
+
+
+def test_caches_are_cleared_on_float_dtype_change(tmp_path):
+    fm, image_holder, keys = _image_holder(tmp_path)
+    try:
+        image_holder.change_image(keys[0])
+        geometry = image_holder.geometry
+        fm.polar_images.set(keys[1], PolarImage.remap(fm.images[keys[1]], geometry), geometry, cv2.INTER_LINEAR)
+        assert fm.polar_images[keys[1]].dtype == np.float32 and len(fm.polar_images.cache)
+        image_holder.prefetcher.prefetch_neighbours(keys[0], cv2.INTER_LINEAR)
+        image_holder.prefetcher._executor.submit(lambda: None).result()
+        assert keys[1] in image_holder.prefetcher.cache
+
+        fm.set_float_dtype('float64')
+        assert not len(fm.polar_images.cache)
+        assert keys[1] not in image_holder.prefetcher.cache
+        # grids already used by geometries are replaced too
+        assert geometry.polar_grids[0].dtype == np.float64
+        assert fm.polar_images[keys[1]].dtype == np.float64
+    finally:
+        fm.close_project()
+        set_float_dtype(DEFAULT_FLOAT_DTYPE)
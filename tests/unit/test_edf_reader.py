@@ -0,0 +1,88 @@
+import gzip
+
+import numpy as np
+import pytest
+
+from mlgidGUI.app.edf_reader import read_edf, read_edf_series, CorruptedFileError
+
+
+def _edf_bytes(image: np.ndarray, header_size: int = 512) -> bytes:
+    header = (f'{{\nHeaderID = EH:000001:000000:000000 ;\nByteOrder = LowByteFirst ;\n'
+              f'DataType = UnsignedShort ;\nDim_1 = {image.shape[1]} ;\nDim_2 = {image.shape[0]} ;\n'
+              f'Size = {image.nbytes} ;\n')
+    header = header.ljust(header_size - 2) + '}\n'
+    return header.encode('utf-8') + image.astype('<u2').tobytes()
+
+
+def _write_edf(path, image: np.ndarray, header_size: int = 512):
+    path.write_bytes(_edf_bytes(image, header_size))
+    return path
+
+
+@pytest.fixture
+def image():
+    return np.arange(12 * 7, dtype=np.uint16).reshape(12, 7)
+
+
+def test_read_edf_mmap(tmp_path, image):
+    path = _write_edf(tmp_path / 'frame.edf', image)
+    data, header_dict = read_edf(path, return_dict=True)
+    assert not data.flags.writeable
+    assert np.all(data == np.rot90(image))
+    assert header_dict['headerSize'] == 512
+    assert np.all(read_edf(path, use_mmap=False) == data)
+
+
+def test_read_edf_gz(tmp_path, image):
+    path = tmp_path / 'frame.edf.gz'
+    path.write_bytes(gzip.compress(_edf_bytes(image)))
+    assert np.all(read_edf(path) == np.rot90(image))
+
+
+def test_header_template(tmp_path, image):
+    _, header_dict = read_edf(_write_edf(tmp_path / '0.edf', image), return_dict=True)
+    path = _write_edf(tmp_path / '1.edf', image + 1)
+    data, template = read_edf(path, header_dict=header_dict, return_dict=True)
+    assert template is header_dict
+    assert np.all(data == np.rot90(image + 1))
+
+
+def test_header_template_mismatch(tmp_path, image):
+    _, header_dict = read_edf(_write_edf(tmp_path / '0.edf', image), return_dict=True)
+
+    other_image = np.ones((5, 3), dtype=np.uint16)
+    data, new_header_dict = read_edf(_write_edf(tmp_path / '1.edf', other_image, 1024),
+                                     header_dict=header_dict, return_dict=True)
+    assert new_header_dict is not header_dict
+    assert new_header_dict['headerSize'] == 1024
+    assert np.all(data == np.rot90(other_image))
+
+
+def test_truncated_file(tmp_path, image):
+    path = tmp_path / 'frame.edf'
+    path.write_bytes(_edf_bytes(image)[:-10])
+    with pytest.raises(CorruptedFileError):
+        read_edf(path)
+
+
+def test_read_edf_gz_template(tmp_path, image):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f'{i}.edf.gz'
+        path.write_bytes(gzip.compress(_edf_bytes(image + i)))
+        paths.append(path)
+    _, header_dict = read_edf(paths[0], return_dict=True)
+    _, template = read_edf(paths[1], header_dict=header_dict, return_dict=True)
+    assert template is header_dict
+
+    images = read_edf_series(paths, max_workers=2)
+    assert len(images) == 4
+    for i, data in enumerate(images):
+        assert np.all(data == np.rot90(image + i))
+
+
+def test_truncated_gz_file(tmp_path, image):
+    path = tmp_path / 'frame.edf.gz'
+    path.write_bytes(gzip.compress(_edf_bytes(image)[:-10]))
+    with pytest.raises(CorruptedFileError):
+        read_edf(path)
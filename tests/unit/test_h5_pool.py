@@ -0,0 +1,116 @@
+import os
+from threading import Event, Thread, Timer
+from time import sleep, monotonic
+
+import numpy as np
+from h5py import File
+
+from mlgidGUI.app.file_manager import H5FilePool
+
+
+def _write(path, data):
+    with File(str(path), 'a') as f:
+        if 'data' in f:
+            del f['data']
+        f.create_dataset('data', data=data)
+
+
+def _pooled(pool, path):
+    return pool._files[str(path.resolve())]
+
+
+def test_reference_counts(tmp_path):
+    path = tmp_path / 'data.h5'
+    _write(path, np.arange(4))
+    pool = H5FilePool()
+
+    with pool.open(path) as f:
+        assert _pooled(pool, path).ref_count == 1
+        with pool.open(path) as other:
+            assert other is f
+            assert _pooled(pool, path).ref_count == 2
+        assert _pooled(pool, path).ref_count == 1
+        # handles in use are not closed
+        assert not pool.close(path)
+        pool.close_all()
+        assert path in pool
+    assert _pooled(pool, path).ref_count == 0
+    assert f.id.valid
+
+    assert pool.close(path)
+    assert path not in pool and not f.id.valid
+
+
+def test_idle_handles_are_closed(tmp_path):
+    path = tmp_path / 'data.h5'
+    _write(path, np.arange(4))
+    pool = H5FilePool(idle_timeout=0.05)
+
+    with pool.open(path) as f:
+        sleep(0.2)
+        assert path in pool
+    start = monotonic()
+    while path in pool and monotonic() - start < 5:
+        sleep(0.02)
+    assert path not in pool and not f.id.valid
+
+
+def test_modified_files_are_reopened(tmp_path):
+    path = tmp_path / 'data.h5'
+    _write(path, np.arange(4))
+    pool = H5FilePool()
+
+    with pool.open(path) as f:
+        pass
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    with pool.open(path) as reopened:
+        assert reopened is not f and not f.id.valid
+    with pool.open(path) as same:
+        assert same is reopened
+    pool.close_all()
+
+
+def test_writer_overlapping_reader(tmp_path):
+    path = tmp_path / 'data.h5'
+    _write(path, np.arange(4))
+    pool = H5FilePool()
+
+    with pool.open(path) as reader:
+        np.testing.assert_array_equal(reader['data'][()], np.arange(4))
+        # a writer has to wait until the reader releases the file
+        assert not pool.close(path)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        # the handle in use is kept even though the file looks modified
+        with pool.open(path) as nested:
+            assert nested is reader
+        np.testing.assert_array_equal(reader['data'][()], np.arange(4))
+
+    assert pool.close(path)
+    _write(path, np.arange(6))
+    with pool.open(path) as f:
+        np.testing.assert_array_equal(f['data'][()], np.arange(6))
+    pool.close_all()
+
+
+def test_close_waits_for_release(tmp_path):
+    path = tmp_path / 'data.h5'
+    _write(path, np.arange(4))
+    pool = H5FilePool()
+    opened, release = Event(), Event()
+
+    def read():
+        with pool.open(path):
+            opened.set()
+            release.wait()
+
+    reader = Thread(target=read)
+    reader.start()
+    opened.wait()
+    assert not pool.close(path, timeout=0.05)
+    Timer(0.1, release.set).start()
+    assert pool.close(path, timeout=5)
+    assert path not in pool
+    reader.join()
+    _write(path, np.arange(6))
@@ -0,0 +1,30 @@
+import numpy as np
+from h5py import File
+
+from mlgidGUI.app.file_manager import H5StoragePolicy, PolarImageDtype
+from mlgidGUI.app.file_manager.read_polar_images import _ReadPolarImage
+
+
+def test_polar_image_storage(tmp_path):
+    polar_image = np.random.default_rng(0).uniform(-5, 100, (64, 32)).astype(np.float32)
+    polar_image[0, :5] = np.nan
+
+    with File(str(tmp_path / 'data.h5'), 'w') as f:
+        for polar_dtype in PolarImageDtype:
+            storage = H5StoragePolicy(compression='gzip', shuffle=True, chunks=(16, 1000), polar_dtype=polar_dtype)
+            group = f.create_group(polar_dtype.name)
+            _ReadPolarImage.set_h5(group, None, polar_image, storage)
+
+            assert group['polar_image'].chunks == (16, 32)
+            assert group['polar_image'].compression == 'gzip'
+
+            image = _ReadPolarImage.get_h5(group, None)
+            assert image.dtype == np.float32
+            assert np.all(np.isnan(image[0, :5]))
+            assert np.allclose(image[1:], polar_image[1:], atol=0.1)
+
+
+def test_scalar_datasets_are_not_filtered():
+    assert H5StoragePolicy(compression='lzf').dataset_kwargs(()) == {}
+    assert H5StoragePolicy(compression='lzf').dataset_kwargs((0,)) == {}
+    assert H5StoragePolicy().dataset_kwargs((10, 10)) == {}
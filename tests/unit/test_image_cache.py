@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import tifffile
+
+from mlgidGUI.app.cache import (ByteLRUCache, CompressedLRUCache, available_codecs,
+                               compress_array, decompress_array)
+from mlgidGUI.app.read_image import read_image
+from mlgidGUI.app.file_manager import ImagePathKey, FileManager
+from mlgidGUI.app.file_manager.project_structure import ProjectStructure
+from mlgidGUI.app.file_manager.read_images import _ReadImage
+
+
+def test_byte_lru_cache():
+    cache = ByteLRUCache(100)
+    cache['a'] = np.zeros(40, dtype=np.uint8)
+    cache['b'] = np.zeros(40, dtype=np.uint8)
+    assert cache.get('a') is not None
+    cache['c'] = np.zeros(40, dtype=np.uint8)
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.nbytes == 80
+    assert not cache.set('d', np.zeros(101, dtype=np.uint8))
+    assert cache.get('b') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_read_image_cache(tmp_path):
+    image_path = tmp_path / 'image.tiff'
+    tifffile.imwrite(image_path, np.ones((10, 20), dtype=np.float32))
+
+    project_structure = ProjectStructure()
+    project_structure.open_project(tmp_path / 'project')
+    images = _ReadImage(project_structure)
+    key = ImagePathKey(project_structure.path, None, path=image_path)
+
+    image = images[key]
+    np.testing.assert_array_equal(images[key], image)
+    assert (images.cache.hits, images.cache.misses) == (1, 1)
+
+    tifffile.imwrite(image_path, np.zeros((10, 30), dtype=np.float32))
+    stat = image_path.stat()
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert images[key].shape == (10, 30)
+
+    del images[key]
+    assert len(images.cache) == 0
+
+
+def test_read_multi_sample_tiff(tmp_path):
+    rgb = np.zeros((10, 20, 3), dtype=np.uint16)
+    rgb[..., 1] = 60000
+    image_path = tmp_path / 'rgb.tiff'
+    tifffile.imwrite(image_path, rgb, photometric='rgb')
+    tifffile.imwrite(tmp_path / 'planar.tiff', np.moveaxis(rgb, -1, 0), photometric='rgb', planarconfig='separate')
+
+    for path in (image_path, tmp_path / 'planar.tiff'):
+        image = read_image(path)
+        assert image.shape == (10, 20)
+        assert image.dtype == np.uint16
+        assert np.all(image == round(60000 * 0.587))
+
+
+def test_compress_array():
+    rng = np.random.default_rng(0)
+    for dtype in (np.uint8, np.int32, np.float32):
+        array = rng.poisson(2, (300, 200)).astype(dtype)
+        for codec in available_codecs():
+            compressed = compress_array(array, codec, chunk_size=10000)
+            assert len(compressed.chunks) > 1
+            assert compressed.nbytes < array.nbytes
+            np.testing.assert_array_equal(decompress_array(compressed), array)
+
+
+def test_compressed_lru_cache():
+    cache = CompressedLRUCache(2 ** 20)
+    array = np.random.default_rng(0).poisson(2, (256, 256)).astype(np.int32)
+    cache['a'] = array
+    cache._compressor.submit(lambda: None).result()
+    assert cache.compressed_nbytes == cache.nbytes < array.nbytes / 3
+    cached = cache['a']
+    np.testing.assert_array_equal(cached, array)
+    assert not cached.flags.writeable
+
+
+def test_memory_mapped_entries_are_limited(tmp_path):
+    cache = CompressedLRUCache(2 ** 20, max_mapped=3)
+    cache['array'] = np.zeros(10, dtype=np.uint16)
+    for i in range(5):
+        path = tmp_path / f'{i}.bin'
+        np.full(10, i, dtype=np.uint16).tofile(path)
+        cache[i] = np.memmap(path, dtype=np.uint16, mode='r').view(np.ndarray)
+        cache.get('array')
+
+    # the least recently used mapped entries are evicted, other entries are kept
+    assert cache.mapped_num == 3
+    assert [i for i in range(5) if i in cache] == [2, 3, 4]
+    assert 'array' in cache
+    np.testing.assert_array_equal(cache[4], np.full(10, 4))
+
+
+def test_stored_images_are_read_back(tmp_path):
+    data_path = tmp_path / 'data'
+    data_path.mkdir()
+    tifffile.imwrite(data_path / 'image.tiff', np.ones((10, 20), dtype=np.float32))
+    fm = FileManager()
+    fm.open_project(tmp_path / 'project')
+    folder_key = fm.add_root_path_to_project(data_path)
+    folder_key.update()
+    key = list(folder_key.image_children)[0]
+
+    stored = np.arange(6 * 8, dtype=np.float32).reshape(6, 8)
+    fm.images[key] = stored
+    assert fm.images.is_stored(key)
+    np.testing.assert_array_equal(fm.images[key], stored)
+    np.testing.assert_array_equal(fm.images.get_lazy(key).read(), stored)
+    np.testing.assert_array_equal(fm.images.get_images([key])[0], stored)
+
+    del fm.images[key]
+    assert not fm.images.is_stored(key)
+    np.testing.assert_array_equal(fm.images[key], np.ones((10, 20)))
+    fm.close_project()
@@ -0,0 +1,117 @@
+import numpy as np
+import tifffile
+from PyQt5.QtCore import QCoreApplication
+
+from mlgidGUI.app.file_manager import FileManager
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.geometry_holder import GeometryHolder
+from mlgidGUI.app.image_holder import ImageHolder
+from mlgidGUI.app.integration import AzimuthalIntegrator
+from mlgidGUI.app.polar_image import PolarImage
+from mlgidGUI.app.profiles import SavedProfile, BaselineParams
+from mlgidGUI.app.rois.roi import Roi
+from mlgidGUI.app.rois.roi_dict import RoiDict
+
+
+def _image_holder(tmp_path):
+    folder = tmp_path / 'data'
+    folder.mkdir()
+    rng = np.random.default_rng(0)
+    for i in range(2):
+        tifffile.imwrite(folder / f'{i}.tiff', rng.random((60, 80)).astype(np.float32))
+    fm = FileManager()
+    fm.open_project(tmp_path / 'project')
+    folder_key = fm.add_root_path_to_project(folder)
+    folder_key.update()
+    fm.geometries.default[folder_key] = Geometry(beam_center=(55, 40), polar_shape=(64, 64))
+    g_holder = GeometryHolder(fm)
+    image_holder = ImageHolder(fm, g_holder, RoiDict(fm, g_holder))
+    return fm, image_holder, list(folder_key.image_children)
+
+
+def test_polar_window_by_key(tmp_path):
+    fm, image_holder, keys = _image_holder(tmp_path)
+    _, polar_image, geometry = image_holder.get_data_by_key(keys[0])
+    roi = Roi(radius=30, width=6, key=1)
+
+    window = geometry.polar_window(roi.r_range)
+    polar_part, phi_axis, r_axis = image_holder.get_polar_window_by_key(keys[0], roi.r_range)
+    np.testing.assert_allclose(polar_part, polar_image[window], atol=1e-5)
+    np.testing.assert_allclose(r_axis, geometry.r_axis[window[1]])
+    np.testing.assert_allclose(phi_axis, geometry.phi_axis)
+    np.testing.assert_allclose(image_holder.get_angular_profile_by_key(keys[0], roi),
+                               PolarImage(polar_image).get_angular_profile(geometry, roi), atol=1e-5)
+
+    # rois outside of the polar image and the padding of empty windows
+    assert image_holder.get_polar_window_by_key(keys[0], (1000, 1010), r_pad=5) == (None, None, None)
+    assert image_holder.get_angular_profile_by_key(keys[0], Roi(radius=1000, width=6)) is None
+    fm.close_project()
+
+
+def test_current_image_profiles_and_fits(tmp_path):
+    fm, image_holder, keys = _image_holder(tmp_path)
+    image_holder.change_image(keys[1])
+    roi = Roi(radius=30, width=6, key=1)
+    image_holder._roi_dict.add_roi(roi)
+    window = image_holder.geometry.polar_window(roi.r_range)
+
+    np.testing.assert_allclose(image_holder.get_angular_profile(roi.key),
+                               np.nanmean(image_holder.polar_image[window], axis=1))
+
+    # fits of the current image are made on the full radial axis
+    fit_object = image_holder.create_fit_object([roi, Roi(radius=40, width=4, key=2)])
+    assert fit_object.image_key == keys[1]
+    np.testing.assert_array_equal(fit_object.r_axis, image_holder.geometry.r_axis)
+    assert fit_object.polar_image.shape == image_holder.geometry.polar_shape
+    assert set(fit_object.fits) == {roi.key, 2}
+    assert all(fit.x.size for fit in fit_object.fits.values())
+
+    # folder-wide fits use the radial band of the rois only
+    band_object = image_holder.create_fit_object_by_key(keys[0], [roi, Roi(radius=40, width=4, key=2)])
+    assert band_object.image_key == keys[0]
+    assert band_object.r_axis[0] < 30 - 6 * 2 and band_object.r_axis[-1] > 40 + 4 * 2
+    assert band_object.polar_image.shape == (image_holder.geometry.polar_shape[0], band_object.r_axis.size)
+    assert band_object.r_axis.size < image_holder.geometry.polar_shape[1]
+    assert image_holder.create_fit_object_by_key(keys[0], [Roi(radius=1000, width=6, key=3)]) is None
+    fm.close_project()
+
+
+def test_reopen_fit_with_saved_profile(tmp_path):
+    fm, image_holder, keys = _image_holder(tmp_path)
+    image_holder.change_image(keys[0])
+    roi = Roi(radius=30, width=6, key=1)
+    fit_object = image_holder.create_fit_object([roi])
+
+    # the fit widget saves the profile of the fit object on baseline changes
+    r_axis = fit_object.r_axis
+    baseline = np.full(r_axis.size, 0.1, dtype=np.float32)
+    fm.profiles[keys[0]] = SavedProfile(fit_object.r_profile, r_axis, (r_axis[0], r_axis[-1]), 0,
+                                        BaselineParams(), baseline)
+    reopened = image_holder.create_fit_object([roi])
+    assert reopened.saved_profile is not None
+    np.testing.assert_allclose(reopened.r_profile, fit_object.r_profile - baseline)
+
+    # profiles of other axes (e.g. of a band) are not applied
+    fm.profiles[keys[0]] = SavedProfile(fit_object.r_profile[:11], r_axis[:11], (r_axis[0], r_axis[10]), 0,
+                                        BaselineParams())
+    reopened = image_holder.create_fit_object([roi])
+    assert reopened.saved_profile is None
+    np.testing.assert_allclose(reopened.r_profile, fit_object.r_profile)
+    fm.close_project()
+
+
+def test_radial_profile_in_background(tmp_path):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    fm, image_holder, keys = _image_holder(tmp_path)
+    image_holder.change_image(keys[0])
+    updates = []
+    image_holder.sigRadialProfileChanged.connect(lambda: updates.append(True))
+
+    # the profile of the polar image is returned until the matrix is calculated
+    np.testing.assert_array_equal(image_holder.get_radial_profile(), image_holder.polar.get_radial_profile())
+    image_holder._q_thread_pool.waitForDone()
+    app.processEvents()
+    assert updates == [True]
+    np.testing.assert_allclose(image_holder.get_radial_profile(),
+                               AzimuthalIntegrator(image_holder.geometry).integrate(image_holder.image))
+    fm.close_project()
@@ -0,0 +1,77 @@
+from threading import Event
+
+import cv2
+import numpy as np
+import tifffile
+
+from mlgidGUI.app.file_manager import FileManager
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.image_prefetch import ImagePrefetcher
+from mlgidGUI.app.polar_image import PolarImage
+
+
+def _prefetcher(tmp_path, num: int = 4):
+    folder = tmp_path / 'data'
+    folder.mkdir()
+    rng = np.random.default_rng(0)
+    for i in range(num):
+        tifffile.imwrite(folder / f'{i}.tiff', rng.random((30, 40)).astype(np.float32))
+    fm = FileManager()
+    fm.open_project(tmp_path / 'project')
+    folder_key = fm.add_root_path_to_project(folder)
+    folder_key.update()
+    fm.geometries.default[folder_key] = Geometry(beam_center=(25, 20), shape=(30, 40), polar_shape=(16, 16))
+    return fm, ImagePrefetcher(fm, next_num=2, prev_num=1), list(folder_key.image_children)
+
+
+def _wait(prefetcher: ImagePrefetcher):
+    prefetcher._executor.submit(lambda: None).result()
+
+
+def test_prefetched_images_are_served_once(tmp_path):
+    fm, prefetcher, keys = _prefetcher(tmp_path)
+    prefetcher.prefetch_neighbours(keys[1], cv2.INTER_LINEAR)
+    _wait(prefetcher)
+    assert all(key in prefetcher.cache for key in (keys[0], keys[2], keys[3]))
+    assert keys[1] not in prefetcher.cache
+
+    data = prefetcher.take(keys[2])
+    np.testing.assert_array_equal(data.raw_image, fm.images[keys[2]])
+    np.testing.assert_allclose(data.polar_image,
+                               PolarImage.remap(data.raw_image, data.default_geometry, cv2.INTER_LINEAR, raw=True))
+    assert data.default_geometry == fm.geometries.default[keys[2].parent]
+    assert prefetcher.take(keys[2]) is None
+    fm.close_project()
+
+
+def test_changed_data_is_dropped(tmp_path):
+    fm, prefetcher, keys = _prefetcher(tmp_path)
+    prefetcher.prefetch_neighbours(keys[1], cv2.INTER_LINEAR)
+    _wait(prefetcher)
+
+    prefetcher.invalidate(keys[0])
+    assert prefetcher.take(keys[0]) is None and keys[2] in prefetcher.cache
+    # the file manager reports saved geometries
+    fm.geometries[keys[2]] = Geometry(beam_center=(10, 20), shape=(30, 40))
+    assert prefetcher.take(keys[2]) is None and keys[3] in prefetcher.cache
+    prefetcher.invalidate(keys[3].parent)
+    assert not len(prefetcher.cache)
+    fm.close_project()
+
+
+def test_stale_results_are_discarded(tmp_path):
+    fm, prefetcher, keys = _prefetcher(tmp_path)
+    # the loads are queued behind a blocked task and finish after the invalidation
+    release = Event()
+    prefetcher._executor.submit(release.wait)
+    prefetcher.prefetch_neighbours(keys[1], cv2.INTER_LINEAR)
+    prefetcher.invalidate(keys[2])
+    release.set()
+    _wait(prefetcher)
+    assert not len(prefetcher.cache)
+    assert prefetcher.take(keys[2]) is None
+
+    # later requests are loaded with the new version
+    prefetcher.prefetch_neighbours(keys[1], cv2.INTER_LINEAR)
+    assert prefetcher.take(keys[2]) is not None
+    fm.close_project()
@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+from h5py import File
+
+from mlgidGUI.app.data_manager.import_from_h5 import ImportProjectFromH5
+from mlgidGUI.app.file_manager import FileManager, IMAGE_PROJECT_KEY, PROJECT_KEY
+from mlgidGUI.app.file_manager.read_polar_images import _ReadPolarImage
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.polar_image import PolarImage
+
+
+def test_imported_polar_images_are_valid(tmp_path):
+    rng = np.random.default_rng(0)
+    images = [rng.random((30, 40)).astype(np.float32) for _ in range(2)]
+    default_geometry = Geometry(beam_center=(25, 20), shape=(30, 40), polar_shape=(32, 32))
+    image_geometry = Geometry(beam_center=(20, 10), shape=(40, 30), polar_shape=(16, 24), t_key='2413')
+
+    with File(str(tmp_path / 'project.h5'), 'w') as f:
+        f.attrs[PROJECT_KEY] = True
+        group = f.create_group('folder')
+        group.attrs.update(default_geometry.to_dict())
+        for i, (image, geometry) in enumerate(zip(images, (None, image_geometry))):
+            img_group = group.create_group(f'image_{i}')
+            img_group.attrs[IMAGE_PROJECT_KEY] = True
+            img_group.create_dataset('image', data=image)
+            if geometry is not None:
+                img_group.attrs.update(geometry.to_dict())
+            _ReadPolarImage.set_h5(img_group, None, PolarImage.remap(image, geometry or default_geometry, raw=True))
+
+    (tmp_path / 'project').mkdir()
+    fm = FileManager()
+    try:
+        ImportProjectFromH5(fm).load(tmp_path / 'project.h5', tmp_path / 'project')
+        folder_key = next(iter(fm.root.folder_children))
+        keys = list(folder_key.image_children)
+        assert len(keys) == 2
+        assert fm.geometries[keys[1]] == image_geometry
+
+        for key, image, geometry in zip(keys, images, (fm.geometries.default[folder_key], fm.geometries[keys[1]])):
+            geometry.set_shape(geometry.t(image).shape)
+            polar_image = fm.polar_images.get(key, geometry, cv2.INTER_LINEAR)
+            assert polar_image is not None
+            np.testing.assert_array_equal(polar_image, PolarImage.remap(image, geometry, raw=True))
+    finally:
+        fm.close_project()
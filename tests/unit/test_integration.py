@@ -0,0 +1,49 @@
+import numpy as np
+
+from mlgidGUI.app.dtype_policy import set_float_dtype, DEFAULT_FLOAT_DTYPE
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.integration import AzimuthalIntegrator
+
+
+def test_azimuthal_integration():
+    shape = (60, 80)
+    geometry = Geometry(shape=shape, beam_center=(55, 30), polar_shape=(32, 40))
+    zz, yy = np.mgrid[:shape[0], :shape[1]]
+    r_image = np.hypot(yy - 30, zz - 55).astype(np.float32)
+
+    integrator = AzimuthalIntegrator(geometry)
+    assert integrator.shape == (40,)
+    assert AzimuthalIntegrator(geometry.copy()).matrix is integrator.matrix
+    np.testing.assert_allclose(integrator.integrate(r_image)[1:-1], geometry.r_axis[1:-1], atol=0.5)
+
+    image = np.random.default_rng(0).random(shape).astype(np.float32)
+    cake = AzimuthalIntegrator(geometry, angular=True)
+    assert cake.integrate(image).shape == (32, 40)
+    # every pixel is counted once
+    np.testing.assert_allclose(cake.matrix.sum(axis=0), 1, rtol=1e-6)
+
+    mask = np.zeros(shape, dtype=bool)
+    mask[:, :40] = True
+    masked_image = np.where(mask, 100, image)
+    nan_image = np.where(mask, np.nan, image)
+    masked = AzimuthalIntegrator(geometry, mask=mask).integrate(masked_image)
+    np.testing.assert_allclose(masked, integrator.integrate(nan_image), rtol=1e-5)
+    assert masked.max() <= 1
+
+    normalized = AzimuthalIntegrator(geometry, normalization=np.full(shape, 2, dtype=np.float32))
+    np.testing.assert_allclose(normalized.integrate(image), integrator.integrate(image) / 2, rtol=1e-5)
+
+
+def test_integration_matrices_follow_float_dtype():
+    geometry = Geometry(shape=(30, 40), beam_center=(25, 20), polar_shape=(16, 16))
+    image = np.random.default_rng(0).random((30, 40)).astype(np.float32)
+    matrix = AzimuthalIntegrator(geometry).matrix
+    try:
+        set_float_dtype('float64')
+        integrator = AzimuthalIntegrator(geometry)
+        assert integrator.matrix is not matrix and integrator.matrix.dtype == np.float64
+        assert integrator.integrate(image).dtype == np.float64
+    finally:
+        set_float_dtype(DEFAULT_FLOAT_DTYPE)
+    assert matrix.dtype == np.float32
+    assert AzimuthalIntegrator(geometry).matrix is matrix
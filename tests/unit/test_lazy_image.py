@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import tifffile
+from h5py import File
+
+from mlgidGUI.app.data_manager import ImageDataFlags
+from mlgidGUI.app.data_manager.load_data import load_image_data
+from mlgidGUI.app.file_manager import ArrayImage, LazyH5Image, LazyTiffImage, FileManager, H5_FILE_POOL
+from mlgidGUI.app.file_manager import lazy_image
+
+
+def _no_full_read(*args, **kwargs):
+    raise AssertionError('pixel data should not be read')
+
+
+def test_array_image():
+    image = np.arange(7 * 9, dtype=np.uint16).reshape(7, 9)
+    lazy = ArrayImage(image)
+    assert lazy.read() is image
+    assert (lazy.shape, lazy.dtype, lazy.ndim, lazy.nbytes) == ((7, 9), np.uint16, 2, image.nbytes)
+    np.testing.assert_array_equal(lazy.window((1, 5), (2, 8), step=2), image[1:5:2, 2:8:2])
+    assert lazy.preview_step(4) == 3
+    np.testing.assert_array_equal(lazy.preview(4), image[::3, ::3])
+    np.testing.assert_array_equal(np.asarray(lazy, dtype=np.float32), image)
+
+
+def test_lazy_h5_image(tmp_path, monkeypatch):
+    path = tmp_path / 'data.h5'
+    stack = np.arange(3 * 20 * 30, dtype=np.int32).reshape(3, 20, 30)
+    with File(str(path), 'w') as f:
+        f.create_dataset('entry/image', data=stack[0])
+        f.create_dataset('entry/stack', data=stack, chunks=(1, 20, 30))
+
+    image, frame = LazyH5Image(path, 'entry/image'), LazyH5Image(path, 'entry/stack', frame=2)
+    with monkeypatch.context() as m:
+        m.setattr(LazyH5Image, '__getitem__', _no_full_read)
+        assert (image.shape, image.dtype) == ((20, 30), np.int32)
+        assert (frame.shape, frame.dtype, frame.nbytes) == ((20, 30), np.int32, stack[2].nbytes)
+
+    np.testing.assert_array_equal(image.window((2, 9), (5, 25), step=3), stack[0, 2:9:3, 5:25:3])
+    np.testing.assert_array_equal(frame[4:6], stack[2, 4:6])
+    np.testing.assert_array_equal(frame.preview(10), stack[2, ::3, ::3])
+    np.testing.assert_array_equal(frame.read(), stack[2])
+    H5_FILE_POOL.close(path)
+
+
+def test_lazy_tiff_image(tmp_path, monkeypatch):
+    path = tmp_path / 'stack.tiff'
+    stack = np.arange(2 * 12 * 10, dtype=np.uint16).reshape(2, 12, 10)
+    tifffile.imwrite(path, stack)
+
+    frame = LazyTiffImage(path, frame=1)
+    with monkeypatch.context() as m:
+        m.setattr(lazy_image, 'read_tiff_frame', _no_full_read)
+        assert (frame.shape, frame.dtype) == ((12, 10), np.uint16)
+        with pytest.raises(AssertionError):
+            frame.read()
+    np.testing.assert_array_equal(frame.window((3, 9), (0, 10), step=2), stack[1, 3:9:2, 0:10:2])
+
+
+def test_preview_image_data(tmp_path):
+    folder = tmp_path / 'data'
+    folder.mkdir()
+    image = np.random.default_rng(0).random((100, 70)).astype(np.float32)
+    tifffile.imwrite(folder / 'image.tiff', image)
+    fm = FileManager()
+    fm.open_project(tmp_path / 'project')
+    folder_key = fm.add_root_path_to_project(folder)
+    folder_key.update()
+    key = list(folder_key.image_children)[0]
+
+    image_data = load_image_data(fm, None, key, ImageDataFlags.IMAGE, preview_size=40)
+    assert image_data.preview_step == 3
+    np.testing.assert_array_equal(image_data.image, image[::3, ::3])
+    image_data = load_image_data(fm, None, key, ImageDataFlags.IMAGE)
+    assert image_data.preview_step == 1
+    np.testing.assert_array_equal(image_data.image, image)
+    fm.close_project()
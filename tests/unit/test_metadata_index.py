@@ -0,0 +1,65 @@
+import gzip
+from types import SimpleNamespace
+
+import numpy as np
+import tifffile
+
+from mlgidGUI.app.edf_reader import read_edf_header
+from mlgidGUI.app.file_manager import FolderPathKey
+from mlgidGUI.app.file_manager.project_structure import ProjectStructure
+from mlgidGUI.app.file_manager.read_metadata_index import _ReadMetadataIndex
+from mlgidGUI.app.metadata_index import build_metadata_index
+
+
+def _edf_bytes(image: np.ndarray, date: str, th: float) -> bytes:
+    header = (f'{{\nHeaderID = EH:000001:000000:000000 ;\nByteOrder = LowByteFirst ;\n'
+              f'DataType = UnsignedShort ;\nDim_1 = {image.shape[1]} ;\nDim_2 = {image.shape[0]} ;\n'
+              f'Size = {image.nbytes} ;\nDate = {date} ;\ncount_time = 0.5 ;\n'
+              f'motor_mne = th tth ;\nmotor_pos = {th} 12.5 ;\n')
+    header = header.ljust(510) + '}\n'
+    return header.encode('utf-8') + image.astype('<u2').tobytes()
+
+
+def test_read_edf_header(tmp_path):
+    data = _edf_bytes(np.zeros((4, 3)), 'Tue Jun 13 12:00:00 2023', 0.1)
+    (tmp_path / 'frame.edf').write_bytes(data)
+    (tmp_path / 'frame.edf.gz').write_bytes(gzip.compress(data))
+    for name in ('frame.edf', 'frame.edf.gz'):
+        header = read_edf_header(tmp_path / name)
+        assert header['motor_mne'] == 'th tth'
+        assert header['Date'] == 'Tue Jun 13 12:00:00 2023'
+
+
+def test_build_metadata_index(tmp_path):
+    folder = tmp_path / 'series'
+    folder.mkdir()
+    image = np.zeros((4, 3))
+    for i, (second, th) in enumerate([(30, 0.3), (10, 0.1), (20, 0.2)]):
+        (folder / f'frame_{i}.edf').write_bytes(_edf_bytes(image, f'Tue Jun 13 12:00:{second} 2023', th))
+    tifffile.imwrite(folder / 'frame_3.tiff', image.astype(np.uint16), datetime='2023:06:13 12:00:00')
+
+    project_structure = ProjectStructure()
+    project_structure.open_project(tmp_path / 'project')
+    fm = SimpleNamespace(metadata_index=_ReadMetadataIndex(project_structure))
+
+    folder_key = FolderPathKey(project_structure.path, None, path=folder)
+    folder_key.update()
+    keys = list(folder_key.image_children)
+
+    progress = []
+    table = build_metadata_index(fm, folder_key, process_callback=progress.append)
+    assert progress == [1, 2, 3, 4]
+    assert len(table) == 4
+    np.testing.assert_allclose(table.values(keys, 'motor_th'), [0.3, 0.1, 0.2, np.nan])
+    assert table.column('count_time').dtype == np.float64
+
+    by_time = table.sort_keys(keys, 'timestamp')
+    assert [key.name for key in by_time] == ['frame3', 'frame1', 'frame2', 'frame0']
+    assert [key.name for key in table.sort_keys(keys, 'motor_th', reverse=True)] == \
+           ['frame0', 'frame2', 'frame1', 'frame3']
+    assert [key.name for key in table.filter_keys(keys, 'motor_th', min_value=0.15)] == ['frame0', 'frame2']
+
+    stored = fm.metadata_index[folder_key]
+    assert stored.columns == table.columns
+    rebuilt = build_metadata_index(fm, folder_key)
+    np.testing.assert_array_equal(rebuilt.column('timestamp'), table.column('timestamp'))
@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+from h5py import File, ExternalLink
+
+from mlgidGUI.app.file_manager import FolderH5Key, FolderNexusKey, ImageNexusFrameKey
+
+
+def _write_master(tmp_path, frames_per_file: int = 4, files_num: int = 3, shape=(6, 8)):
+    stacks = []
+    with File(tmp_path / 'scan_master.h5', 'w') as master:
+        master.create_group('entry/instrument')
+        data = master.create_group('entry/data')
+        for i in range(1, files_num + 1):
+            name = f'scan_data_{i:06d}.h5'
+            stack = np.random.randint(0, 1000, (frames_per_file, *shape)).astype(np.uint32)
+            with File(tmp_path / name, 'w') as f:
+                f.create_dataset('entry/data/data', data=stack, chunks=(1, *shape))
+            data[f'data_{i:06d}'] = ExternalLink(name, '/entry/data/data')
+            stacks.append(stack)
+        data['data_999999'] = ExternalLink('missing.h5', '/entry/data/data')
+    return np.concatenate(stacks)
+
+
+def test_nexus_master(tmp_path):
+    series = _write_master(tmp_path)
+
+    root = FolderH5Key(tmp_path, None, h5path=tmp_path / 'scan_master.h5')
+    root.update()
+    entry, = root.folder_children
+    entry.update()
+    data_key = next(key for key in entry.folder_children if key.name == 'data')
+    assert isinstance(data_key, FolderNexusKey)
+
+    data_key.update()
+    frames = list(data_key.image_children)
+    assert len(frames) == len(series)
+    assert all(isinstance(key, ImageNexusFrameKey) for key in frames)
+    assert len({key.name for key in frames}) == len(frames)
+    assert frames[5].h5path == tmp_path / 'scan_data_000002.h5' and frames[5].frame == 1
+
+    for i in (0, 5, 11):
+        np.testing.assert_array_equal(frames[i].get_image(), series[i])
+        np.testing.assert_array_equal(frames[i].get_lazy_image().window((1, 3), (2, 5)), series[i, 1:3, 2:5])
+
+
+def test_nexus_many_frames(tmp_path):
+    _write_master(tmp_path, frames_per_file=1000, files_num=10, shape=(2, 2))
+    data_key = FolderNexusKey(tmp_path, None, h5path=tmp_path / 'scan_master.h5', h5key='entry/data')
+    start = time.perf_counter()
+    data_key.update()
+    assert data_key.images_num == 10000
+    assert time.perf_counter() - start < 1
@@ -0,0 +1,152 @@
+import pickle
+
+import numpy as np
+
+from mlgidGUI.app import geometry as geometry_module
+from mlgidGUI.app.cache import ByteLRUCache
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.polar_image import PolarImage
+
+
+def test_cached_remap_maps():
+    image = np.random.default_rng(0).random((60, 80)).astype(np.float32)
+    geometry = Geometry(shape=image.shape, beam_center=(55, 40), polar_shape=(64, 64))
+
+    maps = geometry.remap_maps
+    assert geometry.remap_maps is maps
+    np.testing.assert_allclose(PolarImage.remap(image, geometry),
+                               PolarImage.calc_polar_image(image, *geometry.polar_grids), atol=1e-5)
+
+    geometry.set_scale(2)
+    assert geometry.remap_maps is maps
+
+    geometry.set_beam_center(50, 40)
+    assert geometry.remap_maps is not maps
+    np.testing.assert_allclose(PolarImage.remap(image, geometry),
+                               PolarImage.calc_polar_image(image, *geometry.polar_grids), atol=1e-5)
+
+    restored = pickle.loads(pickle.dumps(geometry))
+    assert restored._polar_grid is None
+    assert restored == geometry
+
+
+def test_geometry_ranges():
+    for shape, beam_center in (((30, 40), (12.3, -4.5)), ((30, 40), (10, 20)), ((25, 7), (40, 3.5))):
+        geometry = Geometry(shape=shape, beam_center=beam_center, polar_shape=(16, 16))
+        yy, zz = np.meshgrid(np.arange(shape[1]) - beam_center[1], np.arange(shape[0]) - beam_center[0])
+        rr, phi = np.sqrt(yy ** 2 + zz ** 2), np.arctan2(zz, yy)
+        assert geometry.r_range == (rr.min(), rr.max())
+        assert geometry.phi_range == (phi.min(), phi.max())
+
+
+def test_shared_polar_grids():
+    geometry = Geometry(shape=(30, 40), beam_center=(25, 20), scale=2, polar_shape=(16, 16))
+    other = Geometry(shape=(30, 40), beam_center=(25, 20), scale=3, polar_shape=(16, 16))
+    assert geometry.polar_grids[0] is other.polar_grids[0]
+    assert geometry.remap_maps is other.remap_maps
+    np.testing.assert_allclose(geometry.r_axis / 2, other.r_axis / 3)
+
+
+def test_geometry_persistence_and_copies():
+    geometry = Geometry(shape=(300, 400), beam_center=(250, 200), scale=2, t_key='2143')
+
+    data = pickle.dumps(geometry)
+    assert len(data) < 1000
+    restored = pickle.loads(data)
+    assert restored == geometry
+    assert restored.polar_grids[0] is geometry.polar_grids[0]
+    np.testing.assert_array_equal(restored.r_axis, geometry.r_axis)
+
+    legacy_state = dict(geometry.__dict__, _polar_grid=None)
+    legacy = Geometry.__new__(Geometry)
+    legacy.__setstate__(legacy_state)
+    assert legacy == geometry
+
+    copied = geometry.copy()
+    assert copied == geometry and copied.polar_grids[1] is geometry.polar_grids[1]
+    copied.set_beam_center(240, 200)
+    copied.set_scale(3)
+    copied.t.update('1234')
+    assert geometry.beam_center == (250, 200) and geometry.scale == 2 and geometry.t.key == '2143'
+    assert copied.polar_grids[1] is not geometry.polar_grids[1]
+    np.testing.assert_array_equal(geometry.r_axis, restored.r_axis)
+
+
+def test_polar_preview():
+    zz, yy = np.mgrid[:64, :96].astype(np.float32)
+    image = 2 * zz + yy
+    geometry = Geometry(shape=image.shape, beam_center=(60, 40), polar_shape=(64, 64))
+    geometry.set_beam_center(62, 45)
+    # grids are only built for full polar images
+    assert geometry._polar_grid is None
+    assert geometry.polar_aspect_ratio is not None and geometry._polar_grid is None
+
+    np.testing.assert_allclose(PolarImage.remap_preview(image, geometry, geometry.polar_shape),
+                               PolarImage.remap(image, geometry), atol=1e-3)
+
+    coarse = Geometry(shape=image.shape, beam_center=(62, 45), polar_shape=(16, 16))
+    binned = image.reshape(32, 2, 48, 2).mean(axis=(1, 3))
+    preview = PolarImage.remap_preview(binned, geometry, (16, 16), binning=2)
+    expected = PolarImage.remap(image, coarse)
+    # the linear image is reproduced inside the binned image
+    yy, zz = coarse.polar_grids
+    inside = (yy > 1) & (yy < 94) & (zz > 1) & (zz < 62)
+    np.testing.assert_allclose(preview[inside], expected[inside], atol=1e-3)
+
+
+def test_raw_remap_maps():
+    raw = np.random.default_rng(0).random((50, 70)).astype(np.float32)
+    for key in ('1234', '2413', '3142', '4231', '3412'):
+        geometry = Geometry(beam_center=(45, 20), polar_shape=(32, 32), t_key=key)
+        image = geometry.t(raw)
+        geometry.set_shape(image.shape)
+        np.testing.assert_allclose(PolarImage.remap(raw, geometry, raw=True), PolarImage.remap(image, geometry),
+                                   atol=1e-5)
+        assert geometry.copy().raw_remap_maps is geometry.raw_remap_maps
+
+
+def test_raw_remap_maps_are_bounded(monkeypatch):
+    monkeypatch.setattr(geometry_module, '_RAW_REMAP_MAPS', ByteLRUCache(3 * 32 * 32 * 8))
+    for key in ('2413', '3142', '4231', '3412'):
+        geometry = Geometry(beam_center=(45, 20), polar_shape=(32, 32), t_key=key)
+        geometry.set_shape(geometry.t(np.empty((50, 70))).shape)
+        assert geometry.raw_remap_maps[0].nbytes == 32 * 32 * 8
+    # maps of each transformation are counted by the cache and the oldest are evicted
+    assert len(geometry_module._RAW_REMAP_MAPS) == 3
+    assert geometry_module._RAW_REMAP_MAPS.nbytes == 3 * 32 * 32 * 8
+
+
+def test_auto_polar_shape():
+    geometry = Geometry(shape=(100, 80), beam_center=(99, 40), polar_shape='auto', polar_budget=10 ** 6)
+    (r_min, r_max), (phi_min, phi_max) = geometry.r_range, geometry.phi_range
+    assert geometry.polar_shape == (int(np.ceil(r_max * (phi_max - phi_min))) + 1, int(np.ceil(r_max - r_min)) + 1)
+    assert Geometry.fromdict(geometry.to_dict()) == geometry
+
+    geometry.set_polar_budget(None)
+    assert geometry.auto_polar and np.prod(geometry.polar_shape) <= 100 * 80
+    geometry.set_beam_center(50, 40)
+    assert (geometry.phi_axis.size, geometry.r_axis.size) == geometry.polar_shape
+    assert np.prod(geometry.polar_shape) <= 100 * 80
+
+    geometry.set_polar_shape((64, 32))
+    assert not geometry.auto_polar and geometry.polar_shape == (64, 32)
+
+
+def test_polar_window():
+    raw = np.random.default_rng(0).random((50, 70)).astype(np.float32)
+    for key in ('1234', '2413'):
+        geometry = Geometry(beam_center=(45, 20), scale=2, polar_shape=(48, 64), t_key=key)
+        geometry.set_shape(geometry.t(raw).shape)
+        window = geometry.polar_window((20, 40), (30, 60))
+        phi_axis, r_axis = geometry.window_axes(window)
+        assert r_axis[0] <= 20 and r_axis[-1] >= 40 and phi_axis[0] <= 30 and phi_axis[-1] >= 60
+        assert window[1].stop - window[1].start < geometry.polar_shape[1]
+        np.testing.assert_array_equal(r_axis, geometry.r_axis[window[1]])
+        np.testing.assert_array_equal(phi_axis, geometry.phi_axis[window[0]])
+
+        part = PolarImage.remap_window(raw, geometry, window, raw=True)
+        np.testing.assert_array_equal(part, PolarImage.remap(raw, geometry, raw=True)[window])
+        assert geometry.copy().window_remap_maps(window, raw=True) is geometry.window_remap_maps(window, raw=True)
+
+    assert geometry.polar_window((1000, 2000))[1].stop == geometry.polar_window((1000, 2000))[1].start
+    assert PolarImage.remap_window(raw, geometry, geometry.polar_window((1000, 2000))) is None
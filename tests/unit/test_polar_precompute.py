@@ -0,0 +1,90 @@
+from threading import Event
+
+import cv2
+import numpy as np
+import tifffile
+
+from mlgidGUI.app import read_image
+from mlgidGUI.app.edf_reader import read_edf_series
+from mlgidGUI.app.file_manager import FileManager
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.polar_image import PolarImage
+from mlgidGUI.app.polar_precompute import precompute_polar_images
+
+from .test_edf_reader import _edf_bytes
+
+
+def test_precompute_polar_images(tmp_path):
+    data_path = tmp_path / 'data'
+    data_path.mkdir()
+    rng = np.random.default_rng(0)
+    for i in range(5):
+        tifffile.imwrite(data_path / f'{i}.tiff', rng.random((30, 40)).astype(np.float32))
+
+    fm = FileManager()
+    fm.open_project(tmp_path / 'project')
+    folder_key = fm.add_root_path_to_project(data_path)
+    folder_key.update()
+    keys = list(folder_key.image_children)
+    fm.geometries.default[folder_key] = Geometry(beam_center=(25, 20), polar_shape=(32, 32))
+    fm.geometries[keys[0]] = Geometry(beam_center=(20, 20), shape=(30, 40), polar_shape=(32, 32))
+
+    progress = []
+    result = precompute_polar_images(fm, folder_key, batch_size=2, process_callback=progress.append)
+    assert (result.computed, result.skipped, result.failed, result.cancelled) == (5, 0, 0, False)
+    assert progress[-1] == 5
+
+    for key in keys:
+        geometry = fm.geometries[key] or fm.geometries.default[folder_key]
+        geometry.set_shape((30, 40))
+        np.testing.assert_array_equal(fm.polar_images.get(key, geometry, cv2.INTER_LINEAR),
+                                      PolarImage.remap(fm.images[key], geometry))
+        assert fm.polar_images.get(key, geometry, cv2.INTER_CUBIC) is None
+
+    assert precompute_polar_images(fm, folder_key).skipped == 5
+
+    fm.geometries.default[folder_key] = Geometry(beam_center=(0, 20), polar_shape=(32, 32))
+    assert precompute_polar_images(fm, folder_key).computed == 4
+
+    cancel_event = Event()
+    cancel_event.set()
+    result = precompute_polar_images(fm, folder_key, overwrite=True, cancel_event=cancel_event)
+    assert result.cancelled and result.computed == 0
+
+
+def test_precompute_edf_series(tmp_path, monkeypatch):
+    data_path = tmp_path / 'data'
+    data_path.mkdir()
+    frames = [np.arange(30 * 40, dtype=np.uint16).reshape(30, 40) + i for i in range(4)]
+    for i, frame in enumerate(frames):
+        (data_path / f'{i}.edf').write_bytes(_edf_bytes(frame))
+    (data_path / '4.edf').write_bytes(_edf_bytes(frames[0])[:-10])
+
+    series_reads = []
+
+    def read_series(filepaths, *args, **kwargs):
+        series_reads.append(len(filepaths))
+        return read_edf_series(filepaths, *args, **kwargs)
+
+    monkeypatch.setattr(read_image, 'read_edf_series', read_series)
+
+    fm = FileManager()
+    fm.open_project(tmp_path / 'project')
+    folder_key = fm.add_root_path_to_project(data_path)
+    folder_key.update()
+    keys = sorted(folder_key.image_children, key=lambda k: k.name)
+    fm.geometries.default[folder_key] = Geometry(beam_center=(25, 20), polar_shape=(32, 32))
+
+    result = precompute_polar_images(fm, folder_key, batch_size=3)
+    # the corrupted frame is read again separately and fails
+    assert (result.computed, result.failed) == (4, 1)
+    # the header of the first frame is parsed, the others are read with it in batches
+    assert series_reads == [2, 2]
+
+    geometry = fm.geometries.default[folder_key]
+    geometry.set_shape((40, 30))
+    for key, frame in zip(keys, frames):
+        np.testing.assert_array_equal(fm.images[key], np.rot90(frame))
+        np.testing.assert_array_equal(fm.polar_images.get(key, geometry, cv2.INTER_LINEAR),
+                                      PolarImage.remap(fm.images[key], geometry))
+    fm.close_project()
@@ -0,0 +1,68 @@
+import pickle
+
+import numpy as np
+
+from mlgidGUI.app.acquisition_profile import AcquisitionProfile
+from mlgidGUI.app.geometry import Geometry
+from mlgidGUI.app.reciprocal_space import q_lut, default_q_grid, q_remap_maps, remap_to_q, _q_to_pixels
+
+
+def test_q_lut_and_maps():
+    shape = (120, 100)
+    geometry = Geometry(shape=shape, beam_center=(110, 50), gi=(0.7, 100, 0.172, 0.3))
+    assert q_lut(Geometry(shape=shape)) is None
+
+    q_xy, q_z = q_lut(geometry)
+    assert q_xy.shape == q_z.shape == shape
+    assert q_lut(geometry.copy())[0] is q_xy
+
+    # the analytic inverse maps pixels back to themselves
+    zz, yy = np.mgrid[:shape[0], :shape[1]]
+    inverse_yy, inverse_zz = _q_to_pixels(geometry, q_xy.astype(float), q_z.astype(float))
+    # pixels of the beam center column lie on the border of the missing wedge
+    seen = yy != 50
+    np.testing.assert_allclose(inverse_yy[seen], yy[seen], atol=0.05)
+    np.testing.assert_allclose(inverse_zz[seen], zz[seen], atol=0.05)
+
+    q_grid = default_q_grid(geometry, (60, 50))
+    assert q_remap_maps(geometry, q_grid) is q_remap_maps(geometry.copy(), q_grid)
+    resampled = remap_to_q(q_z, geometry, q_grid)
+    maps = q_remap_maps(geometry, q_grid)[0]
+    inside = (maps[..., 0] > 0) & (maps[..., 0] < shape[1] - 1) & (maps[..., 1] > 0) & (maps[..., 1] < shape[0] - 1)
+    assert inside.mean() > 0.5
+    np.testing.assert_allclose(resampled[inside], np.broadcast_to(q_grid.q_z_axis[:, None], q_grid.shape)[inside],
+                               atol=1e-3)
+
+
+def test_q_values_of_analytic_geometry():
+    # the specular reflection (exit angle equal to the incidence angle) is 20 pixels above the beam center
+    wavelength, distance, pixel_size = 1., 100., 0.1
+    incidence_angle = np.rad2deg(np.arctan(20 * pixel_size / distance) / 2)
+    geometry = Geometry(shape=(60, 80), beam_center=(50, 30), gi=(wavelength, distance, pixel_size, incidence_angle))
+    q_xy, q_z = q_lut(geometry)
+    k, alpha_i = 2 * np.pi / wavelength, np.deg2rad(incidence_angle)
+
+    np.testing.assert_allclose(q_z[30, 30], 2 * k * np.sin(alpha_i), rtol=1e-5)
+    assert abs(q_xy[30, 30]) < 1e-4
+    # the sample horizon (exit angle 0) is the beam center row, q_z grows upwards
+    np.testing.assert_allclose(q_z[50], 0, atol=1e-5)
+    assert np.all(np.diff(q_z[:, 30]) < 0)
+    # q_xy grows to the right: 2 k sin(theta) at the horizon for in-plane scattering angle 2 theta
+    theta = np.arctan(np.array([-20, 40]) * pixel_size / distance) / 2
+    np.testing.assert_allclose(q_xy[50, [10, 70]], 2 * k * np.cos(alpha_i) * np.sin(theta), rtol=1e-5)
+
+    q_grid = default_q_grid(geometry)
+    q_image = remap_to_q(q_lut(geometry)[1], geometry, q_grid)
+    assert q_grid.q_z_range[0] < 0 < q_grid.q_z_range[1]
+    row = np.argmin(np.abs(q_grid.q_z_axis - 2 * k * np.sin(alpha_i)))
+    np.testing.assert_allclose(q_image[row, np.argmin(np.abs(q_grid.q_xy_axis))], q_grid.q_z_axis[row], atol=1e-3)
+
+
+def test_gi_parameters_persistence():
+    geometry = Geometry(shape=(120, 100), beam_center=(10, 50), gi=(0.7, 100, 0.172, 0.3))
+    assert pickle.loads(pickle.dumps(geometry)).gi == geometry.gi
+    assert Geometry.fromdict(geometry.to_dict()) == geometry != Geometry(shape=(120, 100), beam_center=(10, 50))
+
+    binned = AcquisitionProfile(2).geometry_from_detector(geometry, (120, 100))
+    assert binned.gi.pixel_size == 2 * geometry.gi.pixel_size
+    assert AcquisitionProfile(2).geometry_to_detector(binned, (120, 100)) == geometry
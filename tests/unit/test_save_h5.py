@@ -0,0 +1,52 @@
+import numpy as np
+from h5py import File
+
+from mlgidGUI.app.data_manager import save_h5
+from mlgidGUI.app.data_manager.save_h5 import SaveH5
+from mlgidGUI.app.data_manager.saving_parameters import SavingParameters, SaveMode
+from mlgidGUI.app.file_manager import H5_FILE_POOL
+from mlgidGUI.app.rois import RoiData
+from mlgidGUI.app.rois.roi import Roi
+
+from .test_image_holder import _image_holder
+
+
+def _no_polar_image(*args, **kwargs):
+    raise AssertionError('full polar images should not be calculated')
+
+
+def test_save_angular_profiles(tmp_path, monkeypatch):
+    fm, image_holder, keys = _image_holder(tmp_path)
+    rois = [Roi(radius=30, width=6, key=0), Roi(radius=1000, width=6, key=1)]
+    fm.rois_data[keys[0]] = RoiData(rois)
+    geometry = image_holder.g_holder.get_geometry(keys[0])
+    geometry.set_shape((60, 80))
+    profile = image_holder.get_angular_profile_by_key(keys[0], rois[0])
+
+    params = SavingParameters({keys[0].parent: keys}, tmp_path / 'export.h5')
+    params.set_partial_h5_params()
+    monkeypatch.setattr(image_holder, 'get_data_by_key', _no_polar_image)
+    assert SaveH5(fm, image_holder).save(params)
+
+    with File(str(params.path), 'r') as f:
+        group = f[keys[0].parent.name][keys[0].name]['angular_profiles']
+        # rois outside of the polar image have no profile
+        assert set(group.keys()) == {'phi', '0'}
+        np.testing.assert_allclose(group['0'][()], profile)
+        np.testing.assert_allclose(group['phi'][()], geometry.phi_axis)
+        assert 'angular_profiles' not in f[keys[1].parent.name][keys[1].name]
+    fm.close_project()
+
+
+def test_save_to_file_in_use(tmp_path, monkeypatch):
+    fm, image_holder, keys = _image_holder(tmp_path)
+    params = SavingParameters({keys[0].parent: keys}, tmp_path / 'export.h5')
+    assert SaveH5(fm, image_holder).save(params)
+
+    monkeypatch.setattr(save_h5, 'RELEASE_TIMEOUT', 0.05)
+    params.save_mode = SaveMode.add
+    with H5_FILE_POOL.open(params.path):
+        # the file cannot be written while it is read
+        assert not SaveH5(fm, image_holder).save(params)
+    assert SaveH5(fm, image_holder).save(params)
+    fm.close_project()
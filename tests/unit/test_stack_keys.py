@@ -0,0 +1,89 @@
+import numpy as np
+import tifffile
+from h5py import File
+
+from mlgidGUI.app.file_manager import (FolderH5Key, FolderPathKey, FolderH5StackKey, FolderTiffStackKey,
+                                       ImageH5FrameKey, ImageTiffFrameKey, ImagePathKey)
+from mlgidGUI.app.file_manager import keys
+from mlgidGUI.app.read_image import read_tiff_frame, tiff_stack_info
+
+
+def _stack(frames_num: int = 5):
+    return np.arange(frames_num * 6 * 8, dtype=np.uint16).reshape(frames_num, 6, 8)
+
+
+def test_tiff_stack_keys(tmp_path):
+    stack = _stack()
+    tifffile.imwrite(tmp_path / 'stack.tiff', stack)
+    tifffile.imwrite(tmp_path / 'compressed.tiff', stack, compression='zlib')
+    tifffile.imwrite(tmp_path / 'single.tiff', stack[0])
+
+    folder = FolderPathKey(tmp_path, None, path=tmp_path)
+    folder.update()
+
+    assert [key.name for key in folder.image_children] == ['single']
+    assert all(isinstance(key, ImagePathKey) for key in folder.image_children)
+    stacks = list(folder.folder_children)
+    assert all(isinstance(key, FolderTiffStackKey) for key in stacks)
+
+    for stack_key in stacks:
+        stack_key.update()
+        frames = list(stack_key.image_children)
+        assert len(frames) == len(stack)
+        assert all(isinstance(key, ImageTiffFrameKey) for key in frames)
+        assert len(set(frames)) == len(frames)
+        assert len({key.file_name() for key in frames}) == len(frames)
+        assert stack_key.get_next_image(frames[1]) == frames[2]
+
+        np.testing.assert_array_equal(frames[3].get_image(), stack[3])
+        lazy_image = frames[3].get_lazy_image()
+        assert lazy_image.shape == stack.shape[1:]
+        np.testing.assert_array_equal(lazy_image.window((1, 4), (2, 6)), stack[3, 1:4, 2:6])
+
+    assert isinstance(read_tiff_frame(tmp_path / 'stack.tiff', 2).base, np.memmap)
+    assert read_tiff_frame(tmp_path / 'compressed.tiff', 2).base is None
+
+
+def test_h5_stack_keys(tmp_path):
+    stack = _stack()
+    h5path = tmp_path / 'data.h5'
+    with File(h5path, 'w') as f:
+        f.create_dataset('entry/stack', data=stack)
+        f.create_dataset('entry/image', data=stack[0])
+
+    folder = FolderH5Key(tmp_path, None, h5path=h5path, h5key='entry')
+    folder.update()
+
+    assert [key.name for key in folder.image_children] == ['image']
+    stack_key, = folder.folder_children
+    assert isinstance(stack_key, FolderH5StackKey) and stack_key.is_valid()
+
+    stack_key.update()
+    frames = list(stack_key.image_children)
+    assert len(frames) == len(stack)
+    assert all(isinstance(key, ImageH5FrameKey) and key.is_valid() for key in frames)
+    assert frames[0] != frames[1]
+
+    np.testing.assert_array_equal(frames[4].get_image(), stack[4])
+    lazy_image = frames[4].get_lazy_image()
+    assert lazy_image.shape == stack.shape[1:]
+    np.testing.assert_array_equal(lazy_image.preview(4), stack[4, ::2, ::2])
+
+
+def test_tiff_stacks_are_classified_once(tmp_path, monkeypatch):
+    stack = _stack()
+    tifffile.imwrite(tmp_path / 'stack.tiff', stack)
+    tifffile.imwrite(tmp_path / 'single.tiff', stack[0])
+    calls = []
+    monkeypatch.setattr(keys, 'tiff_stack_info', lambda path: calls.append(path.name) or tiff_stack_info(path))
+
+    folder = FolderPathKey(tmp_path, None, path=tmp_path)
+    folder.update()
+    folder.update()
+    assert sorted(calls) == ['single.tiff', 'stack.tiff']
+
+    # modified files are classified again
+    tifffile.imwrite(tmp_path / 'single.tiff', stack)
+    folder.update()
+    assert calls[2:] == ['single.tiff']
+    assert sorted(key.name for key in folder.folder_children) == ['single', 'stack']
@@ -0,0 +1,76 @@
+import os
+from threading import Event
+from types import SimpleNamespace
+
+import numpy as np
+import tifffile
+
+from mlgidGUI.app.file_manager import ImagePathKey, ArrayImage
+from mlgidGUI.app.file_manager.project_structure import ProjectStructure
+from mlgidGUI.app.file_manager.read_images import _ReadImage
+from mlgidGUI.app.file_manager.read_thumbnails import _ReadThumbnails, calc_thumbnails
+from mlgidGUI.app.thumbnails import build_thumbnails
+
+
+def test_calc_thumbnails():
+    image = np.random.rand(1000, 600).astype(np.float32)
+    image[0, 0] = np.nan
+    thumbnails = calc_thumbnails(ArrayImage(image), (512, 128))
+    assert thumbnails[512].shape == (512, 307)
+    assert thumbnails[128].shape == (128, 77)
+    assert all(t.dtype == np.uint8 for t in thumbnails.values())
+
+
+def test_build_thumbnails(tmp_path):
+    project_structure = ProjectStructure()
+    project_structure.open_project(tmp_path / 'project')
+    fm = SimpleNamespace(images=_ReadImage(project_structure), thumbnails=_ReadThumbnails(project_structure))
+
+    keys = []
+    for i in range(3):
+        path = tmp_path / f'{i}.tiff'
+        tifffile.imwrite(path, np.random.rand(300, 200).astype(np.float32))
+        keys.append(ImagePathKey(project_structure.path, None, path=path))
+
+    progress = []
+    assert build_thumbnails(fm, keys, process_callback=progress.append) == 3
+    assert progress == [1, 2, 3]
+    assert fm.thumbnails.get(keys[0], 100).shape == (128, 85)
+    assert fm.thumbnails.get(keys[0], 200).shape == (300, 200)
+    assert build_thumbnails(fm, keys) == 0
+
+    stat = keys[0].path.stat()
+    os.utime(keys[0].path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert keys[0] not in fm.thumbnails and keys[1] in fm.thumbnails
+
+    cancel_event = Event()
+    cancel_event.set()
+    assert build_thumbnails(fm, keys, cancel_event=cancel_event) == 0
+
+
+def test_outdated_thumbnails_are_replaced_and_deleted(tmp_path):
+    project_structure = ProjectStructure()
+    project_structure.open_project(tmp_path / 'project')
+    thumbnails = _ReadThumbnails(project_structure)
+    path = tmp_path / 'image.tiff'
+    tifffile.imwrite(path, np.random.rand(300, 200).astype(np.float32))
+    key = ImagePathKey(project_structure.path, None, path=path)
+
+    thumbnails.create(key, ArrayImage(np.random.rand(300, 200)))
+    assert key in thumbnails and len(list(thumbnails.folder.iterdir())) == 1
+
+    # a new stamp of the source replaces the outdated file
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert key not in thumbnails and thumbnails[key] is None
+    thumbnails.create(key, ArrayImage(np.random.rand(300, 200)))
+    assert key in thumbnails and len(list(thumbnails.folder.iterdir())) == 1
+
+    # thumbnails of modified and removed sources are deleted with the image data
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+    del thumbnails[key]
+    assert not list(thumbnails.folder.iterdir())
+    thumbnails.create(key, ArrayImage(np.random.rand(300, 200)))
+    path.unlink()
+    del thumbnails[key]
+    assert not list(thumbnails.folder.iterdir())